@@ -1,12 +1,10 @@
-from datetime import datetime
-from flask import Flask, flash, redirect, url_for
+from flask import Flask, flash, redirect, request, url_for
 from flask_login import LoginManager, current_user, logout_user
 from flask_migrate import Migrate
-from werkzeug.security import generate_password_hash
 from config import Config
 from app.extensions import db, login_manager, migrate
-from app.models import PagoCliente, User
-import os
+from app.models import User
+from app.suscripciones import esta_activo
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -15,12 +13,20 @@ def create_app():
     app = Flask(__name__)
     app.config.from_object(Config)
 
-    # Inicializar extensiones
+    # Inicializar extensiones (el pool mide esperas y ocupación: app/pool.py)
+    from app.pool import opciones_con_medicion
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = opciones_con_medicion(
+        app.config.get("SQLALCHEMY_ENGINE_OPTIONS", {})
+    )
     db.init_app(app)
     migrate.init_app(app, db)
     login_manager.init_app(app)
     login_manager.login_view = 'main.login'
 
+    # Consultas y tiempos por petición (Server-Timing, log de lentas)
+    from app.instrumentacion import registrar_instrumentacion
+    registrar_instrumentacion(app)
+
     # -----------------------------------------------------------------
     # Registrar Blueprints
     # -----------------------------------------------------------------
@@ -32,6 +38,17 @@ def create_app():
     app.register_blueprint(cliente, url_prefix="/cliente")
     app.register_blueprint(admin, url_prefix="/admin")
 
+    # Métricas para Prometheus (/metrics)
+    from app.metricas import contar_control_pago, registrar_metricas
+    registrar_metricas(app)
+
+    # Eventos que mantienen los datos derivados (resúmenes, contadores, etc.)
+    from app import contadores, estadisticas, ingresos, progreso, suscripciones, versiones  # noqa: F401
+
+    # Comandos CLI (flask jge ...)
+    from app.commands import jge
+    app.cli.add_command(jge)
+
     # -----------------------------------------------------------------
     # Cargar usuario (para Flask-Login)
     # -----------------------------------------------------------------
@@ -40,37 +57,17 @@ def create_app():
         return User.query.get(int(user_id))
 
     # =========================================================
-    # CREAR USUARIO ADMIN PERSONAL (SOLO SI NO EXISTE NINGUNO)
+    # PREPARAR LA BASE (tablas, migraciones y admin inicial)
     # =========================================================
-    with app.app_context():
-        try:
-            # Crear tablas si no existen antes de buscar admin
-            db.create_all()
-
-            admin_existente = User.query.filter_by(is_admin=True).first()
-
-            if not admin_existente:
-                admin_user = os.environ.get("ADMIN_USERNAME")
-                admin_pass = os.environ.get("ADMIN_PASSWORD")
-                admin_nombre = os.environ.get("ADMIN_NOMBRE", "Administrador")
-
-                if admin_user and admin_pass:
-                    nuevo_admin = User(
-                        username=admin_user,
-                        password=generate_password_hash(admin_pass),
-                        nombre=admin_nombre,
-                        is_admin=True
-                    )
-                    db.session.add(nuevo_admin)
-                    db.session.commit()
-                    print(f">>Admin '{admin_user}' creado correctamente.")
-                else:
-                    print("No se creó ningún admin (faltan variables de entorno).")
-            else:
-                print(f">>Ya existe un administrador: {admin_existente.username}")
-
-        except Exception as e:
-            print(f">>No se pudo crear el usuario admin: {e}")
+    # En producción AUTO_BOOTSTRAP=0: los workers arrancan sin I/O a la
+    # base y el deploy corre `flask jge bootstrap` una sola vez.
+    if app.config["AUTO_BOOTSTRAP"]:
+        from app.bootstrap import bootstrap
+        with app.app_context():
+            try:
+                bootstrap()
+            except Exception as e:
+                print(f">>No se pudo preparar la base: {e}")
 
     # =========================================================
     # Context processors
@@ -79,49 +76,26 @@ def create_app():
     def inject_version():
         return dict(config=app.config)
 
-    @app.context_processor
-    def override_url_for():
-        def dated_url_for(endpoint, **values):
-            if endpoint == 'static':
-                filename = values.get('filename')
-                if filename:
-                    file_path = os.path.join(app.root_path, endpoint, filename)
-                    if os.path.exists(file_path):
-                        values['v'] = int(os.path.getmtime(file_path))
-            return url_for(endpoint, **values)
-        return dict(url_for=dated_url_for)
+    # Archivos estáticos con hash de contenido (?v=) y cache inmutable
+    from app.estaticos import registrar_estaticos
+    registrar_estaticos(app)
 
     # =========================================================
     # BLOQUEAR USUARIO SI NO TIENE PAGO DEL MES
     # =========================================================
     @app.before_request
     def verificar_pago_activo():
-        if current_user.is_authenticated and not current_user.is_admin:
-            pago = (PagoCliente.query
-                    .filter_by(cliente_id=current_user.id, estado='Aprobado')
-                    .order_by(PagoCliente.fecha_pago.desc())
-                    .first())
-
-            mes_actual = datetime.now().strftime("%B %Y")
+        # Los archivos estáticos no necesitan ni cargar el usuario
+        if request.endpoint == 'static':
+            return
 
-            if not pago or pago.mes_correspondiente != mes_actual:
+        # activo_hasta ya viene con el usuario cargado: sin consultas extra
+        if current_user.is_authenticated and not current_user.is_admin:
+            activo = esta_activo(current_user)
+            contar_control_pago("activo" if activo else "vencido")
+            if not activo:
                 flash("Tu cuenta no esta activada, contactate con el creador para solucionarlo", "danger")
                 logout_user()
                 return redirect(url_for('main.login'))
 
-    
-    # =========================================================
-    # Ejecutar migraciones pendientes utilizando Flask-Migrate
-    # =========================================================
-    with app.app_context():
-        try:
-            from flask_migrate import upgrade
-            upgrade()
-            print("Migraciones Alembic (flask db upgrade) aplicadas automáticamente.")
-        except Exception as e:
-            print(f"Error al aplicar migraciones: {e}")
-
-
-
-    
     return app
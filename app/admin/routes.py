@@ -1,11 +1,14 @@
-from flask import Blueprint, abort, render_template, redirect, request, url_for, flash
+from flask import Blueprint, Response, abort, current_app, jsonify, render_template, redirect, request, stream_with_context, url_for, flash
 from flask_login import login_required, current_user
 from werkzeug.security import generate_password_hash
 from app.models import User, Alumno, MedicionCorporal, PagoCliente
 from app.forms import RegistroForm,EditarClienteForm
 from app.extensions import db
 from app.admin import admin
-from datetime import datetime, timedelta
+from app.condicional import condicional, version_de_cliente, version_global
+from app.instrumentacion import presupuesto_consultas
+from app.periodos import nombre_periodo, periodo_actual, sumar_meses
+from datetime import datetime
 
 
 
@@ -14,20 +17,36 @@ from datetime import datetime, timedelta
 # ============================================================
 @admin.route("/dashboard")
 @login_required
+@condicional(version_global)
+@presupuesto_consultas(10)
 def dashboard():
     if not current_user.is_admin:
         flash("Acceso denegado.")
         return redirect(url_for("main.inicio"))
 
-    total_clientes = User.query.filter_by(is_admin=False).count()
-    total_alumnos = Alumno.query.count()
-    total_mediciones = MedicionCorporal.query.count()
+    from app.estadisticas import panel_admin
+
+    # Totales y tendencia desde las tablas de estadísticas (sin COUNT(*))
+    totales, dias = panel_admin(db.session.connection())
+    db.session.commit()  # la foto de suscripciones de hoy, si se recontó
+    total_clientes = totales.clientes if totales else 0
+    total_alumnos = totales.alumnos if totales else 0
+    total_mediciones = totales.mediciones if totales else 0
+    suscripciones_activas = dias[-1].suscripciones_activas if dias else 0
 
     clientes_recientes = User.query.filter_by(is_admin=False).order_by(User.id.desc()).limit(3).all()
 
     grafico_labels = ["Clientes", "Alumnos", "Mediciones"]
     grafico_datos = [total_clientes, total_alumnos, total_mediciones]
 
+    tendencia = {
+        "fechas": [d.fecha.strftime('%d/%m') for d in dias],
+        "clientes": [d.clientes_nuevos for d in dias],
+        "alumnos": [d.alumnos_nuevos for d in dias],
+        "mediciones": [d.mediciones_nuevas for d in dias],
+        "suscripciones": [d.suscripciones_activas for d in dias],
+    }
+
     return render_template(
         "admin/dashboard.html",
         total_clientes=total_clientes,
@@ -35,7 +54,9 @@ def dashboard():
         total_mediciones=total_mediciones,
         grafico_labels=grafico_labels,
         grafico_datos=grafico_datos,
-        clientes_recientes=clientes_recientes
+        clientes_recientes=clientes_recientes,
+        suscripciones_activas=suscripciones_activas,
+        tendencia=tendencia
     )
 
 
@@ -44,23 +65,22 @@ def dashboard():
 # ============================================================
 @admin.route("/clientes")
 @login_required
+@presupuesto_consultas(3)
 def admin_clientes():
     if not current_user.is_admin:
         flash("Acceso denegado.")
         return redirect(url_for("main.inicio"))
 
+    # Los totales salen de los contadores de User: una sola consulta
     clientes = User.query.filter_by(is_admin=False).all()
     clientes_info = []
 
     for cliente in clientes:
-        alumnos = Alumno.query.filter_by(cliente_id=cliente.id).all()
-        total_mediciones = sum(len(a.mediciones) for a in alumnos)
         clientes_info.append({
             "id": cliente.id,
             "username": cliente.username,
-            "alumnos": alumnos,
-            "total_alumnos": len(alumnos),
-            "total_mediciones": total_mediciones
+            "total_alumnos": cliente.total_alumnos,
+            "total_mediciones": cliente.total_mediciones
         })
 
     return render_template("admin/clientes.html", clientes=clientes_info)
@@ -71,6 +91,8 @@ def admin_clientes():
 # ============================================================
 @admin.route("/cliente/<int:cliente_id>")
 @login_required
+@condicional(version_de_cliente)
+@presupuesto_consultas(5)
 def ver_cliente(cliente_id):
     if not current_user.is_admin:
         flash("Acceso no autorizado.")
@@ -78,8 +100,8 @@ def ver_cliente(cliente_id):
 
     cliente = User.query.get_or_404(cliente_id)
     alumnos = cliente.alumnos
-    total_alumnos = len(alumnos)
-    total_mediciones = sum(len(a.mediciones) for a in alumnos)
+    total_alumnos = cliente.total_alumnos
+    total_mediciones = cliente.total_mediciones
 
     return render_template(
         "admin/dashboard_cliente.html",
@@ -95,6 +117,7 @@ def ver_cliente(cliente_id):
 # ============================================================
 @admin.route("/cliente/nuevo", methods=["GET", "POST"])
 @login_required
+@presupuesto_consultas(6)
 def nuevo_cliente():
     if not current_user.is_admin:
         flash("Acceso restringido.")
@@ -125,6 +148,7 @@ def nuevo_cliente():
 # ============================================================
 @admin.route("/cliente/<int:cliente_id>/editar", methods=["GET", "POST"])
 @login_required
+@presupuesto_consultas(4)
 def editar_cliente(cliente_id):
     if not current_user.is_admin:
         flash("Acceso no autorizado.")
@@ -151,6 +175,7 @@ def editar_cliente(cliente_id):
 # ============================================================
 @admin.route('/admin/cliente/<int:cliente_id>/eliminar', methods=['POST'])
 @login_required
+@presupuesto_consultas(8)
 def eliminar_cliente(cliente_id):
     if not current_user.is_admin:
         flash("Acceso no autorizado.", "danger")
@@ -167,11 +192,37 @@ def eliminar_cliente(cliente_id):
 
 
 
+# ============================================================
+# REPORTES PDF DE TODOS LOS ALUMNOS DE UN CLIENTE (ZIP)
+# ============================================================
+@admin.route('/cliente/<int:cliente_id>/reportes.zip')
+@login_required
+@presupuesto_consultas(3)
+def reportes_cliente_zip(cliente_id):
+    if not current_user.is_admin:
+        abort(403)
+    from app.lote_reportes import datos_alumnos, generar_pdfs, zip_en_streaming
+
+    cliente = User.query.get_or_404(cliente_id)
+    # Se renderizan en serie dentro del worker: tope de alumnos por ZIP
+    maximo = current_app.config['REPORTES_MAX_ALUMNOS_WEB']
+    if cliente.total_alumnos > maximo:
+        flash(f'⚠️ {cliente.nombre} tiene más de {maximo} alumnos: usar '
+              f'"flask jge exportar-reportes --cliente {cliente.username}".', 'warning')
+        return redirect(url_for('admin.ver_cliente', cliente_id=cliente.id))
+
+    pdfs = generar_pdfs(datos_alumnos(Alumno.query.filter_by(cliente_id=cliente.id)))
+    response = Response(stream_with_context(zip_en_streaming(pdfs)), mimetype="application/zip")
+    response.headers['Content-Disposition'] = f'attachment; filename=Reportes_{cliente.username}.zip'
+    return response
+
+
 # ============================================================
 # APROBAR PAGO
 # ============================================================
 @admin.route('/pagos/aprobar/<int:id>', methods=['POST'])
 @login_required
+@presupuesto_consultas(12)
 def aprobar_pago(id):
     if not current_user.is_admin:
         abort(403)
@@ -180,7 +231,7 @@ def aprobar_pago(id):
     pago.estado = 'Aprobado'
     db.session.commit()
 
-    flash(f"Pago de {pago.cliente.nombre} ({pago.mes_correspondiente}) aprobado correctamente.", "success")
+    flash(f"Pago de {pago.cliente.nombre} ({pago.nombre_periodo}) aprobado correctamente.", "success")
     return redirect(url_for('admin.pagos'))
 
 
@@ -190,15 +241,17 @@ def aprobar_pago(id):
 
 @admin.route('/cliente/<int:cliente_id>/pago', methods=['POST'])
 @login_required
+@presupuesto_consultas(12)
 def registrar_pago(cliente_id):
     if not current_user.is_admin:
         abort(403)
 
     cliente = User.query.get_or_404(cliente_id)
-    mes_actual = datetime.now().strftime("%B %Y")
+    periodo = periodo_actual()
+    mes_actual = nombre_periodo(periodo)
 
     # Verifica si ya tiene pago de este mes
-    pago_existente = PagoCliente.query.filter_by(cliente_id=cliente.id, mes_correspondiente=mes_actual).first()
+    pago_existente = PagoCliente.query.filter_by(cliente_id=cliente.id, periodo=periodo).first()
     if pago_existente:
         flash(f"Ya existe un pago registrado para {cliente.nombre} ({mes_actual}).", "warning")
         return redirect(url_for('admin.admin_clientes'))
@@ -208,6 +261,7 @@ def registrar_pago(cliente_id):
         cliente_id=cliente.id,
         monto=15000.00,  # 💰 podés cambiar el valor del abono mensual
         mes_correspondiente=mes_actual,
+        periodo=periodo,
         estado="Pendiente"
     )
     db.session.add(nuevo_pago)
@@ -223,6 +277,7 @@ def registrar_pago(cliente_id):
 
 @admin.route('/pagos/nuevo', methods=['GET', 'POST'])
 @login_required
+@presupuesto_consultas(13)
 def registrar_pago_manual():
     if not current_user.is_admin:
         flash("Acceso no autorizado.", "danger")
@@ -234,7 +289,8 @@ def registrar_pago_manual():
         cliente_id = request.form.get('cliente_id')
         monto = request.form.get('monto')
         estado = request.form.get('estado')  # 🔹 Nuevo campo
-        mes_correspondiente = datetime.now().strftime("%B %Y")
+        periodo = periodo_actual()
+        mes_correspondiente = nombre_periodo(periodo)
 
         # Validaciones básicas
         if not cliente_id or not monto:
@@ -254,7 +310,7 @@ def registrar_pago_manual():
         if estado == "Aprobado":
             pago_existente = PagoCliente.query.filter_by(
                 cliente_id=cliente.id,
-                mes_correspondiente=mes_correspondiente,
+                periodo=periodo,
                 estado='Aprobado'
             ).first()
             if pago_existente:
@@ -266,6 +322,7 @@ def registrar_pago_manual():
             cliente_id=cliente.id,
             monto=float(monto),
             mes_correspondiente=mes_correspondiente,
+            periodo=periodo,
             estado=estado,  # 🔹 Usa el estado seleccionado
             fecha_pago=datetime.utcnow()
         )
@@ -280,19 +337,50 @@ def registrar_pago_manual():
 
         return redirect(url_for('admin.pagos'))
 
-    return render_template('admin/nuevo_pago.html', clientes=clientes, now=datetime.utcnow())
+    return render_template('admin/nuevo_pago.html', clientes=clientes, now=datetime.utcnow(),
+                           mes_actual=nombre_periodo(periodo_actual()))
 
 # ===========================================================
 # 💰 LISTAR TODOS LOS PAGOS (ADMIN)
 # ===========================================================
 @admin.route('/pagos')
 @login_required
+@presupuesto_consultas(4)
 def pagos():
     if not current_user.is_admin:
         abort(403)
 
-    pagos = PagoCliente.query.order_by(PagoCliente.fecha_pago.desc()).all()
-    return render_template('admin/pagos.html', pagos=pagos, now=datetime.utcnow, timedelta=timedelta)
+    from app.pagos import ESTADOS, decodificar_cursor, pagina_pagos
+
+    # 🔹 Filtros (estado, periodo "YYYY-MM" y cliente)
+    estado = request.args.get('estado') if request.args.get('estado') in ESTADOS else None
+    periodo_txt = request.args.get('periodo', '')
+    try:
+        periodo = datetime.strptime(periodo_txt, "%Y-%m").date()
+    except ValueError:
+        periodo, periodo_txt = None, ''
+    cliente_id = request.args.get('cliente_id', type=int)
+
+    # 🔹 Página por cursor: una consulta con JOIN, sin importar el historial
+    pagos, siguiente, anterior = pagina_pagos(
+        db.session.connection(),
+        estado=estado, periodo=periodo, cliente_id=cliente_id,
+        despues=decodificar_cursor(request.args.get('despues')),
+        antes=decodificar_cursor(request.args.get('antes')),
+    )
+    filtros = {k: v for k, v in (('estado', estado), ('periodo', periodo_txt), ('cliente_id', cliente_id)) if v}
+    clientes = db.session.query(User.id, User.nombre).filter_by(is_admin=False).order_by(User.nombre).all()
+
+    return render_template(
+        'admin/pagos.html',
+        pagos=pagos,
+        filtros=filtros,
+        siguiente=siguiente,
+        anterior=anterior,
+        clientes=clientes,
+        estados=ESTADOS,
+        nombre_periodo=nombre_periodo,
+    )
 
 
 
@@ -303,6 +391,7 @@ def pagos():
 # ============================================================
 @admin.route('/pagos/eliminar/<int:id>', methods=['POST'])
 @login_required
+@presupuesto_consultas(11)
 def eliminar_pago(id):
     if not current_user.is_admin:
         abort(403)
@@ -311,7 +400,7 @@ def eliminar_pago(id):
     
     # Guardamos datos antes de borrar
     nombre_cliente = pago.cliente.nombre if pago.cliente else "Desconocido"
-    mes_pago = pago.mes_correspondiente
+    mes_pago = pago.nombre_periodo
 
     db.session.delete(pago)
     db.session.commit()
@@ -323,64 +412,100 @@ def eliminar_pago(id):
 
 
 # ============================================================
-# RESUMEN DE INGRESOS CON FILTRO DE MES Y AÑO
+# RESUMEN DE INGRESOS POR RANGO DE MESES (con comparación interanual)
 # ============================================================
-from sqlalchemy import extract, func
-
-@admin.route('/ingresos', methods=['GET', 'POST'])
+@admin.route('/ingresos')
 @login_required
+@presupuesto_consultas(5)
 def resumen_ingresos():
     if not current_user.is_admin:
         flash("Acceso no autorizado.", "danger")
         return redirect(url_for("main.inicio"))
 
-    hoy = datetime.utcnow()
-
-    # 🔹 Obtener mes y año seleccionados desde el formulario
-    mes = request.form.get('mes', hoy.month, type=int)
-    anio = request.form.get('anio', hoy.year, type=int)
-
-    # 🔹 Lista de meses (en español)
-    meses = [
-        (1, "Enero"), (2, "Febrero"), (3, "Marzo"), (4, "Abril"),
-        (5, "Mayo"), (6, "Junio"), (7, "Julio"), (8, "Agosto"),
-        (9, "Septiembre"), (10, "Octubre"), (11, "Noviembre"), (12, "Diciembre")
-    ]
-
-    # 🔹 Total del mes filtrado
-    total_mes = db.session.query(func.sum(PagoCliente.monto))\
-        .filter(
-            extract('month', PagoCliente.fecha_pago) == mes,
-            extract('year', PagoCliente.fecha_pago) == anio,
-            PagoCliente.estado == "Aprobado"
-        ).scalar() or 0
-
-    # 🔹 Total histórico general
-    total_general = db.session.query(func.sum(PagoCliente.monto))\
-        .filter(PagoCliente.estado == "Aprobado")\
-        .scalar() or 0
-
-    # 🔹 Totales por cliente (solo del mes filtrado)
-    pagos_clientes = db.session.query(
-        User.nombre, func.sum(PagoCliente.monto).label('total')
-    ).join(PagoCliente).filter(
-        extract('month', PagoCliente.fecha_pago) == mes,
-        extract('year', PagoCliente.fecha_pago) == anio,
-        PagoCliente.estado == "Aprobado"
-    ).group_by(User.id).order_by(func.sum(PagoCliente.monto).desc()).all()
-
-    # 🔹 Generar texto descriptivo del mes
-    nombre_mes = dict(meses).get(mes, "Mes desconocido")
-    periodo = f"{nombre_mes} {anio}"
+    from app.ingresos import MAX_MESES, informe_ingresos
+
+    # 🔹 Rango de meses "YYYY-MM" (por defecto, el mes actual)
+    actual = periodo_actual()
+
+    def leer_mes(nombre):
+        try:
+            return datetime.strptime(request.args.get(nombre, ''), "%Y-%m").date()
+        except ValueError:
+            return actual
+
+    desde, hasta = leer_mes('desde'), leer_mes('hasta')
+    if desde > hasta:
+        desde, hasta = hasta, desde
+    if sumar_meses(desde, MAX_MESES - 1) < hasta:
+        flash(f"El rango se limitó a {MAX_MESES} meses.", "warning")
+        desde = sumar_meses(hasta, -(MAX_MESES - 1))
+
+    informe = informe_ingresos(db.session.connection(), desde, hasta)
+
+    # 🔹 Texto descriptivo del rango
+    if desde == hasta:
+        periodo = nombre_periodo(desde)
+    else:
+        periodo = f"{nombre_periodo(desde)} a {nombre_periodo(hasta)}"
 
     return render_template(
         'admin/ingresos.html',
-        total_mes=total_mes,
-        total_general=total_general,
-        pagos_clientes=pagos_clientes,
-        meses=meses,
-        mes=mes,
-        anio=anio,
+        desde=desde,
+        hasta=hasta,
         periodo=periodo,
-        hoy=hoy
+        **informe
+    )
+
+
+# ============================================================
+# EXPORTACIÓN COMPLETA DE DATOS (backup en streaming)
+# ============================================================
+@admin.route('/exportar')
+@login_required
+@presupuesto_consultas(2)
+def exportar_datos():
+    if not current_user.is_admin:
+        abort(403)
+
+    from app.exportacion import FORMATOS, ErrorExportacion, exportar, nombre_archivo, validar
+
+    formato = request.args.get('formato', 'ndjson')
+    tabla = request.args.get('tabla') or None
+    comprimir = request.args.get('gzip', '1') not in ('0', 'false', 'no')
+    try:
+        validar(formato, tabla)
+    except ErrorExportacion as e:
+        abort(400, description=str(e))
+
+    response = Response(
+        stream_with_context(exportar(formato, tabla, comprimir)),
+        mimetype='application/gzip' if comprimir else FORMATOS[formato],
+    )
+    response.headers['Content-Disposition'] = (
+        f'attachment; filename={nombre_archivo(formato, tabla, comprimir)}'
+    )
+    response.headers['Cache-Control'] = 'no-store'
+    return response
+
+
+# ============================================================
+# ESTADÍSTICAS DE CACHES, RESPUESTAS 304 Y POOL (JSON, por proceso)
+# ============================================================
+@admin.route('/estadisticas/cache')
+@login_required
+@presupuesto_consultas(2)
+def estadisticas_cache():
+    if not current_user.is_admin:
+        abort(403)
+
+    from app.condicional import estadisticas
+    from app.graficos import cache_graficos
+    from app.pool import estadisticas_pool
+    from app.reportes import cache_pdf
+
+    return jsonify(
+        condicionales=estadisticas(),
+        pdf=cache_pdf().estadisticas(),
+        graficos=cache_graficos().estadisticas(),
+        pool=estadisticas_pool(db.engine),
     )
@@ -0,0 +1,71 @@
+# =========================================================
+# 🚀 PREPARACIÓN DE LA BASE (flask jge bootstrap)
+# =========================================================
+# Tablas, migraciones Alembic y admin inicial. En desarrollo lo corre
+# create_app() (AUTO_BOOTSTRAP=1); en producción se corre una vez por
+# deploy y los workers de gunicorn arrancan sin tocar la base.
+import os
+from contextlib import contextmanager
+
+from sqlalchemy import text
+from werkzeug.security import generate_password_hash
+
+from app.extensions import db
+from app.models import User
+
+# Clave fija del advisory lock de PostgreSQL (cualquier bigint sirve)
+CLAVE_LOCK = 0x4A4745
+
+
+@contextmanager
+def _bloqueo_global():
+    """Serializa el bootstrap entre procesos (solo PostgreSQL)."""
+    if db.engine.dialect.name != "postgresql":
+        yield
+        return
+    with db.engine.connect() as conexion:
+        conexion.execute(text("SELECT pg_advisory_lock(:clave)"), {"clave": CLAVE_LOCK})
+        try:
+            yield
+        finally:
+            conexion.execute(text("SELECT pg_advisory_unlock(:clave)"), {"clave": CLAVE_LOCK})
+
+
+def crear_admin_inicial():
+    """Crea el admin de ADMIN_USERNAME/ADMIN_PASSWORD si no hay ninguno."""
+    admin_existente = User.query.filter_by(is_admin=True).first()
+    if admin_existente:
+        print(f">>Ya existe un administrador: {admin_existente.username}")
+        return
+
+    admin_user = os.environ.get("ADMIN_USERNAME")
+    admin_pass = os.environ.get("ADMIN_PASSWORD")
+    admin_nombre = os.environ.get("ADMIN_NOMBRE", "Administrador")
+
+    if admin_user and admin_pass:
+        nuevo_admin = User(
+            username=admin_user,
+            password=generate_password_hash(admin_pass),
+            nombre=admin_nombre,
+            is_admin=True
+        )
+        db.session.add(nuevo_admin)
+        db.session.commit()
+        print(f">>Admin '{admin_user}' creado correctamente.")
+    else:
+        print("No se creó ningún admin (faltan variables de entorno).")
+
+
+def bootstrap():
+    """Idempotente: se puede correr en cada deploy o desde varios procesos.
+
+    Debe llamarse dentro de un app_context.
+    """
+    from flask_migrate import upgrade
+
+    with _bloqueo_global():
+        # Crear tablas si no existen (las migraciones son defensivas)
+        db.create_all()
+        upgrade()
+        print("Migraciones Alembic (flask db upgrade) aplicadas.")
+        crear_admin_inicial()
@@ -0,0 +1,51 @@
+# =========================================================
+# 🧠 CACHE LRU EN MEMORIA CON TOPE DE BYTES
+# =========================================================
+# Un cache por proceso (cada worker tiene el suyo). Guarda valores bytes
+# y desaloja los menos usados cuando la suma supera `max_bytes`.
+import threading
+from collections import OrderedDict
+
+
+class CacheLRU:
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.aciertos = 0
+        self.fallos = 0
+        self._datos = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, clave):
+        with self._lock:
+            valor = self._datos.get(clave)
+            if valor is None:
+                self.fallos += 1
+                return None
+            self._datos.move_to_end(clave)
+            self.aciertos += 1
+            return valor
+
+    def put(self, clave, valor):
+        tamanio = len(valor)
+        if tamanio > self.max_bytes:
+            return
+        with self._lock:
+            anterior = self._datos.pop(clave, None)
+            if anterior is not None:
+                self.bytes -= len(anterior)
+            self._datos[clave] = valor
+            self.bytes += tamanio
+            while self.bytes > self.max_bytes:
+                _, desalojado = self._datos.popitem(last=False)
+                self.bytes -= len(desalojado)
+
+    def estadisticas(self):
+        with self._lock:
+            return {
+                "entradas": len(self._datos),
+                "bytes": self.bytes,
+                "max_bytes": self.max_bytes,
+                "aciertos": self.aciertos,
+                "fallos": self.fallos,
+            }
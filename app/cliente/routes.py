@@ -1,19 +1,16 @@
-import os
-from flask import Blueprint, json, jsonify, render_template, redirect, request, url_for, flash, make_response
+from flask import Blueprint, Response, abort, current_app, json, jsonify, render_template, redirect, request, stream_with_context, url_for, flash, make_response
 from flask_login import login_required, current_user
-from app.forms import MedicionForm, AlumnoForm, EditarMedicionForm
+from app.forms import MedicionForm, AlumnoForm, EditarMedicionForm, ImportarMedicionesForm
+from app.importacion import ErrorImportacion, importar_mediciones
 from app.models import MedicionCorporal, Alumno
+from app.progreso import mensajes_progreso, resumen_de_mediciones
 from app.extensions import db
 from app.cliente import cliente
-from reportlab.lib.pagesizes import letter
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-from reportlab.lib import colors
-from reportlab.lib.styles import getSampleStyleSheet
-import io
+from app.condicional import condicional, version_propia
+from app.instrumentacion import presupuesto_consultas
 from datetime import datetime, date
-from reportlab.platypus import Image
+from sqlalchemy import select
 import base64
-from config import BASE_DIR
 
 
 # -------------------------------------------------------------------
@@ -21,37 +18,15 @@ from config import BASE_DIR
 # -------------------------------------------------------------------
 @cliente.route('/dashboard')
 @login_required
+@condicional(version_propia)
+@presupuesto_consultas(5)
 def home():
-    alumnos = Alumno.query.filter_by(cliente_id=current_user.id).all()
-    total_alumnos = len(alumnos)
-
-    mediciones = MedicionCorporal.query.filter(
-        MedicionCorporal.alumno_id.in_([a.id for a in alumnos])
-    ).all()
-    total_mediciones = len(mediciones)
-
-    ultima = max([m.fecha for m in mediciones], default=None)
-    ultima_medicion = ultima.strftime('%d/%m/%Y') if ultima else "Sin registros"
-
-    alumnos_recientes = Alumno.query.filter_by(cliente_id=current_user.id)\
-        .order_by(Alumno.fecha_creacion.desc()).limit(3).all()
-    for a in alumnos_recientes:
-        ultima_m = MedicionCorporal.query.filter_by(alumno_id=a.id)\
-            .order_by(MedicionCorporal.fecha.desc()).first()
-        a.ultima_medicion = ultima_m.fecha.strftime('%d/%m/%Y') if ultima_m else "Sin datos"
-
-    fechas = [m.fecha.strftime('%d-%m') for m in mediciones]
-    pesos = [m.peso for m in mediciones]
+    from app.tablero import datos_inicio
 
     return render_template(
         "cliente/dashboard.html",
         titulo="Inicio - GymApp",
-        total_alumnos=total_alumnos,
-        total_mediciones=total_mediciones,
-        ultima_medicion=ultima_medicion,
-        alumnos_recientes=alumnos_recientes,
-        fechas=fechas,
-        pesos=pesos
+        **datos_inicio(db.session.connection(), current_user)
     )
 
 
@@ -62,6 +37,7 @@ from datetime import date
 
 @cliente.route('/medicion', methods=['GET', 'POST'])
 @login_required
+@presupuesto_consultas(16)
 def medicion():
     form = MedicionForm()
 
@@ -77,6 +53,8 @@ def medicion():
     alumno_fijo = None
     if alumno_id:
         alumno_fijo = Alumno.query.get_or_404(alumno_id)
+        if alumno_fijo.cliente_id != current_user.id:
+            abort(403)
         form.alumno.data = alumno_fijo.id
    
     if form.validate_on_submit():
@@ -120,10 +98,11 @@ def medicion():
 # -------------------------------------------------------------------
 # AJAX: chequear si existe medición para (alumno, fecha)
 # -------------------------------------------------------------------
-
-
+# El formulario usa fechas_alumno (una sola consulta por alumno); esta
+# ruta queda para quien pregunte por una fecha puntual.
 @cliente.route('/check-medicion', methods=['GET'])
 @login_required
+@presupuesto_consultas(3)
 def check_medicion():
     alumno_id = request.args.get('alumno_id', type=int)
     fecha_str = request.args.get('fecha')
@@ -133,21 +112,56 @@ def check_medicion():
 
     # fecha viene como 'YYYY-MM-DD' del input type="date"
     try:
-        year, month, day = map(int, fecha_str.split('-'))
-        f = date(year, month, day)
-    except Exception:
+        f = date.fromisoformat(fecha_str)
+    except ValueError:
         return jsonify({"exists": False})
 
-    existe = MedicionCorporal.query.filter_by(alumno_id=alumno_id, fecha=f).first() is not None
+    # Solo alumnos del cliente logueado
+    existe = db.session.execute(
+        select(MedicionCorporal.id)
+        .join(Alumno, Alumno.id == MedicionCorporal.alumno_id)
+        .where(
+            MedicionCorporal.alumno_id == alumno_id,
+            MedicionCorporal.fecha == f,
+            Alumno.cliente_id == current_user.id,
+        )
+        .limit(1)
+    ).first() is not None
     return jsonify({"exists": existe})
 
 
+# -------------------------------------------------------------------
+# IMPORTAR MEDICIONES DESDE CSV / XLSX
+# -------------------------------------------------------------------
+@cliente.route('/mediciones/importar', methods=['GET', 'POST'])
+@login_required
+@presupuesto_consultas(40)  # ~13 por tanda de 2000 filas
+def importar():
+    form = ImportarMedicionesForm()
+    reporte = None
+
+    if form.validate_on_submit():
+        archivo = form.archivo.data
+        try:
+            reporte = importar_mediciones(archivo.stream, archivo.filename, current_user.id)
+        except ErrorImportacion as e:
+            flash(f"⚠️ {e}", "danger")
+            return redirect(url_for('cliente.importar'))
+
+        if reporte["insertadas"]:
+            flash(f"✅ Se importaron {reporte['insertadas']} mediciones.", "success")
+        if reporte["errores"] or reporte["omitidas"]:
+            flash("Algunas filas no se importaron, revisá el detalle.", "warning")
+
+    return render_template('cliente/importar_mediciones.html', form=form, reporte=reporte)
+
 
 # -------------------------------------------------------------------
 # CREAR NUEVO ALUMNO
 # -------------------------------------------------------------------
 @cliente.route('/alumno/nuevo', methods=['GET', 'POST'])
 @login_required
+@presupuesto_consultas(7)
 def nuevo_alumno():
     form = AlumnoForm()
     if form.validate_on_submit():
@@ -170,6 +184,7 @@ def nuevo_alumno():
 # -------------------------------------------------------------------
 @cliente.route('/alumnos')
 @login_required
+@presupuesto_consultas(3)
 def listar_alumnos():
     alumnos = Alumno.query.filter_by(cliente_id=current_user.id).all()
     return render_template('cliente/alumnos.html', alumnos=alumnos)
@@ -180,8 +195,13 @@ def listar_alumnos():
 # -------------------------------------------------------------------
 @cliente.route('/alumno/<int:id>/mediciones')
 @login_required
+@condicional(version_propia)
+@presupuesto_consultas(5)
 def mediciones_alumno(id):
     alumno = Alumno.query.get_or_404(id)
+    # El ETag sale de la versión del cliente logueado: solo sus alumnos
+    if alumno.cliente_id != current_user.id:
+        abort(403)
 
     mediciones = (
         MedicionCorporal.query
@@ -190,171 +210,187 @@ def mediciones_alumno(id):
         .all()
     )
 
-    fechas = [m.fecha.strftime('%d-%m') for m in mediciones]
-    pesos = [m.peso for m in mediciones]
-    imcs = [m.imc for m in mediciones]
-    metabolismo = [m.metabolismo_basal for m in mediciones]
-    grasas = [m.grasa_corporal for m in mediciones]
-    musculos = [m.musculo for m in mediciones]
-    aguas = [m.agua_corporal for m in mediciones]
-
-    resumen = []
-    estado_progreso = "neutral"  # default
-
-    if len(mediciones) >= 2:
-        anterior = mediciones[-2]
-        actual   = mediciones[-1]
-
-        dif_peso   = round(actual.peso - anterior.peso, 2)
-        dif_imc    = round(actual.imc - anterior.imc, 2)
-        dif_musc   = round(actual.musculo - anterior.musculo, 2)
-        dif_grasa  = round(actual.grasa_corporal - anterior.grasa_corporal, 2)
-        dif_agua   = round(actual.agua_corporal - anterior.agua_corporal, 2)
-
-        # Mensajes (no definen el estado)
-        if dif_peso > 0:
-            resumen.append(f"⚖️ Subió {dif_peso} kg de peso.")
-        elif dif_peso < 0:
-            resumen.append(f"⚖️ Bajó {abs(dif_peso)} kg de peso.")
-
-        if dif_imc > 0:
-            resumen.append(f"📈 El IMC subió {dif_imc} puntos.")
-        elif dif_imc < 0:
-            resumen.append(f"📉 El IMC bajó {abs(dif_imc)} puntos.")
-
-        if dif_musc > 0:
-            resumen.append(f"💪 La masa muscular aumentó {dif_musc} puntos.")
-        elif dif_musc < 0:
-            resumen.append(f"💤 La masa muscular bajó {abs(dif_musc)} puntos.")
-
-        if dif_grasa > 0:
-            resumen.append(f"⚠️ El porcentaje de grasa aumentó {dif_grasa} puntos.")
-        elif dif_grasa < 0:
-            resumen.append(f"🔥 Redujo la grasa corporal en {abs(dif_grasa)} puntos.")
-
-        if dif_agua > 0:
-            resumen.append(f"💧 Aumentó la hidratación en {dif_agua} %.")
-        elif dif_agua < 0:
-            resumen.append(f"💧 Bajó el nivel de agua corporal {abs(dif_agua)} %.")
-
-        # --------- DECISIÓN DEL ESTADO (score simple) ----------
-        score = 0
-        if dif_musc > 0: score += 1
-        if dif_grasa < 0: score += 1
-        if dif_grasa > 0: score -= 1
-        if dif_musc < 0: score -= 1
-        # (opcional) peso ayuda si acompaña grasa ↓
-        if dif_peso < 0 and dif_grasa < 0: score += 1
-
-        if score >= 1:
-            estado_progreso = "positivo"
-            resumen.insert(0, "💪 El progreso es excelente, ¡seguí así!")
-        elif score <= -1:
-            estado_progreso = "negativo"
-            resumen.insert(0, "⚠️ Algunos indicadores empeoraron, revisá entrenamiento y/o dieta.")
-        else:
-            estado_progreso = "neutral"
-            resumen.insert(0, "💧 Progreso estable entre las últimas mediciones.")
-    else:
-        resumen = ["🩺 Aún no hay suficientes mediciones para mostrar evolución."]
-        estado_progreso = "neutral"
+    # Los gráficos piden sus datos aparte (series_alumno), al hacerse visibles
+
+    # Progreso desde la tabla de resumen; si la fila falta (base tocada a
+    # mano) se calcula con las mediciones ya cargadas, sin escribir en un GET
+    resumen_alumno = alumno.resumen or resumen_de_mediciones(mediciones)
+
+    resumen = mensajes_progreso(resumen_alumno)
+    estado_progreso = resumen_alumno.estado_progreso if resumen_alumno else "neutral"
 
     return render_template(
         'cliente/datos_de_alumno.html',
         alumno=alumno,
         mediciones=mediciones,
-        fechas=fechas,
-        pesos=pesos,
-        imcs=imcs,
-        metabolismo=metabolismo,
-        grasas=grasas,
-        musculos=musculos,
-        aguas=aguas,
         resumen=resumen,
         estado_progreso=estado_progreso,  # <- clave
         alumno_id=alumno.id
     )
 
 
-
-
-
-
-
-
 @cliente.route("/alumno/<int:id>/exportar_pdf", methods=["GET", "POST"])
 @login_required
+@presupuesto_consultas(4)
 def exportar_pdf(id):
-    # 🧩 Recibir los gráficos desde el frontend
-    graficos_json = request.form.get("graficos")
-    graficos = json.loads(graficos_json) if graficos_json else {}
+    from app.reportes import datos_reporte, pdf_con_cache
 
     alumno = Alumno.query.get_or_404(id)
-    mediciones = alumno.mediciones
-
-    # 🧾 Configuración del PDF
-    buffer = io.BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=letter)
-    elements = []
-    styles = getSampleStyleSheet()
-
-    # 🏋️ Encabezado
-    titulo = Paragraph(f"<b>Reporte de Mediciones - {alumno.nombre}</b>", styles['Title'])
-    fecha = Paragraph(f"<b>Fecha de emisión:</b> {datetime.now().strftime('%d/%m/%Y')}", styles['Normal'])
-    elements.extend([titulo, Spacer(1, 12), fecha, Spacer(1, 20)])
-
-    # 📋 Tabla de mediciones
-    data = [["Fecha", "Peso (kg)", "Altura (cm)", "IMC", "Metabolismo", "Grasa (%)", "Músculo (%)", "Agua (%)"]]
-    for m in mediciones:
-        data.append([
-            m.fecha.strftime('%d/%m/%Y'),
-            m.peso, m.altura, m.imc,
-            m.metabolismo_basal, m.grasa_corporal,
-            m.musculo, m.agua_corporal
-        ])
-
-    table = Table(data, repeatRows=1)
-    table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor("#1f4e79")),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('GRID', (0, 0), (-1, -1), 0.25, colors.grey),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.whitesmoke),
-    ]))
-
-    elements.append(table)
-
-    # 🧱 Separador antes de los gráficos
-    elements.append(Spacer(1, 25))
-    elements.append(Paragraph("<b>Evolución del Progreso</b>", styles['Heading2']))
-    elements.append(Spacer(1, 10))
-
-    # 🖼️ Agregar todos los gráficos recibidos
-    for nombre, grafico_base64 in graficos.items():
-        if grafico_base64 and grafico_base64.startswith("data:image/png;base64,"):
-            grafico_bytes = base64.b64decode(grafico_base64.split(",")[1])
-            grafico_path = os.path.join(BASE_DIR, f"grafico_{nombre}.png")
-
-            with open(grafico_path, "wb") as f:
-                f.write(grafico_bytes)
-
-            # Subtítulo con el nombre del gráfico
-            titulo_grafico = Paragraph(f"<b>{nombre.capitalize()}</b>", styles['Heading3'])
-            elements.append(titulo_grafico)
-            elements.append(Spacer(1, 8))
-            elements.append(Image(grafico_path, width=500, height=250))
-            elements.append(Spacer(1, 15))
-
-    # 🧾 Construir PDF
-    doc.build(elements)
-    pdf = buffer.getvalue()
-    buffer.close()
+    if alumno.cliente_id != current_user.id:
+        abort(403)
+
+    # 🧩 Gráficos: por defecto se dibujan en el servidor. Se siguen
+    # aceptando capturas del frontend (PNG en base64, decodificadas en
+    # memoria: nada se escribe a disco)
+    graficos_json = request.form.get("graficos")
+    graficos = None
+    if graficos_json:
+        graficos = {}
+        for nombre, grafico_base64 in json.loads(graficos_json).items():
+            if grafico_base64 and grafico_base64.startswith("data:image/png;base64,"):
+                graficos[nombre] = base64.b64decode(grafico_base64.split(",")[1])
+
+    mediciones = (
+        MedicionCorporal.query
+        .filter_by(alumno_id=alumno.id)
+        .order_by(MedicionCorporal.fecha.asc())
+        .all()
+    )
+    clave, pdf = pdf_con_cache(datos_reporte(alumno, mediciones), graficos)
 
     # 📤 Enviar PDF al navegador
     response = make_response(pdf)
     response.headers['Content-Type'] = 'application/pdf'
     response.headers['Content-Disposition'] = f'attachment; filename=Reporte_{alumno.nombre}.pdf'
+    response.set_etag(clave)
+    return response
+
+
+# -------------------------------------------------------------------
+# REPORTES DE TODOS LOS ALUMNOS (ZIP, generado en streaming)
+# -------------------------------------------------------------------
+@cliente.route("/alumnos/reportes.zip")
+@login_required
+@presupuesto_consultas(2)
+def exportar_reportes_zip():
+    from app.lote_reportes import datos_alumnos, generar_pdfs, zip_en_streaming
+
+    consulta = Alumno.query.filter_by(cliente_id=current_user.id)
+    # ?ids=1,2,3 para una selección (siempre dentro de los propios alumnos)
+    ids = {int(i) for i in request.args.get("ids", "").split(",") if i.strip().isdigit()}
+    if ids:
+        consulta = consulta.filter(Alumno.id.in_(ids))
+
+    # Se renderizan en serie dentro del worker: tope de alumnos por ZIP
+    maximo = current_app.config["REPORTES_MAX_ALUMNOS_WEB"]
+    cantidad = min(len(ids), current_user.total_alumnos) if ids else current_user.total_alumnos
+    if cantidad > maximo:
+        flash(f"⚠️ Se pueden descargar hasta {maximo} reportes por ZIP; elegí una selección de alumnos.", "warning")
+        return redirect(url_for("cliente.listar_alumnos"))
+
+    pdfs = generar_pdfs(datos_alumnos(consulta))
+    response = Response(stream_with_context(zip_en_streaming(pdfs)), mimetype="application/zip")
+    response.headers['Content-Disposition'] = 'attachment; filename=Reportes_alumnos.zip'
+    return response
+
+
+# -------------------------------------------------------------------
+# GRÁFICO DE EVOLUCIÓN (SVG generado en el servidor)
+# -------------------------------------------------------------------
+@cliente.route("/alumno/<int:id>/grafico/<serie>.svg")
+@login_required
+@presupuesto_consultas(4)
+def grafico_alumno(id, serie):
+    from app.graficos import SERIES, etag_grafico, grafico_con_cache
+
+    if serie not in SERIES:
+        abort(404)
+    alumno = Alumno.query.get_or_404(id)
+    if alumno.cliente_id != current_user.id:
+        abort(403)
+
+    # Mientras no cambien las mediciones el navegador reusa su copia
+    etag = etag_grafico(alumno, serie)
+    if etag in request.if_none_match:
+        response = make_response("", 304)
+    else:
+        contenido = grafico_con_cache(
+            alumno, serie,
+            lambda: MedicionCorporal.query
+            .filter_by(alumno_id=alumno.id)
+            .order_by(MedicionCorporal.fecha.asc())
+            .all(),
+        )
+        response = make_response(contenido)
+        response.headers['Content-Type'] = 'image/svg+xml'
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+# -------------------------------------------------------------------
+# SERIES DE MEDICIONES (JSON para los gráficos, reducidas con LTTB)
+# -------------------------------------------------------------------
+@cliente.route("/alumno/<int:id>/series.json")
+@login_required
+@presupuesto_consultas(4)
+def series_alumno(id):
+    from app.series import MIN_PUNTOS, series_alumno as calcular_series
+
+    alumno = Alumno.query.get_or_404(id)
+    if alumno.cliente_id != current_user.id:
+        abort(403)
+
+    try:
+        desde = date.fromisoformat(request.args["desde"]) if request.args.get("desde") else None
+        hasta = date.fromisoformat(request.args["hasta"]) if request.args.get("hasta") else None
+    except ValueError:
+        abort(400, description="Fechas en formato AAAA-MM-DD")
+    max_puntos = request.args.get("max_points", type=int)
+    if max_puntos is not None and max_puntos < MIN_PUNTOS:
+        abort(400, description=f"max_points debe ser al menos {MIN_PUNTOS}")
+
+    etag = f"{alumno.id}-{alumno.version_mediciones}-{desde}-{hasta}-{max_puntos}"
+    if etag in request.if_none_match:
+        response = make_response("", 304)
+    else:
+        datos = calcular_series(db.session.connection(), alumno.id, desde, hasta, max_puntos)
+        response = jsonify(alumno_id=alumno.id, **datos)
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+# -------------------------------------------------------------------
+# FECHAS CON MEDICIÓN DE UN ALUMNO (duplicados del formulario)
+# -------------------------------------------------------------------
+# medicion.html las pide una vez por alumno y valida cada fecha en el
+# navegador. El ETag sigue a version_mediciones: mientras no cambien sus
+# mediciones, volver a pedirlas es un 304.
+@cliente.route("/alumno/<int:id>/fechas.json")
+@login_required
+@presupuesto_consultas(4)
+def fechas_alumno(id):
+    from app.series import fechas_ocupadas
+
+    alumno = Alumno.query.get_or_404(id)
+    if alumno.cliente_id != current_user.id:
+        abort(403)
+
+    try:
+        desde = date.fromisoformat(request.args["desde"]) if request.args.get("desde") else None
+        hasta = date.fromisoformat(request.args["hasta"]) if request.args.get("hasta") else None
+    except ValueError:
+        abort(400, description="Fechas en formato AAAA-MM-DD")
+
+    etag = f"fechas-{alumno.id}-{alumno.version_mediciones}-{desde}-{hasta}"
+    if etag in request.if_none_match:
+        response = make_response("", 304)
+    else:
+        fechas = fechas_ocupadas(db.session.connection(), alumno.id, desde, hasta)
+        response = jsonify(alumno_id=alumno.id, fechas=fechas)
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, no-cache'
     return response
 
 
@@ -363,6 +399,7 @@ def exportar_pdf(id):
 # -------------------------------------------------------------------
 @cliente.route('/alumno/<int:id>/editar', methods=['GET', 'POST'])
 @login_required
+@presupuesto_consultas(5)
 def editar_alumno(id):
     alumno = Alumno.query.get_or_404(id)
 
@@ -388,6 +425,7 @@ def editar_alumno(id):
 # -------------------------------------------------------------------
 @cliente.route('/alumno/<int:id>/eliminar')
 @login_required
+@presupuesto_consultas(10)
 def eliminar_alumno(id):
     alumno = Alumno.query.get_or_404(id)
 
@@ -406,6 +444,7 @@ def eliminar_alumno(id):
 # -------------------------------------------------------------------
 @cliente.route('/alumno/<int:id_alumno>/medicion/<int:id_medicion>/editar', methods=['GET', 'POST'])
 @login_required
+@presupuesto_consultas(11)
 def editar_medicion(id_alumno, id_medicion):
     alumno = Alumno.query.get_or_404(id_alumno)
     medicion = MedicionCorporal.query.get_or_404(id_medicion)
@@ -459,6 +498,7 @@ def editar_medicion(id_alumno, id_medicion):
 # -------------------------------------------------------------------
 @cliente.route("/alumno/<int:id_alumno>/medicion/<int:id_medicion>/eliminar")
 @login_required
+@presupuesto_consultas(13)
 def eliminar_medicion(id_alumno, id_medicion):
     medicion = MedicionCorporal.query.get_or_404(id_medicion)
 
@@ -0,0 +1,314 @@
+# =========================================================
+# 🛠️ COMANDOS DE MANTENIMIENTO (flask jge ...)
+# =========================================================
+import click
+from flask.cli import AppGroup
+
+jge = AppGroup("jge", help="Comandos de mantenimiento de JgeFiTrack.")
+
+
+@jge.command("recalcular")
+@click.option("--tanda", default=5000, show_default=True, help="Filas por tanda.")
+@click.option("--verificar", is_flag=True, help="Solo compara contra los métodos escalares, sin escribir.")
+@click.option("--muestra", default=1000, show_default=True, help="Filas a comparar con --verificar.")
+def recalcular(tanda, verificar, muestra):
+    """Recalcula IMC, grasa, agua, músculo, etc. de todas las mediciones."""
+    from app.recalculo import recalcular_mediciones, verificar_paridad
+
+    if verificar:
+        diferencias = verificar_paridad(muestra)
+        for id_, col, escalar, vectorial in diferencias[:20]:
+            click.echo(f"  medición {id_}: {col} escalar={escalar} vectorial={vectorial}")
+        if diferencias:
+            raise click.ClickException(f"{len(diferencias)} valores no coinciden.")
+        click.echo("Paridad OK: el cálculo vectorial coincide con calcular_todo().")
+        return
+
+    resultado = recalcular_mediciones(
+        tamanio_tanda=tanda,
+        progreso=lambda n: click.echo(f"  {n} mediciones recalculadas..."),
+    )
+    click.echo(
+        f"Listo: {resultado['filas']} mediciones en {resultado['segundos']:.2f}s "
+        f"({resultado['filas_por_segundo']:.0f} filas/s)."
+    )
+
+
+@jge.command("importar-mediciones")
+@click.argument("archivo", type=click.Path(exists=True, dir_okay=False))
+@click.option("--cliente", "username", required=True, help="Usuario dueño de los alumnos.")
+@click.option("--tanda", default=2000, show_default=True, help="Filas por tanda.")
+def importar_mediciones_cmd(archivo, username, tanda):
+    """Importa mediciones desde un CSV o XLSX."""
+    from app.importacion import ErrorImportacion, importar_mediciones
+    from app.models import User
+
+    cliente = User.query.filter_by(username=username).first()
+    if not cliente:
+        raise click.ClickException(f"No existe el usuario '{username}'.")
+
+    with open(archivo, "rb") as f:
+        try:
+            reporte = importar_mediciones(
+                f, archivo, cliente.id, tamanio_tanda=tanda,
+                progreso=lambda r: click.echo(f"  {r.insertadas} insertadas, {r.omitidas} omitidas, {r.errores} con error..."),
+            )
+        except ErrorImportacion as e:
+            raise click.ClickException(str(e))
+
+    for d in reporte["detalle"]:
+        click.echo(f"  fila {d['fila']} ({d['alumno'] or '-'}): {d['motivo']}")
+    click.echo(
+        f"Listo: {reporte['insertadas']} insertadas, {reporte['omitidas']} omitidas, "
+        f"{reporte['errores']} con error."
+    )
+
+
+@jge.command("reconstruir-resumenes")
+def reconstruir_resumenes_cmd():
+    """Regenera desde cero la tabla de resumen de progreso por alumno."""
+    from app.extensions import db
+    from app.progreso import reconstruir_resumenes
+
+    total = reconstruir_resumenes(db.session.connection())
+    db.session.commit()
+    click.echo(f"Listo: {total} resúmenes regenerados.")
+
+
+@jge.command("recontar")
+def recontar_cmd():
+    """Recalcula los contadores de alumnos y mediciones de User y Alumno."""
+    from app.contadores import recontar
+    from app.extensions import db
+
+    recontar(db.session.connection())
+    db.session.commit()
+    click.echo("Listo: contadores recalculados.")
+
+
+@jge.command("sincronizar-suscripciones")
+def sincronizar_suscripciones_cmd():
+    """Recalcula User.activo_hasta a partir de los pagos aprobados."""
+    from app.extensions import db
+    from app.suscripciones import sincronizar_suscripciones
+
+    activos = sincronizar_suscripciones(db.session.connection())
+    db.session.commit()
+    click.echo(f"Listo: {activos} clientes con suscripción activa.")
+
+
+@jge.command("reconstruir-ingresos")
+@click.option("--desde", default=None, help="Primer mes a regenerar (AAAA-MM). Por defecto, el mes actual.")
+def reconstruir_ingresos_cmd(desde):
+    """Regenera el consolidado de ingresos por mes y cliente."""
+    from datetime import datetime
+
+    from app.extensions import db
+    from app.ingresos import reconstruir_ingresos
+
+    if desde:
+        try:
+            desde = datetime.strptime(desde, "%Y-%m").date()
+        except ValueError:
+            raise click.BadParameter("usar el formato AAAA-MM", param_hint="--desde")
+    filas = reconstruir_ingresos(db.session.connection(), desde)
+    db.session.commit()
+    click.echo(f"Listo: {filas} filas de ingresos regeneradas.")
+
+
+@jge.command("reconciliar-estadisticas")
+def reconciliar_estadisticas_cmd():
+    """Recalcula los totales y las altas diarias del dashboard del admin."""
+    from app.estadisticas import reconciliar_estadisticas
+    from app.extensions import db
+
+    cambios = reconciliar_estadisticas(db.session.connection())
+    db.session.commit()
+    for campo, (antes, despues) in cambios.items():
+        marca = "" if antes == despues else "  <- corregido"
+        click.echo(f"  {campo}: {antes} -> {despues}{marca}")
+    click.echo("Listo: estadísticas reconciliadas.")
+
+
+@jge.command("exportar-datos")
+@click.option("--salida", required=True, type=click.Path(dir_okay=False), help="Archivo a escribir.")
+@click.option("--formato", type=click.Choice(["ndjson", "csv"]), default="ndjson", show_default=True)
+@click.option("--tabla", default=None, help="Solo esta tabla (obligatoria con --formato csv).")
+@click.option("--gzip", "comprimir", is_flag=True, help="Comprimir la salida con gzip.")
+def exportar_datos_cmd(salida, formato, tabla, comprimir):
+    """Exporta usuarios, alumnos, mediciones y pagos (backup)."""
+    import hashlib
+    import os
+    import time
+
+    from app.exportacion import ErrorExportacion, exportar, validar
+
+    try:
+        validar(formato, tabla)
+    except ErrorExportacion as e:
+        raise click.ClickException(str(e))
+
+    inicio = time.perf_counter()
+    conteos = {}
+    sha256 = hashlib.sha256()
+    with open(salida, "wb") as f:
+        for bloque in exportar(formato, tabla, comprimir, conteos):
+            f.write(bloque)
+            sha256.update(bloque)
+    segundos = time.perf_counter() - inicio
+
+    # Formato de sha256sum: se verifica con `sha256sum -c archivo.sha256`
+    with open(salida + ".sha256", "w") as f:
+        f.write(f"{sha256.hexdigest()}  {os.path.basename(salida)}\n")
+
+    for nombre, n in conteos.items():
+        click.echo(f"  {nombre}: {n} filas")
+    click.echo(
+        f"Listo: {sum(conteos.values())} filas, {os.path.getsize(salida) / 1e6:.1f} MB "
+        f"en {segundos:.2f}s -> {salida}"
+    )
+    click.echo(f"  sha256: {sha256.hexdigest()}")
+
+
+@jge.command("restaurar")
+@click.argument("archivos", nargs=-1, required=True)
+@click.option("--remapear", is_flag=True, help="Agregar a los datos existentes con ids nuevos.")
+@click.option("--vaciar", is_flag=True, help="Borrar todos los datos antes de restaurar.")
+@click.option("--lote", default=10000, show_default=True, help="Filas por lote de carga.")
+def restaurar_cmd(archivos, remapear, vaciar, lote):
+    """Restaura un backup de `exportar-datos`.
+
+    ARCHIVOS: un NDJSON (.ndjson o .ndjson.gz) o varios CSV como
+    tabla=archivo.csv (p. ej. user=u.csv alumno=a.csv ...).
+    """
+    from contextlib import ExitStack
+    from itertools import chain
+
+    from app.exportacion import TABLAS
+    from app.extensions import db
+    from app.restauracion import ErrorRestauracion, abrir, leer_csv, leer_ndjson, restaurar
+
+    if remapear and vaciar:
+        raise click.UsageError("--remapear y --vaciar no se pueden combinar.")
+
+    csvs, ndjsons = {}, []
+    for archivo in archivos:
+        tabla, _, ruta = archivo.rpartition("=")
+        if tabla:
+            if tabla not in TABLAS:
+                raise click.BadParameter(f"tabla desconocida: {tabla}", param_hint="ARCHIVOS")
+            csvs[tabla] = ruta
+        else:
+            ndjsons.append(ruta)
+    if len(ndjsons) > 1 or (ndjsons and csvs):
+        raise click.UsageError("Pasar un solo NDJSON o solo CSV (tabla=archivo).")
+
+    esperadas = {}
+    with ExitStack() as pila:
+        if ndjsons:
+            registros = leer_ndjson(pila.enter_context(abrir(ndjsons[0])), esperadas)
+        else:
+            # En orden de dependencias, sin importar el de la línea de comandos
+            registros = chain.from_iterable(
+                leer_csv(pila.enter_context(abrir(csvs[t])), t) for t in TABLAS if t in csvs
+            )
+        try:
+            reporte = restaurar(
+                db.session.connection(), registros, remapear=remapear, vaciar=vaciar,
+                esperadas=esperadas, tamanio_lote=lote,
+                progreso=lambda tabla, n: click.echo(f"  {tabla}: {n} filas...") if n % (lote * 10) == 0 else None,
+            )
+        except (ErrorRestauracion, ValueError, KeyError) as e:
+            db.session.rollback()
+            raise click.ClickException(f"Restauración cancelada, no se cambió nada: {e}")
+    db.session.commit()
+
+    for tabla, n in reporte.filas.items():
+        click.echo(f"  {tabla}: {n} filas")
+    click.echo(
+        f"Listo: {reporte.total} filas en {reporte.segundos:.1f}s "
+        f"({reporte.total / max(reporte.segundos, 1e-9):.0f} filas/s), derivados regenerados."
+    )
+
+
+@jge.command("explicar")
+@click.option("--verbose", "-v", is_flag=True, help="Muestra el plan completo de cada consulta.")
+def explicar_cmd(verbose):
+    """Verifica con EXPLAIN que las consultas frecuentes usen índices."""
+    from app.explicar import revisar_planes
+    from app.extensions import db
+
+    resultados = revisar_planes(db.session.connection())
+    db.session.rollback()
+
+    for nombre, usa_indice, plan in resultados:
+        click.echo(f"  [{'OK' if usa_indice else 'SCAN'}] {nombre}")
+        if verbose or not usa_indice:
+            for linea in plan.splitlines():
+                click.echo(f"        {linea}")
+    fallidas = sum(1 for _, usa_indice, _ in resultados if not usa_indice)
+    if fallidas:
+        raise click.ClickException(f"{fallidas} consultas recorren tablas completas.")
+    click.echo(f"Listo: las {len(resultados)} consultas usan índices.")
+
+
+@jge.command("bootstrap")
+def bootstrap_cmd():
+    """Crea tablas, aplica migraciones y siembra el admin (idempotente)."""
+    from app.bootstrap import bootstrap
+
+    bootstrap()
+    click.echo("Listo: base preparada.")
+
+
+@jge.command("exportar-reportes")
+@click.option("--cliente", "username", required=True, help="Usuario dueño de los alumnos.")
+@click.option("--salida", type=click.Path(dir_okay=False, writable=True), help="Archivo ZIP a escribir.")
+@click.option("--procesos", default=0, show_default=True, help="Procesos del pool (0 = uno por núcleo).")
+@click.option("--benchmark", is_flag=True, help="Mide reportes/s con 1..N procesos, sin escribir el ZIP.")
+def exportar_reportes_cmd(username, salida, procesos, benchmark):
+    """Genera los PDFs de todos los alumnos de un cliente en un ZIP."""
+    import os
+    import time
+
+    from app.lote_reportes import datos_alumnos, generar_pdfs, zip_en_streaming
+    from app.models import Alumno, User
+
+    cliente = User.query.filter_by(username=username).first()
+    if not cliente:
+        raise click.ClickException(f"No existe el usuario '{username}'.")
+    consulta = Alumno.query.filter_by(cliente_id=cliente.id)
+    procesos = procesos or os.cpu_count() or 1
+
+    if benchmark:
+        # Los datos se leen una vez: se mide solo el render + ZIP
+        datos = list(datos_alumnos(consulta))
+        for n in sorted({1, 2, procesos} | set(range(4, procesos + 1, 4))):
+            inicio = time.perf_counter()
+            total = sum(len(b) for b in zip_en_streaming(generar_pdfs(iter(datos), n)))
+            segundos = time.perf_counter() - inicio
+            click.echo(
+                f"  {n} procesos: {len(datos)} reportes en {segundos:.2f}s "
+                f"({len(datos) / segundos:.1f} reportes/s, {total / 1e6:.1f} MB)"
+            )
+        return
+
+    if not salida:
+        raise click.ClickException("Indicá --salida (o usá --benchmark).")
+    inicio = time.perf_counter()
+    generados = 0
+
+    def progreso(n):
+        nonlocal generados
+        generados = n
+        if n % 10 == 0:
+            click.echo(f"  {n} reportes...")
+
+    with open(salida, "wb") as f:
+        for bloque in zip_en_streaming(generar_pdfs(datos_alumnos(consulta), procesos), progreso):
+            f.write(bloque)
+    segundos = time.perf_counter() - inicio
+    click.echo(
+        f"Listo: {generados} reportes en {segundos:.2f}s "
+        f"({generados / max(segundos, 1e-9):.1f} reportes/s, {procesos} procesos) -> {salida}"
+    )
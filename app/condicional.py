@@ -0,0 +1,103 @@
+# =========================================================
+# 🔁 RESPUESTAS CONDICIONALES (ETag / 304)
+# =========================================================
+# Una vista decorada con @condicional(calcular) primero arma un ETag
+# barato a partir de User.version_datos (app/versiones.py). Si el
+# navegador ya tiene esa versión se responde 304 sin correr la vista:
+# ni consultas ni template.
+import hashlib
+import threading
+from datetime import date
+from functools import wraps
+
+from flask import current_app, make_response, request, session
+from flask_login import current_user
+from sqlalchemy import func, select
+
+from app.extensions import db
+from app.models import User
+
+_lock = threading.Lock()
+# endpoint -> {"aciertos": n, "fallos": n, "omitidas": n} (por proceso)
+_estadisticas = {}
+
+
+def _contar(endpoint, tipo):
+    with _lock:
+        contadores = _estadisticas.setdefault(endpoint, {"aciertos": 0, "fallos": 0, "omitidas": 0})
+        contadores[tipo] += 1
+
+
+def estadisticas():
+    """Aciertos (304), fallos (render completo) y omitidas por endpoint."""
+    with _lock:
+        por_vista = {k: dict(v) for k, v in _estadisticas.items()}
+    aciertos = sum(v["aciertos"] for v in por_vista.values())
+    fallos = sum(v["fallos"] for v in por_vista.values())
+    return {
+        "vistas": por_vista,
+        "aciertos": aciertos,
+        "fallos": fallos,
+        "tasa_aciertos": round(aciertos / (aciertos + fallos), 4) if aciertos + fallos else None,
+    }
+
+
+# -------------------------------------------------------------------
+# VERSIONES PARA LOS ETAGS
+# -------------------------------------------------------------------
+def version_propia(**kwargs):
+    """Datos del cliente logueado (ya cargado por el user_loader: sin consultas)."""
+    return current_user.version_datos
+
+
+def version_de_cliente(cliente_id, **kwargs):
+    if not current_user.is_admin:
+        return None
+    return db.session.execute(
+        select(User.version_datos).where(User.id == cliente_id)
+    ).scalar()
+
+
+def version_global(**kwargs):
+    """Para vistas con datos de todos los clientes: cambia si cualquiera
+    sube de versión o si se crea / borra un cliente."""
+    if not current_user.is_admin:
+        return None
+    return tuple(db.session.execute(
+        select(func.count(), func.coalesce(func.sum(User.version_datos), 0), func.max(User.id))
+    ).one())
+
+
+def condicional(calcular):
+    """`calcular(**kwargs_de_la_vista)` devuelve la versión de los datos de
+    la página, o None para no usar ETag en esta petición."""
+    def decorador(vista):
+        @wraps(vista)
+        def envoltura(*args, **kwargs):
+            endpoint = request.endpoint
+            # Con mensajes flash pendientes la página no es la misma
+            version = None if session.get("_flashes") else calcular(**kwargs)
+            if version is None:
+                _contar(endpoint, "omitidas")
+                return vista(*args, **kwargs)
+
+            # También cambia con el día (vencimientos), el usuario y un deploy
+            clave = repr((
+                endpoint, sorted(kwargs.items()), current_user.get_id(), version,
+                date.today().isoformat(), current_app.extensions.get("estaticos_version"),
+            ))
+            etag = hashlib.sha1(clave.encode()).hexdigest()
+
+            if etag in request.if_none_match:
+                _contar(endpoint, "aciertos")
+                response = make_response("", 304)
+            else:
+                _contar(endpoint, "fallos")
+                response = make_response(vista(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+            response.set_etag(etag)
+            response.headers["Cache-Control"] = "private, no-cache"
+            return response
+        return envoltura
+    return decorador
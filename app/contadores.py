@@ -0,0 +1,134 @@
+# =========================================================
+# 🔢 CONTADORES DESNORMALIZADOS
+# =========================================================
+# User.total_alumnos, User.total_mediciones y Alumno.total_mediciones se
+# mantienen con UPDATE ... = x + n desde los eventos del mapper, así los
+# listados muestran totales sin cargar alumnos ni mediciones.
+from sqlalchemy import event, func, inspect, select, update
+
+from app.models import Alumno, MedicionCorporal, User
+from app.versiones import subir_version_datos
+
+_alumnos = Alumno.__table__
+_usuarios = User.__table__
+_mediciones = MedicionCorporal.__table__
+
+
+def _cliente_de(alumno_id):
+    return select(_alumnos.c.cliente_id).where(_alumnos.c.id == alumno_id).scalar_subquery()
+
+
+def _sumar_agrupado(conexion, tabla, por_id):
+    """total_mediciones += n para {id: n}: un UPDATE por cada n distinto."""
+    ids_por_n = {}
+    for id_, n in por_id.items():
+        if n:
+            ids_por_n.setdefault(n, []).append(id_)
+    for n, ids in ids_por_n.items():
+        conexion.execute(
+            update(tabla)
+            .where(tabla.c.id.in_(ids))
+            .values(total_mediciones=tabla.c.total_mediciones + n)
+        )
+
+
+def sumar_mediciones(conexion, por_alumno):
+    """Suma `n` mediciones a cada alumno de {alumno_id: n} y a su cliente.
+
+    Para escrituras en lote que no pasan por los eventos del ORM.
+    """
+    por_alumno = {alumno_id: n for alumno_id, n in por_alumno.items() if n}
+    if len(por_alumno) == 1:
+        # Lo de cada evento: sin buscar antes el cliente
+        (alumno_id, n), = por_alumno.items()
+        conexion.execute(
+            update(_usuarios)
+            .where(_usuarios.c.id == _cliente_de(alumno_id))
+            .values(total_mediciones=_usuarios.c.total_mediciones + n)
+        )
+        conexion.execute(
+            update(_alumnos)
+            .where(_alumnos.c.id == alumno_id)
+            .values(total_mediciones=_alumnos.c.total_mediciones + n)
+        )
+        return
+    if not por_alumno:
+        return
+
+    por_cliente = {}
+    for alumno_id, cliente_id in conexion.execute(
+        select(_alumnos.c.id, _alumnos.c.cliente_id).where(_alumnos.c.id.in_(list(por_alumno)))
+    ):
+        por_cliente[cliente_id] = por_cliente.get(cliente_id, 0) + por_alumno[alumno_id]
+    _sumar_agrupado(conexion, _usuarios, por_cliente)
+    _sumar_agrupado(conexion, _alumnos, por_alumno)
+
+
+def recontar(conexion):
+    """Recalcula todos los contadores desde cero (dos UPDATE masivos por tabla)."""
+    conexion.execute(
+        update(_alumnos).values(
+            total_mediciones=select(func.count())
+            .where(_mediciones.c.alumno_id == _alumnos.c.id)
+            .scalar_subquery()
+        )
+    )
+    conexion.execute(
+        update(_usuarios).values(
+            total_alumnos=select(func.count())
+            .where(_alumnos.c.cliente_id == _usuarios.c.id)
+            .scalar_subquery(),
+            total_mediciones=select(func.coalesce(func.sum(_alumnos.c.total_mediciones), 0))
+            .where(_alumnos.c.cliente_id == _usuarios.c.id)
+            .scalar_subquery(),
+        )
+    )
+    subir_version_datos(conexion)
+
+
+# -------------------------------------------------------------------
+# EVENTOS DEL MAPPER
+# -------------------------------------------------------------------
+@event.listens_for(MedicionCorporal, "after_insert")
+def _medicion_insertada(mapper, conexion, medicion):
+    sumar_mediciones(conexion, {medicion.alumno_id: 1})
+
+
+@event.listens_for(MedicionCorporal, "after_delete")
+def _medicion_borrada(mapper, conexion, medicion):
+    sumar_mediciones(conexion, {medicion.alumno_id: -1})
+
+
+@event.listens_for(MedicionCorporal, "after_update")
+def _medicion_movida(mapper, conexion, medicion):
+    anteriores = inspect(medicion).attrs.alumno_id.history.deleted
+    if anteriores and anteriores[0] != medicion.alumno_id:
+        sumar_mediciones(conexion, {anteriores[0]: -1, medicion.alumno_id: 1})
+
+
+@event.listens_for(Alumno, "after_insert")
+def _alumno_insertado(mapper, conexion, alumno):
+    conexion.execute(
+        update(_usuarios)
+        .where(_usuarios.c.id == alumno.cliente_id)
+        .values(total_alumnos=_usuarios.c.total_alumnos + 1)
+    )
+
+
+@event.listens_for(Alumno, "before_delete")
+def _alumno_por_borrar(mapper, conexion, alumno):
+    # Se lee el contador desde la base: si el ORM ya borró mediciones
+    # cargadas en esta misma operación, esas ya se descontaron.
+    restantes = (
+        select(_alumnos.c.total_mediciones)
+        .where(_alumnos.c.id == alumno.id)
+        .scalar_subquery()
+    )
+    conexion.execute(
+        update(_usuarios)
+        .where(_usuarios.c.id == alumno.cliente_id)
+        .values(
+            total_alumnos=_usuarios.c.total_alumnos - 1,
+            total_mediciones=_usuarios.c.total_mediciones - restantes,
+        )
+    )
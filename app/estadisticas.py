@@ -0,0 +1,223 @@
+# =========================================================
+# 📊 ESTADÍSTICAS DE LA PLATAFORMA
+# =========================================================
+# estadistica_total (una fila) lleva los totales de clientes, alumnos y
+# mediciones; estadistica_diaria, las altas de cada día y una foto diaria
+# de suscripciones activas. Los eventos del mapper las suman/restan en la
+# misma transacción, así el dashboard del admin lee filas chicas en vez
+# de hacer COUNT(*) sobre tablas enteras.
+#
+# Clientes y alumnos cuentan en el día en que se crearon; las mediciones,
+# en su propia fecha (MedicionCorporal.fecha, no hay fecha de carga):
+# mediciones_nuevas de un día = mediciones que existen con esa fecha. Así
+# lo mantienen los eventos y así lo recalcula reconciliar_estadisticas.
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import delete, event, func, inspect, select, update
+
+from app.models import Alumno, EstadisticaDiaria, EstadisticaTotal, MedicionCorporal, PagoCliente, User
+from app.sql import upsert, upsert_sumando, upsert_sumando_filas
+
+_totales = EstadisticaTotal.__table__
+_diaria = EstadisticaDiaria.__table__
+_usuarios = User.__table__
+_alumnos = Alumno.__table__
+_mediciones = MedicionCorporal.__table__
+
+# Días de tendencia en el dashboard
+DIAS_TENDENCIA = 30
+
+
+def _hoy():
+    # Las fechas de alta se guardan con datetime.utcnow
+    return datetime.utcnow().date()
+
+
+def sumar_estadisticas(conexion, clientes=0, alumnos=0, mediciones=0, altas=True):
+    """Suma (o resta) a los totales; si `altas`, también a los clientes y
+    alumnos nuevos de hoy. Las mediciones de cada día van aparte, por su
+    fecha: sumar_mediciones_por_dia().
+
+    Para escrituras en lote que no pasan por los eventos del ORM.
+    """
+    conexion.execute(
+        update(_totales).where(_totales.c.id == 1).values(
+            clientes=_totales.c.clientes + clientes,
+            alumnos=_totales.c.alumnos + alumnos,
+            mediciones=_totales.c.mediciones + mediciones,
+        )
+    )
+    if altas and (clientes or alumnos):
+        upsert_sumando(conexion, _diaria, {
+            "fecha": _hoy(),
+            "clientes_nuevos": clientes,
+            "alumnos_nuevos": alumnos,
+        }, ("fecha",))
+
+
+def sumar_mediciones_por_dia(conexion, por_dia):
+    """Suma (o resta) a mediciones_nuevas de cada fecha: {fecha: n}."""
+    filas = [{"fecha": fecha, "mediciones_nuevas": n} for fecha, n in sorted(por_dia.items()) if n]
+    upsert_sumando_filas(conexion, _diaria, filas, ("fecha",))
+
+
+def _contar_suscripciones(conexion, hoy):
+    return conexion.execute(
+        select(func.count()).select_from(_usuarios)
+        .where(_usuarios.c.is_admin.is_(False), _usuarios.c.activo_hasta >= hoy)
+    ).scalar()
+
+
+def panel_admin(conexion):
+    """(totales, dias) para el dashboard: la fila de totales y las filas
+    diarias de los últimos DIAS_TENDENCIA días.
+
+    Las suscripciones activas se cuentan una vez por día (o de nuevo si
+    cambió un pago) y quedan guardadas en la fila de hoy.
+    """
+    hoy = _hoy()
+    totales = conexion.execute(select(_totales).where(_totales.c.id == 1)).one_or_none()
+    # Hasta hoy: una medición puede venir con fecha futura
+    ultimos_dias = select(_diaria).where(
+        _diaria.c.fecha > hoy - timedelta(days=DIAS_TENDENCIA), _diaria.c.fecha <= hoy
+    ).order_by(_diaria.c.fecha)
+    dias = conexion.execute(ultimos_dias).all()
+
+    if not dias or dias[-1].fecha != hoy or dias[-1].suscripciones_activas is None:
+        activas = _contar_suscripciones(conexion, hoy)
+        # Crea la fila de hoy si todavía no hubo altas
+        upsert_sumando(conexion, _diaria, {"fecha": hoy, "clientes_nuevos": 0}, ("fecha",))
+        conexion.execute(update(_diaria).where(_diaria.c.fecha == hoy).values(suscripciones_activas=activas))
+        dias = conexion.execute(ultimos_dias).all()
+    return totales, dias
+
+
+def reconciliar_estadisticas(conexion):
+    """Recalcula totales y altas diarias desde las tablas de datos.
+
+    Las altas por día salen de fecha_registro, fecha_creacion y la fecha
+    de cada medición (lo que existe hoy: los borrados no cuentan). Devuelve
+    {campo: (antes, después)} de los totales.
+    """
+    antes = conexion.execute(select(_totales).where(_totales.c.id == 1)).one_or_none()
+    despues = {
+        "clientes": conexion.execute(
+            select(func.count()).select_from(_usuarios).where(_usuarios.c.is_admin.is_(False))
+        ).scalar(),
+        "alumnos": conexion.execute(select(func.count()).select_from(_alumnos)).scalar(),
+        "mediciones": conexion.execute(select(func.count()).select_from(_mediciones)).scalar(),
+    }
+    upsert(conexion, _totales, [{"id": 1, **despues}], ("id",))
+
+    hoy = _hoy()
+    por_dia = {}
+    altas = (
+        ("clientes_nuevos", func.date(_usuarios.c.fecha_registro), _usuarios.c.is_admin.is_(False)),
+        ("alumnos_nuevos", func.date(_alumnos.c.fecha_creacion), None),
+        ("mediciones_nuevas", _mediciones.c.fecha, None),
+    )
+    for campo, dia, filtro in altas:
+        consulta = select(dia, func.count()).where(dia.isnot(None)).group_by(dia)
+        if filtro is not None:
+            consulta = consulta.where(filtro)
+        for fecha, n in conexion.execute(consulta):
+            if isinstance(fecha, str):  # func.date() en SQLite devuelve texto
+                fecha = date.fromisoformat(fecha)
+            por_dia.setdefault(fecha, {"fecha": fecha, "clientes_nuevos": 0, "alumnos_nuevos": 0,
+                                       "mediciones_nuevas": 0, "suscripciones_activas": None})
+            por_dia[fecha][campo] = n
+    por_dia.setdefault(hoy, {"fecha": hoy, "clientes_nuevos": 0, "alumnos_nuevos": 0,
+                             "mediciones_nuevas": 0, "suscripciones_activas": None})
+    por_dia[hoy]["suscripciones_activas"] = _contar_suscripciones(conexion, hoy)
+
+    # Las fotos de suscripciones de días anteriores no se pueden recalcular
+    anteriores = dict(conexion.execute(
+        select(_diaria.c.fecha, _diaria.c.suscripciones_activas)
+        .where(_diaria.c.suscripciones_activas.isnot(None), _diaria.c.fecha < hoy)
+    ).all())
+    for fecha, fila in por_dia.items():
+        if fecha in anteriores:
+            fila["suscripciones_activas"] = anteriores[fecha]
+    conexion.execute(delete(_diaria))
+    filas = sorted(por_dia.values(), key=lambda f: f["fecha"])
+    if filas:
+        conexion.execute(_diaria.insert(), filas)
+
+    return {
+        campo: (getattr(antes, campo) if antes else None, valor)
+        for campo, valor in despues.items()
+    }
+
+
+# -------------------------------------------------------------------
+# EVENTOS DEL MAPPER
+# -------------------------------------------------------------------
+@event.listens_for(MedicionCorporal, "after_insert")
+def _medicion_insertada(mapper, conexion, medicion):
+    sumar_estadisticas(conexion, mediciones=1)
+    sumar_mediciones_por_dia(conexion, {medicion.fecha: 1})
+
+
+@event.listens_for(MedicionCorporal, "after_update")
+def _medicion_editada(mapper, conexion, medicion):
+    # Si cambió la fecha, la medición pasa de un día al otro
+    historia = inspect(medicion).attrs.fecha.history
+    if historia.deleted and historia.added and historia.deleted[0] != historia.added[0]:
+        sumar_mediciones_por_dia(conexion, {historia.deleted[0]: -1, historia.added[0]: 1})
+
+
+@event.listens_for(MedicionCorporal, "after_delete")
+def _medicion_borrada(mapper, conexion, medicion):
+    sumar_estadisticas(conexion, mediciones=-1, altas=False)
+    sumar_mediciones_por_dia(conexion, {medicion.fecha: -1})
+
+
+def _mediciones_por_dia(conexion, *condiciones):
+    """{fecha: n} de las mediciones que cumplen las condiciones."""
+    fecha = _mediciones.c.fecha
+    return dict(conexion.execute(
+        select(fecha, func.count()).select_from(_mediciones.join(_alumnos))
+        .where(*condiciones).group_by(fecha)
+    ).all())
+
+
+@event.listens_for(Alumno, "after_insert")
+def _alumno_insertado(mapper, conexion, alumno):
+    sumar_estadisticas(conexion, alumnos=1)
+
+
+@event.listens_for(Alumno, "before_delete")
+def _alumno_por_borrar(mapper, conexion, alumno):
+    # Sus mediciones se borran en cascada en la base: se descuentan las
+    # que quedan (las ya borradas por el ORM pasaron por _medicion_borrada)
+    por_dia = _mediciones_por_dia(conexion, _mediciones.c.alumno_id == alumno.id)
+    sumar_estadisticas(conexion, alumnos=-1, mediciones=-sum(por_dia.values()), altas=False)
+    sumar_mediciones_por_dia(conexion, {fecha: -n for fecha, n in por_dia.items()})
+
+
+@event.listens_for(User, "after_insert")
+def _cliente_insertado(mapper, conexion, usuario):
+    if not usuario.is_admin:
+        sumar_estadisticas(conexion, clientes=1)
+
+
+@event.listens_for(User, "before_delete")
+def _cliente_por_borrar(mapper, conexion, usuario):
+    if usuario.is_admin:
+        return
+    alumnos = conexion.execute(
+        select(_usuarios.c.total_alumnos).where(_usuarios.c.id == usuario.id)
+    ).scalar()
+    por_dia = _mediciones_por_dia(conexion, _alumnos.c.cliente_id == usuario.id)
+    sumar_estadisticas(conexion, clientes=-1, alumnos=-alumnos, mediciones=-sum(por_dia.values()), altas=False)
+    sumar_mediciones_por_dia(conexion, {fecha: -n for fecha, n in por_dia.items()})
+
+
+@event.listens_for(PagoCliente, "after_insert")
+@event.listens_for(PagoCliente, "after_update")
+@event.listens_for(PagoCliente, "after_delete")
+def _pago_modificado(mapper, conexion, pago):
+    # Puede cambiar quién está activo: se recuenta en la próxima lectura
+    conexion.execute(
+        update(_diaria).where(_diaria.c.fecha == _hoy()).values(suscripciones_activas=None)
+    )
@@ -0,0 +1,93 @@
+# =========================================================
+# 🗂️ MANIFIESTO DE ARCHIVOS ESTÁTICOS (hash de contenido)
+# =========================================================
+# Se arma una vez al crear la app: ruta relativa -> hash corto del
+# contenido. url_for('static', ...) agrega ?v=<hash> con un lookup en el
+# dict (sin stat() por render) y las respuestas cuyo ?v coincide con el
+# hash vigente se sirven como inmutables por un año.
+import hashlib
+import os
+import re
+
+from flask import request, url_for
+
+# Un año: lo máximo que respetan navegadores y proxies
+MAX_AGE_INMUTABLE = 365 * 24 * 60 * 60
+
+# El service worker precarga solo lo que pide el layout y no pasa de este
+# tamaño (las imágenes de MB se guardan recién cuando se piden)
+TEMPLATE_LAYOUT = "base.html"
+MAX_BYTES_PRECACHE = 256 * 1024
+
+_ESTATICO_EN_TEMPLATE = re.compile(r"""url_for\(\s*['"]static['"]\s*,\s*filename\s*=\s*['"]([^'"]+)['"]""")
+
+
+def _hash_archivo(ruta):
+    h = hashlib.sha256()
+    with open(ruta, "rb") as f:
+        for bloque in iter(lambda: f.read(64 * 1024), b""):
+            h.update(bloque)
+    return h.hexdigest()[:12]
+
+
+def construir_manifiesto(carpeta):
+    """Devuelve {"css/style.css": "3f2a9c...", ...} para toda la carpeta."""
+    manifiesto = {}
+    for raiz, _, archivos in os.walk(carpeta):
+        for nombre in archivos:
+            ruta = os.path.join(raiz, nombre)
+            relativa = os.path.relpath(ruta, carpeta).replace(os.sep, "/")
+            manifiesto[relativa] = _hash_archivo(ruta)
+    return manifiesto
+
+
+def version_estaticos(manifiesto):
+    """Hash del manifiesto completo: cambia si cambia cualquier archivo."""
+    h = hashlib.sha256()
+    for ruta in sorted(manifiesto):
+        h.update(f"{ruta}:{manifiesto[ruta]}\n".encode())
+    return h.hexdigest()[:12]
+
+
+def estaticos_del_layout(app, manifiesto):
+    """Archivos estáticos que carga base.html en cada página (los chicos)."""
+    fuente, _, _ = app.jinja_env.loader.get_source(app.jinja_env, TEMPLATE_LAYOUT)
+    return [
+        ruta for ruta in sorted(set(_ESTATICO_EN_TEMPLATE.findall(fuente)))
+        if ruta in manifiesto
+        and os.path.getsize(os.path.join(app.static_folder, ruta)) <= MAX_BYTES_PRECACHE
+    ]
+
+
+def registrar_estaticos(app):
+    """Manifiesto + url_for versionado + Cache-Control inmutable."""
+    manifiesto = construir_manifiesto(app.static_folder)
+    app.extensions["estaticos"] = manifiesto
+    app.extensions["estaticos_version"] = version_estaticos(manifiesto)
+    app.extensions["estaticos_precache"] = estaticos_del_layout(app, manifiesto)
+
+    @app.context_processor
+    def override_url_for():
+        def hashed_url_for(endpoint, **values):
+            if endpoint == 'static':
+                version = manifiesto.get(values.get('filename'))
+                if version:
+                    values['v'] = version
+            return url_for(endpoint, **values)
+        return dict(url_for=hashed_url_for)
+
+    @app.after_request
+    def cache_estaticos(response):
+        # En debug el manifiesto puede quedar viejo si se edita un CSS/JS
+        # sin reiniciar: ahí se deja la revalidación normal
+        if app.debug or request.endpoint != 'static' or response.status_code != 200:
+            return response
+        version = request.args.get('v')
+        if version and version == manifiesto.get(request.view_args.get('filename')):
+            response.cache_control.public = True
+            response.cache_control.max_age = MAX_AGE_INMUTABLE
+            response.cache_control.immutable = True
+            response.cache_control.no_cache = None
+        return response
+
+    return manifiesto
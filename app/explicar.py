@@ -0,0 +1,94 @@
+# =========================================================
+# 🔎 PLANES DE LAS CONSULTAS FRECUENTES (flask jge explicar)
+# =========================================================
+# Cada entrada replica una consulta de los dashboards / rutas calientes.
+# `revisar_planes` corre EXPLAIN sobre todas y marca las que recorren una
+# tabla completa en lugar de usar un índice, para detectar a tiempo un
+# índice borrado o una consulta que dejó de ser indexable.
+from datetime import date, datetime
+
+from sqlalchemy import func, select
+
+from app.models import Alumno, IngresoMensual, MedicionCorporal, PagoCliente, User
+from app.pagos import consulta_pagos
+from app.periodos import periodo_actual, rango_mes
+from app.sql import Explicar
+from app.tablero import consulta_peso_mensual, consulta_recientes, consulta_ultima_medicion
+
+
+def _consultas(cliente_id, alumno_id):
+    hoy = date.today()
+    desde, hasta = rango_mes(hoy.year, hoy.month)
+    return [
+        ("cliente.home: última medición",
+         consulta_ultima_medicion(cliente_id)),
+        ("cliente.home: alumnos recientes",
+         consulta_recientes(cliente_id)),
+        ("cliente.home: peso promedio por mes",
+         consulta_peso_mensual(cliente_id, date(hoy.year - 1, hoy.month, 1))),
+        ("cliente.medicion: medición duplicada",
+         select(MedicionCorporal).where(MedicionCorporal.alumno_id == alumno_id,
+                                        MedicionCorporal.fecha == hoy)),
+        ("cliente.mediciones_alumno: historial",
+         select(MedicionCorporal).where(MedicionCorporal.alumno_id == alumno_id)
+         .order_by(MedicionCorporal.fecha.asc())),
+        ("main.login: usuario por username",
+         select(User).where(User.username == "admin")),
+        ("admin.dashboard: clientes recientes",
+         select(User).where(User.is_admin.is_(False)).order_by(User.id.desc()).limit(3)),
+        ("admin.admin_clientes: clientes",
+         select(User).where(User.is_admin.is_(False))),
+        ("admin.registrar_pago: pago del periodo",
+         select(PagoCliente).where(PagoCliente.cliente_id == cliente_id,
+                                   PagoCliente.periodo == periodo_actual())),
+        ("admin.resumen_ingresos: consolidado del rango",
+         select(IngresoMensual.periodo, func.sum(IngresoMensual.total))
+         .where(IngresoMensual.periodo >= desde, IngresoMensual.periodo < hasta)
+         .group_by(IngresoMensual.periodo)),
+        ("ingresos: celda (periodo, cliente) de un pago",
+         select(func.sum(PagoCliente.monto))
+         .where(PagoCliente.periodo == periodo_actual(), PagoCliente.cliente_id == cliente_id,
+                PagoCliente.estado == "Aprobado")),
+        ("verificar_pago_activo: carga del usuario",
+         select(User).where(User.id == cliente_id)),
+        ("pagos: últimos pagos aprobados del cliente",
+         select(PagoCliente).where(PagoCliente.cliente_id == cliente_id,
+                                   PagoCliente.estado == "Aprobado")
+         .order_by(PagoCliente.fecha_pago.desc()).limit(5)),
+        ("admin.pagos: página por cursor",
+         consulta_pagos(cursor=(datetime.utcnow(), 1 << 30))),
+        ("suscripciones: activo_hasta del cliente",
+         select(func.max(PagoCliente.periodo))
+         .where(PagoCliente.cliente_id == cliente_id, PagoCliente.estado == "Aprobado")),
+    ]
+
+
+def _recorre_tabla(dialecto, plan):
+    if dialecto == "sqlite":
+        # "SCAN tabla" sin "USING ... INDEX" es un recorrido completo
+        return any(
+            fila[-1].startswith("SCAN ") and "INDEX" not in fila[-1]
+            for fila in plan
+        )
+    return any("Seq Scan" in fila[0] for fila in plan)
+
+
+def revisar_planes(conexion):
+    """Devuelve [(nombre, usa_indice, plan_en_texto)] para cada consulta."""
+    dialecto = conexion.dialect.name
+    cliente_id = conexion.execute(
+        select(func.min(User.id)).where(User.is_admin.is_(False))
+    ).scalar() or 1
+    alumno_id = conexion.execute(select(func.min(Alumno.id))).scalar() or 1
+
+    if dialecto == "postgresql":
+        # Con tablas chicas el planner prefiere Seq Scan aunque exista el
+        # índice: se desactiva para ver si la consulta *puede* usarlo.
+        conexion.exec_driver_sql("SET LOCAL enable_seqscan = off")
+
+    resultados = []
+    for nombre, consulta in _consultas(cliente_id, alumno_id):
+        plan = conexion.execute(Explicar(consulta)).all()
+        texto = "\n".join(str(fila[-1]) if dialecto == "sqlite" else fila[0] for fila in plan)
+        resultados.append((nombre, not _recorre_tabla(dialecto, plan), texto))
+    return resultados
@@ -0,0 +1,153 @@
+# =========================================================
+# 📤 EXPORTACIÓN COMPLETA DE DATOS (backup en NDJSON / CSV)
+# =========================================================
+# Recorre las tablas con cursores del lado del servidor (yield_per) y va
+# generando bloques de bytes, opcionalmente comprimidos con gzip. En
+# memoria solo hay un lote de filas y un bloque de salida, sin importar
+# el tamaño de las tablas. Las tablas derivadas (resúmenes, estadísticas,
+# ingresos) no se exportan: se regeneran con los comandos de `flask jge`.
+import csv
+import io
+import json
+import zlib
+from contextlib import contextmanager
+from datetime import date, datetime
+
+from sqlalchemy import inspect, select, text
+
+from app.extensions import db
+from app.models import Alumno, MedicionCorporal, PagoCliente, User
+
+# En orden de dependencias (así se pueden restaurar en el mismo orden)
+TABLAS = {
+    "user": User.__table__,
+    "alumno": Alumno.__table__,
+    "medicion_corporal": MedicionCorporal.__table__,
+    "pagos_clientes": PagoCliente.__table__,
+}
+FORMATOS = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+VERSION_FORMATO = 1
+
+FILAS_POR_LOTE = 1000
+TAMANIO_BLOQUE = 64 * 1024
+
+
+class ErrorExportacion(Exception):
+    """Parámetros de exportación inválidos (formato o tabla)."""
+
+
+@contextmanager
+def conexion_consistente():
+    """Conexión propia con una sola foto de la base para todas las tablas
+    (REPEATABLE READ en PostgreSQL; SQLite ya lee dentro de una transacción)."""
+    with db.engine.connect() as conexion:
+        if conexion.dialect.name == "postgresql":
+            conexion = conexion.execution_options(isolation_level="REPEATABLE READ")
+        with conexion.begin():
+            yield conexion
+
+
+def _valor(v):
+    if isinstance(v, (datetime, date)):
+        return v.isoformat()
+    return v
+
+
+def _filas(conexion, tabla):
+    consulta = select(tabla).order_by(*tabla.primary_key.columns)
+    return conexion.execution_options(yield_per=FILAS_POR_LOTE).execute(consulta)
+
+
+def revision_esquema(conexion):
+    if not inspect(conexion).has_table("alembic_version"):
+        return None
+    return conexion.execute(text("SELECT version_num FROM alembic_version")).scalar()
+
+
+def lineas_ndjson(conexion, tablas, conteos):
+    """Una línea de encabezado, una por fila y un cierre con los conteos."""
+    yield json.dumps({
+        "formato": "jgefitrack",
+        "version": VERSION_FORMATO,
+        "revision": revision_esquema(conexion),
+        "exportado": datetime.utcnow().isoformat(),
+        "tablas": list(tablas),
+    }) + "\n"
+    for nombre in tablas:
+        conteos[nombre] = 0
+        for fila in _filas(conexion, TABLAS[nombre]):
+            datos = {k: _valor(v) for k, v in fila._mapping.items()}
+            yield json.dumps({"tabla": nombre, "datos": datos}, ensure_ascii=False) + "\n"
+            conteos[nombre] += 1
+    yield json.dumps({"fin": conteos}) + "\n"
+
+
+def lineas_csv(conexion, nombre, conteos):
+    """Encabezado con los nombres de columna y una línea por fila."""
+    tabla = TABLAS[nombre]
+    buffer = io.StringIO()
+    escritor = csv.writer(buffer)
+
+    def linea(valores):
+        escritor.writerow(valores)
+        salida = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return salida
+
+    yield linea([c.name for c in tabla.columns])
+    conteos[nombre] = 0
+    for fila in _filas(conexion, tabla):
+        yield linea(["" if v is None else _valor(v) for v in fila])
+        conteos[nombre] += 1
+
+
+def _en_bloques(lineas, comprimir):
+    """Junta las líneas en bloques de ~TAMANIO_BLOQUE bytes (gzip opcional)."""
+    compresor = zlib.compressobj(6, zlib.DEFLATED, 31) if comprimir else None  # 31: cabecera gzip
+    partes, tamanio = [], 0
+    for linea in lineas:
+        datos = linea.encode("utf-8")
+        partes.append(datos)
+        tamanio += len(datos)
+        if tamanio >= TAMANIO_BLOQUE:
+            bloque = b"".join(partes)
+            partes, tamanio = [], 0
+            if compresor:
+                bloque = compresor.compress(bloque)
+            if bloque:
+                yield bloque
+    bloque = b"".join(partes)
+    if compresor:
+        bloque = compresor.compress(bloque) + compresor.flush()
+    if bloque:
+        yield bloque
+
+
+def validar(formato, tabla=None):
+    """Tablas a exportar; ErrorExportacion si el pedido no tiene sentido."""
+    if formato not in FORMATOS:
+        raise ErrorExportacion(f"Formato desconocido: {formato} (usar {', '.join(FORMATOS)}).")
+    if tabla and tabla not in TABLAS:
+        raise ErrorExportacion(f"Tabla desconocida: {tabla} (usar {', '.join(TABLAS)}).")
+    if formato == "csv" and not tabla:
+        raise ErrorExportacion("El CSV es de una sola tabla: indicar cuál.")
+    return [tabla] if tabla else list(TABLAS)
+
+
+def exportar(formato, tabla=None, comprimir=False, conteos=None):
+    """Genera los bytes de la exportación. `conteos` (dict) se va llenando
+    con las filas escritas por tabla."""
+    tablas = validar(formato, tabla)
+    conteos = {} if conteos is None else conteos
+    with conexion_consistente() as conexion:
+        if formato == "ndjson":
+            lineas = lineas_ndjson(conexion, tablas, conteos)
+        else:
+            lineas = lineas_csv(conexion, tablas[0], conteos)
+        yield from _en_bloques(lineas, comprimir)
+
+
+def nombre_archivo(formato, tabla=None, comprimir=False):
+    base = f"jgefitrack_{tabla or 'datos'}_{datetime.utcnow():%Y%m%d_%H%M%S}.{formato}"
+    return base + (".gz" if comprimir else "")
@@ -1,4 +1,5 @@
 from flask_wtf import FlaskForm
+from flask_wtf.file import FileField, FileRequired, FileAllowed
 from wtforms import RadioField, StringField, FloatField, DateField, SubmitField, PasswordField, IntegerField, SelectField
 from wtforms.validators import DataRequired, Length, Optional, NumberRange
 
@@ -80,4 +81,13 @@ class EditarMedicionForm(FlaskForm):
     grasa_corporal = FloatField('Grasa Corporal (%)', validators=[Optional()])
     musculo = FloatField('Musculo', validators=[Optional()])
     agua_corporal = FloatField('Agua Corporal (%)', validators=[Optional()])
-    metabolismo_basal = FloatField('Metabolismo Basal (kcal)', validators=[Optional()])
\ No newline at end of file
+    metabolismo_basal = FloatField('Metabolismo Basal (kcal)', validators=[Optional()])
+
+
+
+class ImportarMedicionesForm(FlaskForm):
+    archivo = FileField('Archivo (.csv o .xlsx)', validators=[
+        FileRequired(),
+        FileAllowed(['csv', 'xlsx'], 'Solo se aceptan archivos .csv o .xlsx')
+    ])
+    submit = SubmitField('Importar')
@@ -0,0 +1,115 @@
+# =========================================================
+# 📈 GRÁFICOS DE EVOLUCIÓN RENDERIZADOS EN EL SERVIDOR
+# =========================================================
+# Mismas series que graficos.js, dibujadas con reportlab.graphics. Un
+# Drawing se puede meter tal cual en el PDF (vectorial) o exportar a SVG.
+from datetime import date
+
+from flask import current_app
+from reportlab.graphics import renderSVG
+from reportlab.graphics.charts.lineplots import LinePlot
+from reportlab.graphics.shapes import Drawing, String
+from reportlab.graphics.widgets.markers import makeMarker
+from reportlab.lib import colors
+
+from app.cache import CacheLRU
+
+# Cambiar si cambia el dibujo: invalida ETags y caches de los navegadores
+VERSION_RENDER = 1
+
+# nombre -> (título, columna de MedicionCorporal, color)
+SERIES = {
+    "peso": ("Peso (kg)", "peso", colors.Color(77 / 255, 181 / 255, 1)),
+    "imc": ("IMC", "imc", colors.Color(1, 209 / 255, 102 / 255)),
+    "grasa": ("Grasa Corporal (%)", "grasa_corporal", colors.Color(1, 99 / 255, 132 / 255)),
+    "musculo": ("Músculo (%)", "musculo", colors.Color(100 / 255, 1, 218 / 255)),
+    "agua": ("Agua Corporal (%)", "agua_corporal", colors.Color(155 / 255, 0, 245 / 255)),
+    "metabolismo": ("Metabolismo Basal (kcal)", "metabolismo_basal", colors.Color(1, 159 / 255, 64 / 255)),
+}
+
+_cache_graficos = None
+
+
+def cache_graficos():
+    global _cache_graficos
+    if _cache_graficos is None:
+        _cache_graficos = CacheLRU(current_app.config["GRAFICOS_CACHE_BYTES"])
+    return _cache_graficos
+
+
+def series_de_mediciones(mediciones):
+    """{"fechas": [date, ...], "peso": [...], ...} en datos planos."""
+    series = {"fechas": [m.fecha for m in mediciones]}
+    for nombre, (_, columna, _) in SERIES.items():
+        series[nombre] = [getattr(m, columna) for m in mediciones]
+    return series
+
+
+def _etiqueta_fecha(valor):
+    return date.fromordinal(int(valor)).strftime('%d-%m')
+
+
+def dibujar_serie(nombre, fechas, valores, ancho=500, alto=250):
+    titulo, _, color = SERIES[nombre]
+    d = Drawing(ancho, alto)
+    d.add(String(ancho / 2, alto - 14, titulo, textAnchor="middle",
+                 fontName="Helvetica-Bold", fontSize=11))
+
+    puntos = [(f.toordinal(), v) for f, v in zip(fechas, valores) if v is not None]
+    if not puntos:
+        d.add(String(ancho / 2, alto / 2, "Sin datos", textAnchor="middle",
+                     fontName="Helvetica", fontSize=10, fillColor=colors.grey))
+        return d
+
+    lp = LinePlot()
+    lp.x, lp.y = 45, 30
+    lp.width, lp.height = ancho - 65, alto - 60
+    lp.data = [puntos]
+    lp.lines[0].strokeColor = color
+    lp.lines[0].strokeWidth = 2
+    lp.lines[0].symbol = makeMarker("FilledCircle", size=3, fillColor=color)
+
+    xs = [x for x, _ in puntos]
+    ys = [y for _, y in puntos]
+    # Con un solo punto (o todos iguales) el eje no tendría rango
+    lp.xValueAxis.valueMin = min(xs) - (1 if min(xs) == max(xs) else 0)
+    lp.xValueAxis.valueMax = max(xs) + (1 if min(xs) == max(xs) else 0)
+    if min(ys) == max(ys):
+        lp.yValueAxis.valueMin = min(ys) - 1
+        lp.yValueAxis.valueMax = max(ys) + 1
+    lp.xValueAxis.labelTextFormat = _etiqueta_fecha
+    lp.xValueAxis.maximumTicks = 8
+    lp.xValueAxis.labels.fontSize = 8
+    lp.yValueAxis.labels.fontSize = 8
+    lp.yValueAxis.visibleGrid = True
+    lp.yValueAxis.gridStrokeColor = colors.lightgrey
+    d.add(lp)
+    return d
+
+
+def dibujos_reporte(series):
+    """Un Drawing por serie, en el orden de SERIES (para el PDF)."""
+    return {
+        nombre: dibujar_serie(nombre, series["fechas"], series[nombre])
+        for nombre in SERIES
+    }
+
+
+def renderizar(dibujo):
+    return renderSVG.drawToString(dibujo).encode("utf-8")
+
+
+def etag_grafico(alumno, nombre):
+    return f"{alumno.id}-{alumno.version_mediciones}-{nombre}-svg-r{VERSION_RENDER}"
+
+
+def grafico_con_cache(alumno, nombre, mediciones):
+    """Bytes del SVG; `mediciones` es un callable (solo se consulta si falta)."""
+    clave = etag_grafico(alumno, nombre)
+    cache = cache_graficos()
+    contenido = cache.get(clave)
+    if contenido is None:
+        series = series_de_mediciones(mediciones())
+        contenido = renderizar(dibujar_serie(nombre, series["fechas"], series[nombre]))
+        cache.put(clave, contenido)
+    return contenido
@@ -0,0 +1,275 @@
+# =========================================================
+# 📥 IMPORTACIÓN MASIVA DE MEDICIONES (CSV / XLSX)
+# =========================================================
+# Lee la planilla por tandas (pandas para CSV, openpyxl en modo read_only
+# para XLSX), resuelve los alumnos por nombre, calcula las métricas
+# derivadas de toda la tanda con NumPy e inserta en lote. La memoria queda
+# acotada por el tamaño de la tanda, no por el del archivo.
+import os
+import zipfile
+from collections import Counter
+from datetime import date, datetime
+
+from sqlalchemy import insert, select
+
+from app.extensions import db
+from app.models import Alumno, MedicionCorporal
+from app.contadores import sumar_mediciones
+from app.estadisticas import sumar_estadisticas, sumar_mediciones_por_dia
+from app.progreso import actualizar_resumenes
+from app.versiones import subir_version_datos
+from app.recalculo import derivados_de_filas, derivados_por_fila
+
+COLUMNAS_MEDIDAS = ("peso", "altura", "cintura", "cadera", "pecho", "brazo", "muslo")
+COLUMNAS_OBLIGATORIAS = ("alumno", "fecha", "peso", "altura")
+
+# Máximo de filas con detalle en el reporte (el resto solo se cuenta)
+MAX_DETALLE_REPORTE = 1000
+
+
+class ErrorImportacion(ValueError):
+    """Archivo que no se puede procesar (formato o encabezados inválidos)."""
+
+
+# -------------------------------------------------------------------
+# LECTURA POR TANDAS
+# -------------------------------------------------------------------
+def _normalizar_encabezado(valor):
+    # "Peso (kg)" -> "peso", " Fecha " -> "fecha"
+    texto = str(valor or "").strip().lower()
+    return texto.split("(")[0].strip()
+
+
+def _validar_encabezados(encabezados):
+    faltantes = [c for c in COLUMNAS_OBLIGATORIAS if c not in encabezados]
+    if faltantes:
+        raise ErrorImportacion(f"Faltan columnas obligatorias: {', '.join(faltantes)}.")
+
+
+def _tandas_csv(archivo, tamanio_tanda):
+    # pandas/openpyxl se importan al usarse: cargarlos en cada arranque de
+    # worker costaba más de medio segundo
+    import pandas as pd
+
+    try:
+        lector = pd.read_csv(
+            archivo, sep=None, engine="python", dtype=str,
+            keep_default_na=False, encoding="utf-8-sig", chunksize=tamanio_tanda,
+        )
+        fila = 2  # la fila 1 es el encabezado
+        for chunk in lector:
+            chunk.columns = [_normalizar_encabezado(c) for c in chunk.columns]
+            _validar_encabezados(chunk.columns)
+            registros = chunk.to_dict("records")
+            yield [(fila + i, r) for i, r in enumerate(registros)]
+            fila += len(registros)
+    except (pd.errors.ParserError, pd.errors.EmptyDataError, UnicodeDecodeError) as e:
+        raise ErrorImportacion(f"No se pudo leer el CSV: {e}")
+
+
+def _tandas_xlsx(archivo, tamanio_tanda):
+    import openpyxl
+
+    try:
+        libro = openpyxl.load_workbook(archivo, read_only=True, data_only=True)
+    except (zipfile.BadZipFile, KeyError, OSError) as e:
+        raise ErrorImportacion(f"No se pudo abrir el XLSX: {e}")
+    try:
+        filas = libro.active.iter_rows(values_only=True)
+        encabezados = [_normalizar_encabezado(c) for c in next(filas, ())]
+        _validar_encabezados(encabezados)
+
+        tanda = []
+        for numero, valores in enumerate(filas, start=2):
+            if not any(v not in (None, "") for v in valores):
+                continue
+            tanda.append((numero, dict(zip(encabezados, valores))))
+            if len(tanda) >= tamanio_tanda:
+                yield tanda
+                tanda = []
+        if tanda:
+            yield tanda
+    finally:
+        libro.close()
+
+
+def leer_tandas(archivo, nombre_archivo, tamanio_tanda=2000):
+    """Genera listas de (número de fila, dict columna -> valor)."""
+    extension = os.path.splitext(nombre_archivo or "")[1].lower()
+    if extension == ".csv":
+        return _tandas_csv(archivo, tamanio_tanda)
+    if extension == ".xlsx":
+        return _tandas_xlsx(archivo, tamanio_tanda)
+    raise ErrorImportacion("Formato no soportado: se acepta .csv o .xlsx.")
+
+
+# -------------------------------------------------------------------
+# CONVERSIÓN DE VALORES
+# -------------------------------------------------------------------
+def _a_fecha(valor):
+    if isinstance(valor, datetime):
+        return valor.date()
+    if isinstance(valor, date):
+        return valor
+    texto = str(valor or "").strip()
+    for formato in ("%Y-%m-%d", "%d/%m/%Y", "%d-%m-%Y"):
+        try:
+            return datetime.strptime(texto, formato).date()
+        except ValueError:
+            continue
+    raise ValueError(f"fecha inválida '{texto}'")
+
+
+def _a_numero(valor, columna):
+    if valor is None or (isinstance(valor, str) and not valor.strip()):
+        return None
+    if isinstance(valor, (int, float)):
+        return float(valor)
+    try:
+        return float(str(valor).strip().replace(",", "."))
+    except ValueError:
+        raise ValueError(f"{columna} inválido '{valor}'")
+
+
+def _parsear_fila(datos):
+    nombre = str(datos.get("alumno") or "").title().strip()
+    if not nombre:
+        raise ValueError("falta el nombre del alumno")
+    medidas = {c: _a_numero(datos.get(c), c) for c in COLUMNAS_MEDIDAS}
+    for c in ("peso", "altura"):
+        if not medidas[c]:
+            raise ValueError(f"falta {c}")
+    return nombre, _a_fecha(datos.get("fecha")), medidas
+
+
+# -------------------------------------------------------------------
+# IMPORTACIÓN
+# -------------------------------------------------------------------
+class _Reporte:
+    def __init__(self):
+        self.insertadas = 0
+        self.omitidas = 0
+        self.errores = 0
+        self.detalle = []
+
+    def agregar(self, fila, alumno, motivo, es_error=True):
+        if es_error:
+            self.errores += 1
+        else:
+            self.omitidas += 1
+        if len(self.detalle) < MAX_DETALLE_REPORTE:
+            self.detalle.append({"fila": fila, "alumno": alumno, "motivo": motivo})
+
+    def como_dict(self):
+        return {
+            "insertadas": self.insertadas,
+            "omitidas": self.omitidas,
+            "errores": self.errores,
+            "detalle": self.detalle,
+            "detalle_truncado": self.omitidas + self.errores > len(self.detalle),
+        }
+
+
+def _resolver_alumnos(cliente_id, nombres, cache):
+    """Completa `cache`: nombre -> fila de Alumno, None si el nombre es
+    ambiguo o False si no existe (para no volver a buscarlo)."""
+    pendientes = [n for n in nombres if n not in cache]
+    if not pendientes:
+        return
+    filas = db.session.execute(
+        select(Alumno.id, Alumno.nombre, Alumno.genero, Alumno.edad)
+        .where(Alumno.cliente_id == cliente_id, Alumno.nombre.in_(pendientes))
+    ).all()
+    for fila in filas:
+        cache[fila.nombre] = None if fila.nombre in cache else fila
+    for nombre in pendientes:
+        cache.setdefault(nombre, False)
+
+
+def _fechas_existentes(alumno_ids, fechas):
+    if not alumno_ids:
+        return set()
+    filas = db.session.execute(
+        select(MedicionCorporal.alumno_id, MedicionCorporal.fecha)
+        .where(MedicionCorporal.alumno_id.in_(alumno_ids),
+               MedicionCorporal.fecha.in_(fechas))
+    ).all()
+    return {(f.alumno_id, f.fecha) for f in filas}
+
+
+def _procesar_tanda(cliente_id, tanda, alumnos, reporte):
+    # 1) Parseo y validación fila por fila
+    validas = []
+    for numero, datos in tanda:
+        try:
+            validas.append((numero, *_parsear_fila(datos)))
+        except ValueError as e:
+            reporte.agregar(numero, datos.get("alumno"), str(e))
+
+    # 2) Alumnos por nombre (una consulta por tanda, con caché entre tandas)
+    _resolver_alumnos(cliente_id, {v[1] for v in validas}, alumnos)
+
+    candidatas = []
+    for numero, nombre, fecha, medidas in validas:
+        if alumnos[nombre] is False:
+            reporte.agregar(numero, nombre, "alumno inexistente")
+        elif alumnos[nombre] is None:
+            reporte.agregar(numero, nombre, "hay más de un alumno con ese nombre")
+        else:
+            candidatas.append((numero, alumnos[nombre], fecha, medidas))
+
+    # 3) Duplicados contra la base (uq_alumno_fecha) y dentro de la tanda
+    ocupadas = _fechas_existentes(
+        {c[1].id for c in candidatas}, {c[2] for c in candidatas}
+    )
+    nuevas = []
+    for numero, alumno, fecha, medidas in candidatas:
+        clave = (alumno.id, fecha)
+        if clave in ocupadas:
+            reporte.agregar(numero, alumno.nombre,
+                            f"ya existe una medición el {fecha.strftime('%d/%m/%Y')}",
+                            es_error=False)
+            continue
+        ocupadas.add(clave)
+        nuevas.append((alumno, fecha, medidas))
+
+    if not nuevas:
+        return
+
+    # 4) Métricas derivadas de toda la tanda y un único INSERT en lote
+    derivados = derivados_por_fila(derivados_de_filas([
+        (m["peso"], m["altura"], m["cintura"], m["cadera"], None, a.genero, a.edad)
+        for a, _, m in nuevas
+    ]))
+    registros = [
+        {"alumno_id": alumno.id, "fecha": fecha, **medidas, **d}
+        for (alumno, fecha, medidas), d in zip(nuevas, derivados)
+    ]
+    db.session.execute(insert(MedicionCorporal), registros)
+    # El INSERT en lote no pasa por los eventos del ORM
+    por_alumno = {}
+    for alumno, _, _ in nuevas:
+        por_alumno[alumno.id] = por_alumno.get(alumno.id, 0) + 1
+    sumar_mediciones(db.session.connection(), por_alumno)
+    actualizar_resumenes(db.session.connection(), sorted(por_alumno))
+    subir_version_datos(db.session.connection(), alumno_ids=por_alumno)
+    sumar_estadisticas(db.session.connection(), mediciones=len(registros))
+    sumar_mediciones_por_dia(db.session.connection(), Counter(fecha for _, fecha, _ in nuevas))
+    reporte.insertadas += len(registros)
+
+
+def importar_mediciones(archivo, nombre_archivo, cliente_id, tamanio_tanda=2000, progreso=None):
+    """Importa mediciones de un CSV/XLSX para los alumnos de `cliente_id`.
+
+    Cada tanda se confirma por separado, así un archivo enorme no retiene
+    una transacción abierta. Devuelve el reporte (insertadas, omitidas,
+    errores y detalle por fila).
+    """
+    reporte = _Reporte()
+    alumnos = {}
+    for tanda in leer_tandas(archivo, nombre_archivo, tamanio_tanda):
+        _procesar_tanda(cliente_id, tanda, alumnos, reporte)
+        db.session.commit()
+        if progreso:
+            progreso(reporte)
+    return reporte.como_dict()
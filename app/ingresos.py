@@ -0,0 +1,136 @@
+# =========================================================
+# 📆 INGRESOS CONSOLIDADOS POR MES Y CLIENTE
+# =========================================================
+# ingreso_mensual guarda, por (periodo, cliente), la suma de los pagos
+# aprobados. Cada alta, cambio o baja de un pago recalcula solo su celda
+# (por el índice cliente_id, periodo, estado). El informe lee estas filas:
+# su costo depende de meses × clientes del rango, no del historial de
+# pagos. Los meses ya cerrados no se tocan al reconstruir.
+from sqlalchemy import delete, event, func, inspect, select, tuple_
+
+from app.models import IngresoMensual, PagoCliente, User
+from app.periodos import nombre_periodo, periodo_actual, sumar_meses
+from app.sql import upsert
+
+_ingresos = IngresoMensual.__table__
+_pagos = PagoCliente.__table__
+
+# Tope de meses por informe
+MAX_MESES = 36
+TOP_CLIENTES = 10
+
+
+def actualizar_ingreso(conexion, celdas):
+    """Recalcula las celdas [(periodo, cliente_id), ...] desde los pagos."""
+    celdas = {c for c in celdas if None not in c}
+    if not celdas:
+        return
+    sumas = {
+        (periodo, cliente_id): (total, n)
+        for periodo, cliente_id, total, n in conexion.execute(
+            select(_pagos.c.periodo, _pagos.c.cliente_id, func.sum(_pagos.c.monto), func.count())
+            .where(
+                tuple_(_pagos.c.periodo, _pagos.c.cliente_id).in_(list(celdas)),
+                _pagos.c.estado == "Aprobado",
+            )
+            .group_by(_pagos.c.periodo, _pagos.c.cliente_id)
+        )
+    }
+    vacias = [c for c in celdas if c not in sumas]
+    if vacias:
+        conexion.execute(
+            delete(_ingresos).where(tuple_(_ingresos.c.periodo, _ingresos.c.cliente_id).in_(vacias))
+        )
+    upsert(conexion, _ingresos, [
+        {"periodo": periodo, "cliente_id": cliente_id, "total": total, "pagos": n}
+        for (periodo, cliente_id), (total, n) in sumas.items()
+    ], ("periodo", "cliente_id"))
+
+
+def reconstruir_ingresos(conexion, desde=None):
+    """Regenera el consolidado desde `desde` (por defecto, el mes actual:
+    los meses cerrados quedan como están). Devuelve las filas escritas."""
+    desde = desde or periodo_actual()
+    conexion.execute(delete(_ingresos).where(_ingresos.c.periodo >= desde))
+    filas = [
+        {"periodo": periodo, "cliente_id": cliente_id, "total": total, "pagos": n}
+        for periodo, cliente_id, total, n in conexion.execute(
+            select(_pagos.c.periodo, _pagos.c.cliente_id, func.sum(_pagos.c.monto), func.count())
+            .where(_pagos.c.periodo >= desde, _pagos.c.estado == "Aprobado")
+            .group_by(_pagos.c.periodo, _pagos.c.cliente_id)
+        )
+    ]
+    upsert(conexion, _ingresos, filas, ("periodo", "cliente_id"))
+    return len(filas)
+
+
+def informe_ingresos(conexion, desde, hasta, top=TOP_CLIENTES):
+    """Totales del rango de meses [desde, hasta] contra el mismo rango un
+    año antes, serie mensual y clientes con más ingresos."""
+    i = _ingresos
+    desde_anterior, hasta_anterior = sumar_meses(desde, -12), sumar_meses(hasta, -12)
+
+    # 🔹 Serie mensual (rango actual y el del año anterior en una consulta)
+    por_mes = dict(conexion.execute(
+        select(i.c.periodo, func.sum(i.c.total))
+        .where(
+            (i.c.periodo >= desde_anterior) & (i.c.periodo <= hasta_anterior)
+            | (i.c.periodo >= desde) & (i.c.periodo <= hasta)
+        )
+        .group_by(i.c.periodo)
+    ).all())
+    meses = []
+    periodo = desde
+    while periodo <= hasta:
+        meses.append({
+            "periodo": periodo,
+            "nombre": nombre_periodo(periodo),
+            "total": por_mes.get(periodo, 0) or 0,
+            "anterior": por_mes.get(sumar_meses(periodo, -12), 0) or 0,
+        })
+        periodo = sumar_meses(periodo, 1)
+    total = sum(m["total"] for m in meses)
+    total_anterior = sum(m["anterior"] for m in meses)
+
+    # 🔹 Top clientes del rango, con lo que pagaron un año antes
+    actual = func.sum(i.c.total).filter(i.c.periodo >= desde).label("total")
+    anterior = func.sum(i.c.total).filter(i.c.periodo <= hasta_anterior).label("anterior")
+    top_clientes = conexion.execute(
+        select(User.id, User.nombre, func.coalesce(actual, 0), func.coalesce(anterior, 0))
+        .join(i, i.c.cliente_id == User.id)
+        .where(
+            (i.c.periodo >= desde_anterior) & (i.c.periodo <= hasta_anterior)
+            | (i.c.periodo >= desde) & (i.c.periodo <= hasta)
+        )
+        .group_by(User.id, User.nombre)
+        .having(actual > 0)
+        .order_by(actual.desc())
+        .limit(top)
+    ).all()
+
+    total_general = conexion.execute(select(func.coalesce(func.sum(i.c.total), 0))).scalar()
+
+    return {
+        "meses": meses,
+        "total": total,
+        "total_anterior": total_anterior,
+        "variacion": round((total - total_anterior) / total_anterior * 100, 1) if total_anterior else None,
+        "top_clientes": top_clientes,
+        "total_general": total_general,
+    }
+
+
+# -------------------------------------------------------------------
+# EVENTOS: alta, cambio de estado/monto/periodo o baja de un pago
+# -------------------------------------------------------------------
+@event.listens_for(PagoCliente, "after_insert")
+@event.listens_for(PagoCliente, "after_update")
+@event.listens_for(PagoCliente, "after_delete")
+def _pago_modificado(mapper, conexion, pago):
+    celdas = {(pago.periodo, pago.cliente_id)}
+    estado = inspect(pago)
+    # Si se movió de mes o de cliente, también la celda de origen
+    periodos = estado.attrs.periodo.history.deleted or [pago.periodo]
+    clientes = estado.attrs.cliente_id.history.deleted or [pago.cliente_id]
+    celdas.add((periodos[0], clientes[0]))
+    actualizar_ingreso(conexion, celdas)
@@ -0,0 +1,193 @@
+# =========================================================
+# ⏱️ CONSULTAS SQL Y TIEMPOS POR PETICIÓN
+# =========================================================
+# Los eventos before/after_cursor_execute de todos los engines suman cada
+# consulta (cantidad, tiempo y texto) a las mediciones activas del hilo:
+# la de la petición en curso, la de una vista con @presupuesto_consultas
+# y la de un `with maximo_consultas(n)` de un test. Con eso:
+#   - cada respuesta lleva Server-Timing (db y total),
+#   - las peticiones lentas o con muchas consultas quedan en el log,
+#   - una vista que pasa su presupuesto avisa en el log, o falla si
+#     PRESUPUESTO_CONSULTAS_ESTRICTO (tests / CI). La falla se da en el
+#     COMMIT (evento "commit", antes de confirmar en la base) o al terminar
+#     la vista si no escribió nada: un cambio ya confirmado nunca termina
+#     en un 500, a lo sumo en un warning.
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from functools import wraps
+
+from flask import current_app, g, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+# Misma sentencia más de estas veces en una medición: probable N+1
+REPETICIONES_N_MAS_1 = 10
+
+_local = threading.local()
+
+
+class PresupuestoExcedido(AssertionError):
+    """Una vista o un bloque hizo más consultas de las permitidas."""
+
+
+class Medicion:
+    def __init__(self, presupuesto=None, estricto=False):
+        self.consultas = 0
+        self.segundos = 0.0
+        self.sentencias = Counter()
+        # Solo para las de @presupuesto_consultas
+        self.presupuesto = presupuesto
+        self.estricto = estricto
+        self.commits = 0
+
+    def excedida(self):
+        return self.presupuesto is not None and self.consultas > self.presupuesto
+
+    def repetidas(self, minimo=REPETICIONES_N_MAS_1):
+        """[(sentencia, veces)] que se repiten al menos `minimo` veces."""
+        return [(s, n) for s, n in self.sentencias.most_common() if n >= minimo]
+
+    def detalle(self):
+        lineas = [f"{self.consultas} consultas, {self.segundos * 1000:.1f} ms en la base"]
+        for sentencia, n in self.sentencias.most_common(5):
+            lineas.append(f"  {n}x {' '.join(sentencia.split())[:200]}")
+        return "\n".join(lineas)
+
+
+def _activas():
+    if not hasattr(_local, "mediciones"):
+        _local.mediciones = []
+    return _local.mediciones
+
+
+@contextmanager
+def medir_consultas(medicion=None):
+    """Cuenta las consultas que se hacen en este hilo dentro del bloque."""
+    medicion = medicion or Medicion()
+    activas = _activas()
+    activas.append(medicion)
+    try:
+        yield medicion
+    finally:
+        activas.remove(medicion)
+
+
+@contextmanager
+def maximo_consultas(n):
+    """Para tests: falla si el bloque hace más de `n` consultas.
+
+        with maximo_consultas(4):
+            client.get("/cliente/alumnos")
+    """
+    with medir_consultas() as medicion:
+        yield medicion
+    if medicion.consultas > n:
+        raise PresupuestoExcedido(f"Se esperaban a lo sumo {n}: {medicion.detalle()}")
+
+
+def presupuesto_consultas(n):
+    """Tope de consultas de una vista (sin contar las de before_request).
+
+    Si se pasa: warning en el log, o PresupuestoExcedido con
+    PRESUPUESTO_CONSULTAS_ESTRICTO. En modo estricto el COMMIT que llega
+    con el presupuesto ya pasado falla antes de confirmar; lo que se pase
+    después de un commit queda solo en el log.
+    """
+    def decorador(vista):
+        @wraps(vista)
+        def envoltura(*args, **kwargs):
+            estricto = current_app.config["PRESUPUESTO_CONSULTAS_ESTRICTO"]
+            with medir_consultas(Medicion(n, estricto)) as medicion:
+                respuesta = vista(*args, **kwargs)
+            if medicion.excedida():
+                mensaje = _mensaje_presupuesto(medicion)
+                if estricto and not medicion.commits:
+                    raise PresupuestoExcedido(mensaje)
+                current_app.logger.warning(mensaje)
+            return respuesta
+        envoltura.presupuesto_consultas = n
+        return envoltura
+    return decorador
+
+
+def _mensaje_presupuesto(medicion):
+    return (f"{request.endpoint}: presupuesto de {medicion.presupuesto} consultas superado "
+            f"({medicion.detalle()})")
+
+
+# -------------------------------------------------------------------
+# EVENTOS DE LOS ENGINES
+# -------------------------------------------------------------------
+@event.listens_for(Engine, "before_cursor_execute")
+def _antes(conexion, cursor, sentencia, parametros, contexto, executemany):
+    if _activas():
+        conexion.info.setdefault("inicio_consulta", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _despues(conexion, cursor, sentencia, parametros, contexto, executemany):
+    activas = _activas()
+    inicios = conexion.info.get("inicio_consulta")
+    if not activas or not inicios:
+        return
+    duracion = time.perf_counter() - inicios.pop()
+    for medicion in activas:
+        medicion.consultas += 1
+        medicion.segundos += duracion
+        medicion.sentencias[sentencia] += 1
+
+
+@event.listens_for(Engine, "commit")
+def _antes_del_commit(conexion):
+    # Corre antes del COMMIT real. Si se corta acá, SQLAlchemy no hace
+    # ROLLBACK al devolver la conexión al pool (la transacción ya quedó
+    # inactiva): se hace a mano para no dejar la escritura pendiente.
+    for medicion in _activas():
+        if medicion.excedida() and medicion.estricto and not medicion.commits:
+            conexion.dialect.do_rollback(conexion.connection)
+            raise PresupuestoExcedido(_mensaje_presupuesto(medicion))
+        medicion.commits += 1
+
+
+# -------------------------------------------------------------------
+# POR PETICIÓN: Server-Timing y log de lentas
+# -------------------------------------------------------------------
+def registrar_instrumentacion(app):
+    @app.before_request
+    def _iniciar_medicion():
+        if request.endpoint == "static":
+            return
+        g.inicio_peticion = time.perf_counter()
+        g.medicion = Medicion()
+        _activas().append(g.medicion)
+
+    @app.after_request
+    def _server_timing(response):
+        medicion = g.get("medicion")
+        if medicion is None:
+            return response
+        total = time.perf_counter() - g.inicio_peticion
+        response.headers.add(
+            "Server-Timing",
+            f'db;dur={medicion.segundos * 1000:.1f};desc="{medicion.consultas} consultas", '
+            f"total;dur={total * 1000:.1f}",
+        )
+
+        lenta = total * 1000 >= app.config["PETICION_LENTA_MS"]
+        muchas = medicion.consultas >= app.config["PETICION_MAX_CONSULTAS"]
+        repetidas = medicion.repetidas()
+        if lenta or muchas or repetidas:
+            app.logger.warning(
+                "Petición %s %s (%s) en %.0f ms%s: %s",
+                request.method, request.path, response.status_code, total * 1000,
+                ", posible N+1" if repetidas else "", medicion.detalle(),
+            )
+        return response
+
+    @app.teardown_request
+    def _terminar_medicion(excepcion=None):
+        medicion = g.pop("medicion", None)
+        if medicion is not None and medicion in _activas():
+            _activas().remove(medicion)
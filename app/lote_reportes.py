@@ -0,0 +1,129 @@
+# =========================================================
+# 🗜️ REPORTES PDF EN LOTE (ZIP) CON UN POOL DE PROCESOS
+# =========================================================
+# El proceso principal lee las mediciones por tandas de alumnos y arma
+# datos planos; los PDFs se renderizan en paralelo en otros procesos y se
+# escriben al ZIP a medida que terminan. En memoria solo hay una ventana
+# de reportes en vuelo, nunca el lote completo.
+#
+# El pool y el progreso (`progreso` de zip_en_streaming) son solo para
+# `flask jge exportar-reportes`. Las rutas web renderizan en serie
+# (procesos=1), con REPORTES_MAX_ALUMNOS_WEB de tope y sin progreso: no
+# levantan procesos por petición dentro de un worker de gunicorn y no hay
+# dónde guardar el estado de un trabajo entre workers para consultarlo.
+import io
+import multiprocessing
+import re
+import time
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import date
+from itertools import groupby
+
+from app.models import Alumno, MedicionCorporal
+
+# Alumnos por consulta de mediciones
+TANDA_ALUMNOS = 50
+
+
+def _contexto_procesos():
+    # forkserver: los hijos no heredan conexiones abiertas a la base
+    # (un fork del worker las compartiría con el proceso principal)
+    metodos = multiprocessing.get_all_start_methods()
+    ctx = multiprocessing.get_context("forkserver" if "forkserver" in metodos else "spawn")
+    if ctx.get_start_method() == "forkserver":
+        ctx.set_forkserver_preload(["app.reportes"])
+    return ctx
+
+
+def _nombre_archivo(datos):
+    nombre = re.sub(r"[^\w\-]+", "_", datos["nombre"]).strip("_") or "alumno"
+    return f"Reporte_{nombre}_{datos['alumno_id']}.pdf"
+
+
+def _renderizar(datos, emision):
+    # Corre en los procesos del pool: solo datos planos, sin app ni sesión
+    from app.metricas import observar_pdf
+    from app.reportes import construir_pdf
+
+    inicio = time.perf_counter()
+    pdf = construir_pdf(datos, None, emision)
+    observar_pdf("lote", time.perf_counter() - inicio)
+    return _nombre_archivo(datos), pdf
+
+
+def datos_alumnos(consulta_alumnos):
+    """Genera datos_reporte() de cada alumno, con una consulta por tanda."""
+    from app.reportes import datos_reporte
+
+    alumnos = consulta_alumnos.order_by(Alumno.id).all()
+    for i in range(0, len(alumnos), TANDA_ALUMNOS):
+        tanda = {a.id: a for a in alumnos[i:i + TANDA_ALUMNOS]}
+        mediciones = (
+            MedicionCorporal.query
+            .filter(MedicionCorporal.alumno_id.in_(list(tanda)))
+            .order_by(MedicionCorporal.alumno_id, MedicionCorporal.fecha.asc())
+            .all()
+        )
+        por_alumno = {k: list(g) for k, g in groupby(mediciones, key=lambda m: m.alumno_id)}
+        for alumno_id, alumno in tanda.items():
+            yield datos_reporte(alumno, por_alumno.get(alumno_id, []))
+
+
+def generar_pdfs(datos_iter, procesos=1):
+    """Genera (nombre_archivo, bytes) a medida que se terminan.
+
+    Con procesos=1 renderiza en el mismo proceso. Con más, mantiene a lo
+    sumo 2 reportes en vuelo por proceso.
+    """
+    emision = date.today()
+    if procesos <= 1:
+        for datos in datos_iter:
+            yield _renderizar(datos, emision)
+        return
+
+    with ProcessPoolExecutor(procesos, mp_context=_contexto_procesos()) as pool:
+        pendientes = set()
+        for datos in datos_iter:
+            pendientes.add(pool.submit(_renderizar, datos, emision))
+            if len(pendientes) >= procesos * 2:
+                hechos, pendientes = wait(pendientes, return_when=FIRST_COMPLETED)
+                for futuro in hechos:
+                    yield futuro.result()
+        for futuro in wait(pendientes).done:
+            yield futuro.result()
+
+
+class _Salida(io.RawIOBase):
+    """Destino no buscable para ZipFile: acumula bytes hasta vaciarlo."""
+
+    def __init__(self):
+        self._partes = []
+
+    def writable(self):
+        return True
+
+    def write(self, datos):
+        self._partes.append(bytes(datos))
+        return len(datos)
+
+    def vaciar(self):
+        datos = b"".join(self._partes)
+        self._partes = []
+        return datos
+
+
+def zip_en_streaming(pdfs, progreso=None):
+    """Genera los bytes de un ZIP con los PDFs, uno por uno."""
+    salida = _Salida()
+    # Los PDFs ya vienen comprimidos: se guardan sin volver a comprimir
+    with zipfile.ZipFile(salida, "w", zipfile.ZIP_STORED) as zf:
+        for n, (nombre, pdf) in enumerate(pdfs, start=1):
+            zf.writestr(nombre, pdf)
+            if progreso:
+                progreso(n)
+            datos = salida.vaciar()
+            if datos:
+                yield datos
+    # Directorio central del ZIP
+    yield salida.vaciar()
@@ -1,4 +1,4 @@
-from flask import Blueprint, render_template, redirect, url_for, flash
+from flask import Blueprint, current_app, make_response, render_template, redirect, url_for, flash
 from flask_login import login_user, logout_user, login_required, current_user
 from werkzeug.security import check_password_hash
 from app.forms import LoginForm
@@ -49,3 +49,26 @@ def logout():
     logout_user()
     flash('Has cerrado sesión correctamente.')
     return redirect(url_for('main.login'))
+
+
+# -------------------------------------------------------------------
+# SERVICE WORKER (generado desde el manifiesto de estáticos)
+# -------------------------------------------------------------------
+# Se sirve desde la raíz para que su scope cubra toda la app. La versión
+# sale de los hashes de contenido: al cambiar un CSS/JS cambia el archivo
+# del SW y el navegador instala la versión nueva. Precarga solo los
+# estáticos del layout (app/estaticos.py) y nunca guarda páginas.
+@main.route('/service-worker.js')
+def service_worker():
+    from app.estaticos import version_estaticos
+
+    manifiesto = current_app.extensions["estaticos"]
+    response = make_response(render_template(
+        'service_worker.js',
+        version=version_estaticos(manifiesto),
+        precache=current_app.extensions["estaticos_precache"],
+    ))
+    response.headers['Content-Type'] = 'application/javascript; charset=utf-8'
+    # El navegador tiene que revalidar el SW siempre
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
@@ -0,0 +1,147 @@
+# =========================================================
+# 📡 MÉTRICAS EN FORMATO PROMETHEUS (/metrics)
+# =========================================================
+# Latencia y respuestas por endpoint de main, cliente y admin, estado del
+# pool de conexiones, duración de los PDFs, resultado del control de pago
+# y aciertos de los caches.
+#
+# Con varios workers de gunicorn cada proceso escribe sus valores en
+# archivos mmap dentro de PROMETHEUS_MULTIPROC_DIR (lo prepara
+# gunicorn.conf.py) y /metrics suma los de todos. Sin esa variable (un
+# solo proceso, `flask run`) se usa el registro en memoria.
+#
+# Pool y caches ya llevan contadores propios por proceso (app/pool.py,
+# CacheLRU, app/condicional.py): acá se pasan a Prometheus como
+# diferencias desde la última sincronización.
+import hmac
+import os
+import threading
+import time
+
+from flask import Response, abort, current_app, g, request
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest,
+)
+
+BLUEPRINTS_MEDIDOS = ("main", "cliente", "admin")
+
+PETICION_SEGUNDOS = Histogram(
+    "jgefitrack_peticion_segundos", "Duración de las peticiones", ["endpoint", "metodo"],
+)
+PETICIONES = Counter(
+    "jgefitrack_peticiones", "Respuestas por endpoint y código", ["endpoint", "metodo", "estado"],
+)
+PDF_SEGUNDOS = Histogram(
+    "jgefitrack_pdf_segundos", "Tiempo de render de cada PDF", ["tipo"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+CONTROL_PAGO = Counter(
+    "jgefitrack_control_pago", "Resultado del control de suscripción por petición", ["resultado"],
+)
+CACHE_ACIERTOS = Counter("jgefitrack_cache_aciertos", "Aciertos de cache", ["cache"])
+CACHE_FALLOS = Counter("jgefitrack_cache_fallos", "Fallos de cache", ["cache"])
+CACHE_BYTES = Gauge("jgefitrack_cache_bytes", "Bytes en cache", ["cache"], multiprocess_mode="livesum")
+
+POOL_CONEXIONES = Gauge(
+    "jgefitrack_pool_conexiones", "Conexiones del pool por estado", ["estado"], multiprocess_mode="livesum",
+)
+POOL_CHECKOUTS = Counter("jgefitrack_pool_checkouts", "Conexiones entregadas por el pool")
+POOL_ESPERA = Counter("jgefitrack_pool_espera_segundos", "Tiempo total esperando una conexión")
+POOL_ESPERAS_LENTAS = Counter("jgefitrack_pool_esperas_lentas", "Esperas por conexión de más de 100 ms")
+POOL_TIMEOUTS = Counter("jgefitrack_pool_timeouts", "Peticiones sin conexión antes del timeout")
+POOL_INVALIDADAS = Counter("jgefitrack_pool_invalidadas", "Conexiones descartadas por rotas")
+
+_lock = threading.Lock()
+# (métrica, etiqueta) -> último valor visto de un contador propio
+_ultimos = {}
+
+
+def _sumar_diferencia(contador, clave, actual, **etiquetas):
+    """Pasa a `contador` lo que creció `actual` desde la última vez (si
+    bajó, el contador de origen se reinició: se suma entero)."""
+    with _lock:
+        anterior = _ultimos.get(clave, 0)
+        _ultimos[clave] = actual
+    diferencia = actual - anterior if actual >= anterior else actual
+    if diferencia > 0:
+        (contador.labels(**etiquetas) if etiquetas else contador).inc(diferencia)
+
+
+def observar_pdf(tipo, segundos):
+    PDF_SEGUNDOS.labels(tipo=tipo).observe(segundos)
+
+
+def contar_control_pago(resultado):
+    CONTROL_PAGO.labels(resultado=resultado).inc()
+
+
+def sincronizar():
+    """Vuelca pool y caches de este proceso (se llama en cada petición)."""
+    from app.condicional import estadisticas
+    from app.extensions import db
+    from app.graficos import cache_graficos
+    from app.pool import estadisticas_pool
+    from app.reportes import cache_pdf
+
+    pool = estadisticas_pool(db.engine)
+    if "ocupadas" in pool:
+        POOL_CONEXIONES.labels(estado="en_uso").set(pool["ocupadas"])
+        POOL_CONEXIONES.labels(estado="libres").set(pool["libres"])
+        POOL_CONEXIONES.labels(estado="desborde").set(max(pool["desborde"], 0))
+    _sumar_diferencia(POOL_CHECKOUTS, "pool_checkouts", pool["checkouts"])
+    _sumar_diferencia(POOL_ESPERA, "pool_espera", pool["espera_total"])
+    _sumar_diferencia(POOL_ESPERAS_LENTAS, "pool_esperas_lentas", pool["esperas_lentas"])
+    _sumar_diferencia(POOL_TIMEOUTS, "pool_timeouts", pool["timeouts"])
+    _sumar_diferencia(POOL_INVALIDADAS, "pool_invalidadas", pool["invalidadas"])
+
+    for nombre, cache in (("pdf", cache_pdf()), ("graficos", cache_graficos())):
+        datos = cache.estadisticas()
+        _sumar_diferencia(CACHE_ACIERTOS, ("aciertos", nombre), datos["aciertos"], cache=nombre)
+        _sumar_diferencia(CACHE_FALLOS, ("fallos", nombre), datos["fallos"], cache=nombre)
+        CACHE_BYTES.labels(cache=nombre).set(datos["bytes"])
+    condicionales = estadisticas()
+    _sumar_diferencia(CACHE_ACIERTOS, ("aciertos", "etag"), condicionales["aciertos"], cache="etag")
+    _sumar_diferencia(CACHE_FALLOS, ("fallos", "etag"), condicionales["fallos"], cache="etag")
+
+
+def _registro():
+    if "PROMETHEUS_MULTIPROC_DIR" not in os.environ:
+        return REGISTRY
+    from prometheus_client import multiprocess
+
+    registro = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registro)
+    return registro
+
+
+def registrar_metricas(app):
+    @app.before_request
+    def _inicio():
+        if request.blueprint in BLUEPRINTS_MEDIDOS:
+            g.inicio_metricas = time.perf_counter()
+
+    @app.after_request
+    def _registrar(response):
+        inicio = g.pop("inicio_metricas", None)
+        if inicio is None:
+            return response
+        endpoint, metodo = request.endpoint, request.method
+        PETICION_SEGUNDOS.labels(endpoint=endpoint, metodo=metodo).observe(time.perf_counter() - inicio)
+        PETICIONES.labels(endpoint=endpoint, metodo=metodo, estado=str(response.status_code)).inc()
+        sincronizar()
+        return response
+
+    def metricas():
+        # Solo con "Authorization: Bearer <METRICAS_TOKEN>". Sin token
+        # configurado no se publica nada, salvo en debug / tests.
+        token = current_app.config["METRICAS_TOKEN"]
+        if not token and not (current_app.debug or current_app.testing):
+            abort(404)
+        if token:
+            enviado = request.headers.get("Authorization", "").removeprefix("Bearer ").strip()
+            if not hmac.compare_digest(enviado.encode(), token.encode()):
+                return Response("No autorizado\n", 401, {"WWW-Authenticate": "Bearer"})
+        sincronizar()
+        return Response(generate_latest(_registro()), content_type=CONTENT_TYPE_LATEST)
+
+    app.add_url_rule("/metrics", "metricas", metricas)
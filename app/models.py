@@ -2,6 +2,7 @@ from app.extensions import db
 from flask_login import UserMixin
 from datetime import datetime
 import math
+from app.periodos import nombre_periodo, periodo_actual
 
 # =========================================================
 # 👤 USUARIO / CLIENTE
@@ -11,9 +12,19 @@ class User(db.Model, UserMixin):
     username = db.Column(db.String(50), unique=True, nullable=False)
     password = db.Column(db.String(200), nullable=False)
     nombre = db.Column(db.String(100), nullable=False)
-    is_admin = db.Column(db.Boolean, default=False)
+    is_admin = db.Column(db.Boolean, default=False, index=True)
     fecha_registro = db.Column(db.DateTime, default=datetime.utcnow)
 
+    # Contadores desnormalizados (app/contadores.py los mantiene)
+    total_alumnos = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    total_mediciones = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+
+    # Último día cubierto por un pago aprobado (app/suscripciones.py)
+    activo_hasta = db.Column(db.Date)
+
+    # Sube con cada escritura de sus datos (app/versiones.py): ETags de las vistas
+    version_datos = db.Column(db.Integer, nullable=False, default=1, server_default='1')
+
     pagos = db.relationship(
         'PagoCliente',
         backref='cliente',
@@ -31,6 +42,10 @@ class User(db.Model, UserMixin):
 # 🧍 ALUMNO
 # =========================================================
 class Alumno(db.Model):
+    __table_args__ = (
+        db.Index('ix_alumno_cliente_fecha_creacion', 'cliente_id', 'fecha_creacion'),
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     nombre = db.Column(db.String(100), nullable=False)
     edad = db.Column(db.Integer)
@@ -41,6 +56,9 @@ class Alumno(db.Model):
         nullable=False
     )
     fecha_creacion = db.Column(db.DateTime, default=datetime.utcnow)
+    total_mediciones = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    # Sube cada vez que cambian sus mediciones (ETags de gráficos/reportes)
+    version_mediciones = db.Column(db.Integer, nullable=False, default=1, server_default='1')
 
     mediciones = db.relationship(
         'MedicionCorporal',
@@ -49,6 +67,13 @@ class Alumno(db.Model):
         passive_deletes=True,
         lazy=True
     )
+    # Solo lectura: la fila la mantiene app.progreso al escribir mediciones
+    resumen = db.relationship(
+        'ResumenAlumno',
+        uselist=False,
+        viewonly=True,
+        lazy=True
+    )
 
 # =========================================================
 # 📊 MEDICIÓN CORPORAL
@@ -195,11 +220,46 @@ class MedicionCorporal(db.Model):
         self.calcular_relaciones()
         self.calcular_musculo()
 
+# =========================================================
+# 📈 RESUMEN DE PROGRESO POR ALUMNO
+# =========================================================
+# Una fila por alumno con mediciones: última medición, diferencias contra
+# la anterior y estado de progreso. Se actualiza en app/progreso.py cada
+# vez que se insertan, editan o borran mediciones.
+class ResumenAlumno(db.Model):
+    __tablename__ = 'resumen_alumno'
+
+    alumno_id = db.Column(
+        db.Integer,
+        db.ForeignKey('alumno.id', ondelete='CASCADE'),
+        primary_key=True
+    )
+    total_mediciones = db.Column(db.Integer, nullable=False, default=0)
+    ultima_fecha = db.Column(db.Date)
+    peso = db.Column(db.Float)
+    imc = db.Column(db.Float)
+    grasa_corporal = db.Column(db.Float)
+    musculo = db.Column(db.Float)
+    agua_corporal = db.Column(db.Float)
+    dif_peso = db.Column(db.Float)
+    dif_imc = db.Column(db.Float)
+    dif_grasa = db.Column(db.Float)
+    dif_musculo = db.Column(db.Float)
+    dif_agua = db.Column(db.Float)
+    estado_progreso = db.Column(db.String(10), nullable=False, default='neutral')
+    actualizado = db.Column(db.DateTime, default=datetime.utcnow)
+
 # =========================================================
 # 💰 PAGO CLIENTE
 # =========================================================
 class PagoCliente(db.Model):
     __tablename__ = 'pagos_clientes'
+    __table_args__ = (
+        db.Index('ix_pagos_cliente_periodo_estado', 'cliente_id', 'periodo', 'estado'),
+        db.Index('ix_pagos_periodo_estado', 'periodo', 'estado'),
+        db.Index('ix_pagos_cliente_estado_fecha', 'cliente_id', 'estado', 'fecha_pago'),
+        db.Index('ix_pagos_fecha_id', 'fecha_pago', 'id'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     cliente_id = db.Column(
@@ -209,5 +269,53 @@ class PagoCliente(db.Model):
     )
     monto = db.Column(db.Float, nullable=False)
     fecha_pago = db.Column(db.DateTime, default=datetime.utcnow)
-    mes_correspondiente = db.Column(db.String(20), nullable=False)
+    mes_correspondiente = db.Column(db.String(20), nullable=False)  # Texto para mostrar (legado)
+    periodo = db.Column(db.Date, nullable=False, default=periodo_actual)  # Primer día del mes que cubre
     estado = db.Column(db.String(20), default='Pendiente')  # Pendiente / Aprobado / Rechazado
+
+    @property
+    def nombre_periodo(self):
+        return nombre_periodo(self.periodo)
+
+# =========================================================
+# 📆 INGRESOS POR MES Y CLIENTE (consolidado de pagos aprobados)
+# =========================================================
+# Lo mantiene app/ingresos.py cuando cambia un pago; el informe de
+# ingresos lee estas filas en lugar de sumar todo pagos_clientes.
+class IngresoMensual(db.Model):
+    __tablename__ = 'ingreso_mensual'
+
+    periodo = db.Column(db.Date, primary_key=True)
+    cliente_id = db.Column(
+        db.Integer,
+        db.ForeignKey('user.id', ondelete='CASCADE'),
+        primary_key=True
+    )
+    total = db.Column(db.Float, nullable=False, default=0)
+    pagos = db.Column(db.Integer, nullable=False, default=0)
+
+# =========================================================
+# 📊 ESTADÍSTICAS DE LA PLATAFORMA (dashboard del admin)
+# =========================================================
+# Las mantiene app/estadisticas.py con los eventos del mapper;
+# `flask jge reconciliar-estadisticas` las recalcula desde cero.
+class EstadisticaTotal(db.Model):
+    """Fila única (id=1) con los totales actuales."""
+    __tablename__ = 'estadistica_total'
+
+    id = db.Column(db.Integer, primary_key=True)
+    clientes = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    alumnos = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    mediciones = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+
+
+class EstadisticaDiaria(db.Model):
+    """Altas de cada día y foto de suscripciones activas."""
+    __tablename__ = 'estadistica_diaria'
+
+    fecha = db.Column(db.Date, primary_key=True)
+    clientes_nuevos = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    alumnos_nuevos = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    mediciones_nuevas = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    # NULL = hay que volver a contarlas (cambió un pago ese día)
+    suscripciones_activas = db.Column(db.Integer)
@@ -0,0 +1,94 @@
+# =========================================================
+# 💰 LISTADO DE PAGOS PAGINADO POR CURSOR (keyset)
+# =========================================================
+# Orden fijo (fecha_pago DESC, id DESC). En vez de OFFSET, cada página
+# arranca después de la última fila de la anterior: el costo no crece con
+# el historial. El nombre del cliente viene en el mismo JOIN y el
+# vencimiento / días restantes se calculan en SQL.
+from datetime import datetime
+
+from sqlalchemy import and_, or_, select
+
+from app.models import PagoCliente, User
+from app.sql import dias_hasta, sumar_dias
+
+# Días que cubre un pago desde su fecha
+DIAS_VIGENCIA = 30
+POR_PAGINA = 50
+ESTADOS = ("Pendiente", "Aprobado", "Rechazado")
+
+
+def codificar_cursor(fila):
+    return f"{fila.fecha_pago.isoformat()}_{fila.id}"
+
+
+def decodificar_cursor(texto):
+    """(fecha_pago, id) o None si el cursor no es válido."""
+    try:
+        fecha, id_ = (texto or "").rsplit("_", 1)
+        return datetime.fromisoformat(fecha), int(id_)
+    except ValueError:
+        return None
+
+
+def consulta_pagos(estado=None, periodo=None, cliente_id=None, cursor=None, hacia_atras=False, limite=POR_PAGINA):
+    """SELECT de una página (pide limite + 1 filas para saber si hay más).
+
+    `cursor` es (fecha_pago, id) de la fila límite. Hacia adelante trae
+    las filas anteriores a ella (más viejas); hacia atrás, las posteriores,
+    en orden ascendente (quien llama las invierte).
+    """
+    p = PagoCliente
+    vencimiento = sumar_dias(p.fecha_pago, DIAS_VIGENCIA)
+    consulta = (
+        select(
+            p.id, p.monto, p.periodo, p.mes_correspondiente, p.fecha_pago, p.estado,
+            User.nombre.label("cliente_nombre"),
+            vencimiento.label("vencimiento"),
+            dias_hasta(vencimiento).label("dias_restantes"),
+        )
+        .join(User, User.id == p.cliente_id)
+    )
+    if estado:
+        consulta = consulta.where(p.estado == estado)
+    if periodo:
+        consulta = consulta.where(p.periodo == periodo)
+    if cliente_id:
+        consulta = consulta.where(p.cliente_id == cliente_id)
+
+    if cursor:
+        fecha, id_ = cursor
+        if hacia_atras:
+            consulta = consulta.where(or_(p.fecha_pago > fecha, and_(p.fecha_pago == fecha, p.id > id_)))
+        else:
+            consulta = consulta.where(or_(p.fecha_pago < fecha, and_(p.fecha_pago == fecha, p.id < id_)))
+
+    if hacia_atras:
+        consulta = consulta.order_by(p.fecha_pago.asc(), p.id.asc())
+    else:
+        consulta = consulta.order_by(p.fecha_pago.desc(), p.id.desc())
+    return consulta.limit(limite + 1)
+
+
+def pagina_pagos(conexion, estado=None, periodo=None, cliente_id=None, despues=None, antes=None, limite=POR_PAGINA):
+    """Devuelve (filas, cursor_siguiente, cursor_anterior).
+
+    `despues`: cursor de la última fila vista (página siguiente).
+    `antes`: cursor de la primera fila vista (página anterior).
+    """
+    hacia_atras = antes is not None and despues is None
+    cursor = antes if hacia_atras else despues
+    filas = conexion.execute(
+        consulta_pagos(estado, periodo, cliente_id, cursor, hacia_atras, limite)
+    ).all()
+    hay_mas = len(filas) > limite
+    filas = filas[:limite]
+
+    if hacia_atras:
+        filas.reverse()
+        siguiente = codificar_cursor(filas[-1]) if filas else None
+        anterior = codificar_cursor(filas[0]) if filas and hay_mas else None
+    else:
+        siguiente = codificar_cursor(filas[-1]) if filas and hay_mas else None
+        anterior = codificar_cursor(filas[0]) if filas and cursor else None
+    return filas, siguiente, anterior
@@ -0,0 +1,50 @@
+# =========================================================
+# 📅 PERIODOS DE FACTURACIÓN (primer día de cada mes)
+# =========================================================
+# Los pagos se asocian a un mes guardado como fecha (PagoCliente.periodo)
+# en lugar del texto "%B %Y", que dependía del locale del servidor y no
+# se podía filtrar por rango.
+import calendar
+from datetime import date
+
+MESES = [
+    (1, "Enero"), (2, "Febrero"), (3, "Marzo"), (4, "Abril"),
+    (5, "Mayo"), (6, "Junio"), (7, "Julio"), (8, "Agosto"),
+    (9, "Septiembre"), (10, "Octubre"), (11, "Noviembre"), (12, "Diciembre")
+]
+
+
+def inicio_de_mes(dia):
+    return date(dia.year, dia.month, 1)
+
+
+def fin_de_mes(dia):
+    return date(dia.year, dia.month, calendar.monthrange(dia.year, dia.month)[1])
+
+
+def periodo_actual():
+    return inicio_de_mes(date.today())
+
+
+def mes_siguiente(periodo):
+    if periodo.month == 12:
+        return date(periodo.year + 1, 1, 1)
+    return date(periodo.year, periodo.month + 1, 1)
+
+
+def sumar_meses(periodo, n):
+    """Primer día del mes `n` meses después (o antes, si n < 0)."""
+    mes = periodo.year * 12 + periodo.month - 1 + n
+    return date(mes // 12, mes % 12 + 1, 1)
+
+
+def rango_mes(anio, mes):
+    """(desde, hasta) para filtrar `desde <= columna < hasta`."""
+    desde = date(anio, mes, 1)
+    return desde, mes_siguiente(desde)
+
+
+def nombre_periodo(periodo):
+    if periodo is None:
+        return ""
+    return f"{dict(MESES)[periodo.month]} {periodo.year}"
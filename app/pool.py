@@ -0,0 +1,116 @@
+# =========================================================
+# 🔌 POOL DE CONEXIONES: ESPERAS Y OCUPACIÓN (por proceso)
+# =========================================================
+# Las opciones del pool salen del entorno (config.opciones_motor). Acá se
+# miden, con los eventos del pool, cuántas conexiones están en uso y cuánto
+# espera cada petición para conseguir una. La espera se toma en
+# PoolMedido._do_get: es el único punto donde se bloquea cuando el pool
+# está lleno (no hay un evento "antes del checkout").
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as TimeoutPool
+from sqlalchemy.pool import QueuePool
+
+# Una espera por encima de esto cuenta como lenta (segundos)
+ESPERA_LENTA = 0.1
+
+_lock = threading.Lock()
+_estadisticas = {
+    "checkouts": 0,
+    "checkins": 0,
+    "conexiones_nuevas": 0,
+    "invalidadas": 0,
+    "en_uso": 0,
+    "max_en_uso": 0,
+    "espera_total": 0.0,
+    "espera_max": 0.0,
+    "esperas_lentas": 0,
+    "timeouts": 0,
+}
+
+
+class PoolMedido(QueuePool):
+    """QueuePool que registra cuánto tarda en entregar cada conexión."""
+
+    def _do_get(self):
+        inicio = time.perf_counter()
+        try:
+            return super()._do_get()
+        except TimeoutPool:
+            with _lock:
+                _estadisticas["timeouts"] += 1
+            raise
+        finally:
+            espera = time.perf_counter() - inicio
+            with _lock:
+                _estadisticas["espera_total"] += espera
+                _estadisticas["espera_max"] = max(_estadisticas["espera_max"], espera)
+                if espera >= ESPERA_LENTA:
+                    _estadisticas["esperas_lentas"] += 1
+
+
+def opciones_con_medicion(opciones):
+    """Agrega PoolMedido a SQLALCHEMY_ENGINE_OPTIONS si el pool es de tamaño
+    fijo (no en SQLite en memoria, que usa un pool estático)."""
+    if "pool_size" in opciones and "poolclass" not in opciones:
+        return {**opciones, "poolclass": PoolMedido}
+    return opciones
+
+
+# -------------------------------------------------------------------
+# EVENTOS DEL POOL (cualquier PoolMedido)
+# -------------------------------------------------------------------
+@event.listens_for(PoolMedido, "connect")
+def _conexion_nueva(conexion_dbapi, registro):
+    with _lock:
+        _estadisticas["conexiones_nuevas"] += 1
+
+
+@event.listens_for(PoolMedido, "checkout")
+def _entregada(conexion_dbapi, registro, proxy):
+    with _lock:
+        _estadisticas["checkouts"] += 1
+        _estadisticas["en_uso"] += 1
+        _estadisticas["max_en_uso"] = max(_estadisticas["max_en_uso"], _estadisticas["en_uso"])
+
+
+@event.listens_for(PoolMedido, "checkin")
+def _devuelta(conexion_dbapi, registro):
+    with _lock:
+        _estadisticas["checkins"] += 1
+        _estadisticas["en_uso"] = max(_estadisticas["en_uso"] - 1, 0)
+
+
+@event.listens_for(PoolMedido, "invalidate")
+def _invalidada(conexion_dbapi, registro, excepcion):
+    # Pre-ping fallido, conexión cortada por el servidor, etc.
+    with _lock:
+        _estadisticas["invalidadas"] += 1
+
+
+def reiniciar_estadisticas():
+    """Para un proceso recién forkeado: lo heredado no es suyo."""
+    with _lock:
+        for clave in _estadisticas:
+            _estadisticas[clave] = 0.0 if isinstance(_estadisticas[clave], float) else 0
+
+
+def estadisticas_pool(engine):
+    """Contadores del proceso más el estado actual del pool del engine."""
+    with _lock:
+        datos = dict(_estadisticas)
+    datos["espera_promedio"] = (
+        round(datos["espera_total"] / datos["checkouts"], 6) if datos["checkouts"] else None
+    )
+    pool = engine.pool
+    if isinstance(pool, QueuePool):
+        datos.update(
+            tamanio=pool.size(),
+            libres=pool.checkedin(),
+            desborde=pool.overflow(),
+            ocupadas=pool.checkedout(),
+            timeout=pool.timeout(),
+        )
+    return datos
@@ -0,0 +1,289 @@
+# =========================================================
+# 📈 RESUMEN DE PROGRESO POR ALUMNO
+# =========================================================
+# Mantiene la tabla resumen_alumno al día: cada flush que toca mediciones
+# recalcula solo los alumnos afectados (dos filas más recientes + conteo,
+# ambos por el índice uq_alumno_fecha). Las vistas leen una fila por
+# alumno en lugar de recorrer todo el historial.
+from datetime import datetime
+from types import SimpleNamespace
+
+from sqlalchemy import delete, event, func, inspect, select, update
+from sqlalchemy.orm import Session
+
+from app.models import Alumno, MedicionCorporal, ResumenAlumno
+from app.sql import upsert
+from app.versiones import subir_version_datos
+
+CAMPOS_DIFERENCIA = (
+    ("dif_peso", "peso"),
+    ("dif_imc", "imc"),
+    ("dif_musculo", "musculo"),
+    ("dif_grasa", "grasa_corporal"),
+    ("dif_agua", "agua_corporal"),
+)
+
+
+def _diferencia(actual, anterior):
+    if actual is None or anterior is None:
+        return None
+    return round(actual - anterior, 2)
+
+
+def evaluar_progreso(actual, anterior):
+    """Diferencias entre las dos últimas mediciones y estado de progreso.
+
+    `actual` y `anterior` son cualquier objeto con peso, imc, musculo,
+    grasa_corporal y agua_corporal (filas o modelos); `anterior` puede ser
+    None si el alumno tiene una sola medición.
+    """
+    if anterior is None:
+        return {campo: None for campo, _ in CAMPOS_DIFERENCIA} | {"estado_progreso": "neutral"}
+
+    difs = {
+        campo: _diferencia(getattr(actual, col), getattr(anterior, col))
+        for campo, col in CAMPOS_DIFERENCIA
+    }
+    dif_peso = difs["dif_peso"] or 0
+    dif_musc = difs["dif_musculo"] or 0
+    dif_grasa = difs["dif_grasa"] or 0
+
+    # --------- DECISIÓN DEL ESTADO (score simple) ----------
+    score = 0
+    if dif_musc > 0: score += 1
+    if dif_grasa < 0: score += 1
+    if dif_grasa > 0: score -= 1
+    if dif_musc < 0: score -= 1
+    # (opcional) peso ayuda si acompaña grasa ↓
+    if dif_peso < 0 and dif_grasa < 0: score += 1
+
+    if score >= 1:
+        estado = "positivo"
+    elif score <= -1:
+        estado = "negativo"
+    else:
+        estado = "neutral"
+    return difs | {"estado_progreso": estado}
+
+
+def resumen_de_mediciones(mediciones):
+    """Lo mismo que la fila de resumen_alumno, calculado en memoria a partir
+    de las mediciones ya cargadas (en orden de fecha), sin escribir nada."""
+    if not mediciones:
+        return None
+    anterior = mediciones[-2] if len(mediciones) > 1 else None
+    return SimpleNamespace(
+        total_mediciones=len(mediciones),
+        **evaluar_progreso(mediciones[-1], anterior),
+    )
+
+
+def mensajes_progreso(resumen):
+    """Arma los mensajes del recuadro de progreso a partir del resumen."""
+    if resumen is None or resumen.total_mediciones < 2:
+        return ["🩺 Aún no hay suficientes mediciones para mostrar evolución."]
+
+    mensajes = []
+    dif_peso = resumen.dif_peso
+    dif_imc = resumen.dif_imc
+    dif_musc = resumen.dif_musculo
+    dif_grasa = resumen.dif_grasa
+    dif_agua = resumen.dif_agua
+
+    # Mensajes (no definen el estado)
+    if dif_peso:
+        if dif_peso > 0:
+            mensajes.append(f"⚖️ Subió {dif_peso} kg de peso.")
+        else:
+            mensajes.append(f"⚖️ Bajó {abs(dif_peso)} kg de peso.")
+
+    if dif_imc:
+        if dif_imc > 0:
+            mensajes.append(f"📈 El IMC subió {dif_imc} puntos.")
+        else:
+            mensajes.append(f"📉 El IMC bajó {abs(dif_imc)} puntos.")
+
+    if dif_musc:
+        if dif_musc > 0:
+            mensajes.append(f"💪 La masa muscular aumentó {dif_musc} puntos.")
+        else:
+            mensajes.append(f"💤 La masa muscular bajó {abs(dif_musc)} puntos.")
+
+    if dif_grasa:
+        if dif_grasa > 0:
+            mensajes.append(f"⚠️ El porcentaje de grasa aumentó {dif_grasa} puntos.")
+        else:
+            mensajes.append(f"🔥 Redujo la grasa corporal en {abs(dif_grasa)} puntos.")
+
+    if dif_agua:
+        if dif_agua > 0:
+            mensajes.append(f"💧 Aumentó la hidratación en {dif_agua} %.")
+        else:
+            mensajes.append(f"💧 Bajó el nivel de agua corporal {abs(dif_agua)} %.")
+
+    encabezado = {
+        "positivo": "💪 El progreso es excelente, ¡seguí así!",
+        "negativo": "⚠️ Algunos indicadores empeoraron, revisá entrenamiento y/o dieta.",
+        "neutral": "💧 Progreso estable entre las últimas mediciones.",
+    }[resumen.estado_progreso]
+    return [encabezado] + mensajes
+
+
+# -------------------------------------------------------------------
+# CÁLCULO DE LA FILA DE RESUMEN
+# -------------------------------------------------------------------
+def _fila_resumen(alumno_id, total, actual, anterior):
+    return {
+        "alumno_id": alumno_id,
+        "total_mediciones": total,
+        "ultima_fecha": actual.fecha,
+        "peso": actual.peso,
+        "imc": actual.imc,
+        "grasa_corporal": actual.grasa_corporal,
+        "musculo": actual.musculo,
+        "agua_corporal": actual.agua_corporal,
+        **evaluar_progreso(actual, anterior),
+        "actualizado": datetime.utcnow(),
+    }
+
+
+# Alumnos por consulta al recalcular varios a la vez (tope del IN)
+ALUMNOS_POR_CONSULTA = 500
+
+
+def _consulta_ultimas_dos(alumno_ids=None):
+    """Las dos mediciones más recientes de cada alumno y su total, en
+    orden (alumno_id, posicion), con funciones de ventana."""
+    m = MedicionCorporal
+    ventana = select(
+        m.alumno_id, m.fecha, m.peso, m.imc, m.grasa_corporal,
+        m.musculo, m.agua_corporal,
+        func.row_number().over(partition_by=m.alumno_id, order_by=m.fecha.desc()).label("posicion"),
+        func.count().over(partition_by=m.alumno_id).label("total"),
+    )
+    if alumno_ids is not None:
+        ventana = ventana.where(m.alumno_id.in_(alumno_ids))
+    ventana = ventana.subquery()
+    return (
+        select(ventana)
+        .where(ventana.c.posicion <= 2)
+        .order_by(ventana.c.alumno_id, ventana.c.posicion)
+    )
+
+
+def _resumenes_de(filas):
+    """Arma una fila de resumen por alumno a partir de _consulta_ultimas_dos."""
+    actual = None
+    for fila in filas:
+        if fila.posicion == 1:
+            if actual is not None:
+                yield _fila_resumen(actual.alumno_id, actual.total, actual, None)
+            actual = fila
+        else:
+            yield _fila_resumen(actual.alumno_id, actual.total, actual, fila)
+            actual = None
+    if actual is not None:
+        yield _fila_resumen(actual.alumno_id, actual.total, actual, None)
+
+
+def actualizar_resumenes(conexion, alumno_ids):
+    """Recalcula (o borra si ya no hay mediciones) el resumen de cada alumno.
+
+    Un alumno (lo de cada flush): dos lecturas por el índice. Varios
+    (importación, recálculo): una consulta con ventanas cada
+    ALUMNOS_POR_CONSULTA, no dos por alumno.
+
+    También sube Alumno.version_mediciones: todo lo que escribe mediciones
+    pasa por acá (eventos del flush, importación, recálculo).
+    """
+    m = MedicionCorporal
+    tabla = ResumenAlumno.__table__
+    alumno_ids = list(alumno_ids)
+    filas = []
+
+    if len(alumno_ids) == 1:
+        alumno_id = alumno_ids[0]
+        ultimas = conexion.execute(
+            select(m.fecha, m.peso, m.imc, m.grasa_corporal, m.musculo, m.agua_corporal)
+            .where(m.alumno_id == alumno_id)
+            .order_by(m.fecha.desc())
+            .limit(2)
+        ).all()
+        if ultimas:
+            total = conexion.execute(
+                select(func.count()).select_from(m).where(m.alumno_id == alumno_id)
+            ).scalar()
+            anterior = ultimas[1] if len(ultimas) > 1 else None
+            filas.append(_fila_resumen(alumno_id, total, ultimas[0], anterior))
+    else:
+        for inicio in range(0, len(alumno_ids), ALUMNOS_POR_CONSULTA):
+            parte = alumno_ids[inicio:inicio + ALUMNOS_POR_CONSULTA]
+            filas.extend(_resumenes_de(conexion.execute(_consulta_ultimas_dos(parte))))
+
+    con_mediciones = {f["alumno_id"] for f in filas}
+    vacios = [a for a in alumno_ids if a not in con_mediciones]
+    if vacios:
+        conexion.execute(delete(tabla).where(tabla.c.alumno_id.in_(vacios)))
+    upsert(conexion, tabla, filas, ("alumno_id",))
+    _subir_version(conexion, alumno_ids)
+
+
+def _subir_version(conexion, alumno_ids=None):
+    """Invalida gráficos/reportes cacheados de esos alumnos (o de todos)."""
+    alumnos = Alumno.__table__
+    stmt = update(alumnos).values(version_mediciones=alumnos.c.version_mediciones + 1)
+    if alumno_ids is not None:
+        if not alumno_ids:
+            return
+        stmt = stmt.where(alumnos.c.id.in_(list(alumno_ids)))
+    conexion.execute(stmt)
+
+
+def reconstruir_resumenes(conexion, tamanio_tanda=2000):
+    """Regenera toda la tabla de resúmenes en una pasada.
+
+    Una sola consulta con funciones de ventana trae, por alumno, las dos
+    mediciones más recientes y el total; se recorre en streaming y se
+    inserta por tandas. Devuelve la cantidad de resúmenes escritos.
+    """
+    tabla = ResumenAlumno.__table__
+    conexion.execute(delete(tabla))
+    _subir_version(conexion)
+    subir_version_datos(conexion)
+    escritos = 0
+    tanda = []
+    filas = conexion.execute(_consulta_ultimas_dos().execution_options(yield_per=tamanio_tanda))
+    for fila in _resumenes_de(filas):
+        tanda.append(fila)
+        if len(tanda) >= tamanio_tanda:
+            upsert(conexion, tabla, tanda, ("alumno_id",))
+            escritos += len(tanda)
+            tanda = []
+    upsert(conexion, tabla, tanda, ("alumno_id",))
+    return escritos + len(tanda)
+
+
+# -------------------------------------------------------------------
+# EVENTOS: mantener el resumen en cada flush
+# -------------------------------------------------------------------
+@event.listens_for(Session, "after_flush")
+def _resumenes_tras_flush(session, flush_context):
+    afectados = set()
+    borrados = set()
+
+    for obj in session.new | session.dirty | session.deleted:
+        if isinstance(obj, MedicionCorporal):
+            estado = inspect(obj)
+            if obj.alumno_id is not None:
+                afectados.add(obj.alumno_id)
+            # Si la medición cambió de alumno, el anterior también cambia
+            afectados.update(estado.attrs.alumno_id.history.deleted or ())
+        elif isinstance(obj, Alumno) and obj in session.deleted:
+            borrados.add(obj.id)
+
+    afectados -= borrados
+    if borrados:
+        tabla = ResumenAlumno.__table__
+        session.connection().execute(delete(tabla).where(tabla.c.alumno_id.in_(borrados)))
+    if afectados:
+        actualizar_resumenes(session.connection(), sorted(afectados))
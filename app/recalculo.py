@@ -0,0 +1,239 @@
+# =========================================================
+# ♻️ RECÁLCULO MASIVO DE MÉTRICAS DERIVADAS (NumPy)
+# =========================================================
+# Mismas fórmulas, recortes y redondeos que MedicionCorporal.calcular_todo,
+# pero aplicadas sobre columnas completas en lugar de fila por fila.
+import time
+
+import numpy as np
+from sqlalchemy import select, update
+
+from app.extensions import db
+from app.models import Alumno, MedicionCorporal
+from app.progreso import reconstruir_resumenes
+
+COLUMNAS_DERIVADAS = (
+    "imc", "metabolismo_basal", "grasa_corporal", "masa_grasa",
+    "agua_corporal", "rcc", "rca", "musculo",
+)
+
+
+def _a_array(valores):
+    """Convierte una lista con None a un array float con NaN."""
+    return np.array([np.nan if v is None else v for v in valores], dtype=float)
+
+
+def _redondear(x, decimales=2):
+    """np.round con el mismo resultado que round() de Python.
+
+    np.round escala por 10**decimales y puede desempatar distinto cuando el
+    valor cae justo en ...5; esos casos (pocos) se resuelven con round().
+    """
+    r = np.round(x, decimales)
+    escalado = x * 10 ** decimales
+    dudosos = np.nonzero(np.abs(np.abs(escalado - np.trunc(escalado)) - 0.5) < 1e-6)[0]
+    for i in dudosos:
+        r[i] = round(float(x[i]), decimales)
+    return r
+
+
+def _presente(x):
+    # Equivalente vectorial de `if valor:` (ni None ni 0)
+    return ~np.isnan(x) & (x != 0)
+
+
+def normalizar_genero_y_edad(generos, edades):
+    """Replica MedicionCorporal.genero_y_edad para listas completas."""
+    genero = np.array([(g or "masculino").lower() for g in generos], dtype=object)
+    edad = np.array([e or 25 for e in edades], dtype=float)
+    return genero, edad
+
+
+def calcular_derivados(peso, altura, cintura, cadera, genero, edad, masa_grasa_actual):
+    """Calcula todas las columnas derivadas de una tanda de mediciones.
+
+    Los parámetros numéricos son arrays float (NaN = None), `genero` y `edad`
+    vienen de normalizar_genero_y_edad. Devuelve un dict columna -> array,
+    con NaN donde el método escalar devolvería None.
+    """
+    n = len(peso)
+    nan = np.full(n, np.nan)
+    femenino = genero == "femenino"
+    masculino = genero == "masculino"
+    hay_peso = _presente(peso)
+    hay_altura = _presente(altura)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # IMC
+        ok = hay_peso & hay_altura & (altura > 0)
+        imc = np.where(ok, _redondear(peso / ((altura / 100) ** 2), 2), nan)
+
+        # Metabolismo basal (Mifflin-St Jeor)
+        ok = hay_peso & hay_altura
+        mb_fem = 10 * peso + 6.25 * altura - 5 * edad - 161
+        mb_masc = 10 * peso + 6.25 * altura - 5 * edad + 5
+        metabolismo = np.where(ok, _redondear(np.where(femenino, mb_fem, mb_masc), 2), nan)
+
+        # Grasa corporal (fórmula US Navy adaptada)
+        altura_cm = np.where(hay_altura & (altura < 10), altura * 100, altura)
+        con_datos = _presente(cintura) & _presente(cadera) & _presente(altura_cm)
+        arg_masc = cintura - cintura * 0.25
+        arg_fem = cintura + cadera - cintura * 0.2
+        arg = np.where(masculino, arg_masc, arg_fem)
+        valido = con_datos & (arg > 0) & (altura_cm > 0)
+        bf_masc = (86.010 * np.log10(arg_masc)) - (70.041 * np.log10(altura_cm)) + 36.76
+        bf_fem = (163.205 * np.log10(arg_fem)) - (97.684 * np.log10(altura_cm)) - 78.387
+        bf = np.where(masculino, bf_masc, bf_fem)
+        grasa = np.where(valido, _redondear(np.clip(bf, 2, 60), 2), nan)
+
+        # Masa grasa: sin datos de entrada se conserva el valor anterior,
+        # con datos inválidos (log de negativo) queda en None.
+        masa_grasa = np.where(hay_peso, _redondear(peso * (grasa / 100), 2), nan)
+        masa_grasa = np.where(valido, masa_grasa, nan)
+        masa_grasa = np.where(con_datos, masa_grasa, masa_grasa_actual)
+
+        # Agua corporal (Watson)
+        ok = hay_peso & hay_altura
+        tbw_fem = -2.097 + (0.1069 * altura) + (0.2466 * peso)
+        tbw_masc = 2.447 - (0.09156 * edad) + (0.1074 * altura) + (0.3362 * peso)
+        tbw = np.where(femenino, tbw_fem, tbw_masc)
+        agua = np.where(ok, _redondear((tbw / peso) * 100, 2), nan)
+
+        # Relaciones cintura/cadera y cintura/altura
+        ok = _presente(cintura) & _presente(cadera) & (cadera > 0)
+        rcc = np.where(ok, _redondear(cintura / cadera, 2), nan)
+        ok = _presente(cintura) & hay_altura & (altura > 0)
+        rca = np.where(ok, _redondear(cintura / altura, 2), nan)
+
+        # Músculo a partir de la masa magra
+        factor = np.where(femenino, 0.50, 0.55)
+        musculo = np.clip(_redondear((100 - grasa) * factor, 2), 0, 100)
+
+    return {
+        "imc": imc,
+        "metabolismo_basal": metabolismo,
+        "grasa_corporal": grasa,
+        "masa_grasa": masa_grasa,
+        "agua_corporal": agua,
+        "rcc": rcc,
+        "rca": rca,
+        "musculo": musculo,
+    }
+
+
+def _a_python(valor):
+    return None if np.isnan(valor) else float(valor)
+
+
+def derivados_por_fila(derivados):
+    """Pasa el dict de arrays de calcular_derivados a una lista de dicts
+    (una por fila), con None en lugar de NaN, lista para INSERT/UPDATE."""
+    n = len(derivados["imc"])
+    return [
+        {col: _a_python(derivados[col][i]) for col in COLUMNAS_DERIVADAS}
+        for i in range(n)
+    ]
+
+
+def _consulta_tanda(desde_id, tamanio):
+    m = MedicionCorporal
+    return (
+        select(m.id, m.peso, m.altura, m.cintura, m.cadera, m.masa_grasa,
+               Alumno.genero, Alumno.edad)
+        .join(Alumno, Alumno.id == m.alumno_id)
+        .where(m.id > desde_id)
+        .order_by(m.id)
+        .limit(tamanio)
+    )
+
+
+def derivados_de_filas(filas):
+    """Aplica calcular_derivados a filas (peso, altura, cintura, cadera,
+    masa_grasa, genero, edad) tal como las devuelven las consultas."""
+    columnas = list(zip(*filas))
+    genero, edad = normalizar_genero_y_edad(columnas[5], columnas[6])
+    return calcular_derivados(
+        _a_array(columnas[0]), _a_array(columnas[1]),
+        _a_array(columnas[2]), _a_array(columnas[3]),
+        genero, edad, _a_array(columnas[4]),
+    )
+
+
+def recalcular_mediciones(tamanio_tanda=5000, progreso=None):
+    """Recalcula las métricas derivadas de todas las mediciones.
+
+    Recorre la tabla por tandas ordenadas por id (keyset), calcula con NumPy
+    y escribe cada tanda con un UPDATE masivo por clave primaria.
+    Devuelve un dict con filas procesadas, segundos y filas por segundo.
+    """
+    inicio = time.perf_counter()
+    total = 0
+    ultimo_id = 0
+
+    while True:
+        filas = db.session.execute(_consulta_tanda(ultimo_id, tamanio_tanda)).all()
+        if not filas:
+            break
+
+        ids = [f[0] for f in filas]
+        derivados = derivados_por_fila(derivados_de_filas([f[1:] for f in filas]))
+        cambios = [{"id": id_, **d} for id_, d in zip(ids, derivados)]
+        db.session.execute(update(MedicionCorporal), cambios)
+        db.session.commit()
+
+        total += len(ids)
+        ultimo_id = ids[-1]
+        if progreso:
+            progreso(total)
+
+    # Los valores del resumen por alumno dependen de las métricas recalculadas
+    reconstruir_resumenes(db.session.connection())
+    db.session.commit()
+
+    segundos = time.perf_counter() - inicio
+    return {
+        "filas": total,
+        "segundos": segundos,
+        "filas_por_segundo": total / segundos if segundos else 0.0,
+    }
+
+
+def verificar_paridad(muestra=1000):
+    """Compara el cálculo vectorial contra calcular_todo() sobre una muestra.
+
+    No escribe nada. Devuelve la lista de (id, columna, escalar, vectorial)
+    que no coinciden.
+    """
+    mediciones = (
+        MedicionCorporal.query
+        .order_by(MedicionCorporal.id)
+        .limit(muestra)
+        .all()
+    )
+    if not mediciones:
+        return []
+
+    filas = [
+        (m.peso, m.altura, m.cintura, m.cadera, m.masa_grasa,
+         m.alumno.genero, m.alumno.edad)
+        for m in mediciones
+    ]
+    derivados = derivados_de_filas(filas)
+
+    diferencias = []
+    try:
+        for i, m in enumerate(mediciones):
+            m.calcular_todo()
+            for col in COLUMNAS_DERIVADAS:
+                escalar = getattr(m, col)
+                vectorial = _a_python(derivados[col][i])
+                if escalar is None or vectorial is None:
+                    iguales = escalar is None and vectorial is None
+                else:
+                    iguales = abs(escalar - vectorial) < 1e-9
+                if not iguales:
+                    diferencias.append((m.id, col, escalar, vectorial))
+    finally:
+        # calcular_todo modifica los objetos: no persistir nada
+        db.session.rollback()
+    return diferencias
@@ -0,0 +1,126 @@
+# =========================================================
+# 🧾 REPORTE PDF DE MEDICIONES
+# =========================================================
+# El PDF se arma desde datos planos (sin modelos ni sesión) y con las
+# imágenes en memoria. El resultado se guarda en un cache LRU por
+# contenido: la clave es el hash de las filas, los gráficos y la fecha de
+# emisión, así una descarga repetida no vuelve a renderizar.
+import hashlib
+import io
+import time
+from datetime import date
+
+from flask import current_app
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.platypus import Image, Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+from app.cache import CacheLRU
+from app.graficos import dibujos_reporte, series_de_mediciones
+from app.metricas import observar_pdf
+
+ENCABEZADO_TABLA = ["Fecha", "Peso (kg)", "Altura (cm)", "IMC", "Metabolismo", "Grasa (%)", "Músculo (%)", "Agua (%)"]
+
+_cache_pdf = None
+
+
+def cache_pdf():
+    global _cache_pdf
+    if _cache_pdf is None:
+        _cache_pdf = CacheLRU(current_app.config["PDF_CACHE_BYTES"])
+    return _cache_pdf
+
+
+def datos_reporte(alumno, mediciones):
+    """Datos planos del reporte (se pueden pasar a otro proceso)."""
+    return {
+        "alumno_id": alumno.id,
+        "nombre": alumno.nombre,
+        "filas": [
+            (m.fecha.strftime('%d/%m/%Y'), m.peso, m.altura, m.imc,
+             m.metabolismo_basal, m.grasa_corporal, m.musculo, m.agua_corporal)
+            for m in mediciones
+        ],
+        "series": series_de_mediciones(mediciones),
+    }
+
+
+def clave_reporte(datos, graficos, emision):
+    """Hash del contenido completo del PDF."""
+    h = hashlib.sha256()
+    h.update(repr((datos["nombre"], datos["filas"], emision.isoformat())).encode())
+    if graficos is None:
+        # Gráficos del servidor: salen de las mismas filas ya hasheadas
+        h.update(b"servidor")
+        return h.hexdigest()
+    for nombre in sorted(graficos):
+        h.update(nombre.encode())
+        h.update(hashlib.sha256(graficos[nombre]).digest())
+    return h.hexdigest()
+
+
+def construir_pdf(datos, graficos=None, emision=None):
+    """Devuelve los bytes del PDF.
+
+    `graficos` es {nombre: bytes PNG} (capturas del navegador, se pasan a
+    reportlab desde memoria). Si es None se dibujan en el servidor como
+    gráficos vectoriales a partir de datos["series"].
+    """
+    emision = emision or date.today()
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=letter)
+    elements = []
+    styles = getSampleStyleSheet()
+
+    # 🏋️ Encabezado
+    titulo = Paragraph(f"<b>Reporte de Mediciones - {datos['nombre']}</b>", styles['Title'])
+    fecha = Paragraph(f"<b>Fecha de emisión:</b> {emision.strftime('%d/%m/%Y')}", styles['Normal'])
+    elements.extend([titulo, Spacer(1, 12), fecha, Spacer(1, 20)])
+
+    # 📋 Tabla de mediciones
+    table = Table([ENCABEZADO_TABLA] + [list(f) for f in datos["filas"]], repeatRows=1)
+    table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor("#1f4e79")),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('GRID', (0, 0), (-1, -1), 0.25, colors.grey),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.whitesmoke),
+    ]))
+    elements.append(table)
+
+    # 🧱 Separador antes de los gráficos
+    elements.append(Spacer(1, 25))
+    elements.append(Paragraph("<b>Evolución del Progreso</b>", styles['Heading2']))
+    elements.append(Spacer(1, 10))
+
+    if graficos is None:
+        # 📈 Gráficos del servidor (el título va dentro del dibujo)
+        for dibujo in dibujos_reporte(datos["series"]).values():
+            elements.append(dibujo)
+            elements.append(Spacer(1, 15))
+    else:
+        # 🖼️ Gráficos del navegador, desde memoria
+        for nombre, imagen in graficos.items():
+            elements.append(Paragraph(f"<b>{nombre.capitalize()}</b>", styles['Heading3']))
+            elements.append(Spacer(1, 8))
+            elements.append(Image(io.BytesIO(imagen), width=500, height=250))
+            elements.append(Spacer(1, 15))
+
+    doc.build(elements)
+    return buffer.getvalue()
+
+
+def pdf_con_cache(datos, graficos):
+    """(clave, bytes del PDF), renderizando solo si no estaba en cache."""
+    emision = date.today()
+    clave = clave_reporte(datos, graficos, emision)
+    cache = cache_pdf()
+    pdf = cache.get(clave)
+    if pdf is None:
+        inicio = time.perf_counter()
+        pdf = construir_pdf(datos, graficos, emision)
+        observar_pdf("individual", time.perf_counter() - inicio)
+        cache.put(clave, pdf)
+    return clave, pdf
@@ -0,0 +1,275 @@
+# =========================================================
+# 📥 RESTAURACIÓN DESDE UN BACKUP (NDJSON / CSV de app/exportacion.py)
+# =========================================================
+# Lee el archivo en streaming y carga por lotes: COPY FROM STDIN en
+# PostgreSQL, INSERT con executemany en otros motores. Todo corre en una
+# transacción: si al final hay claves foráneas huérfanas o el archivo
+# vino incompleto, no queda nada a medias. Las tablas derivadas
+# (contadores, resúmenes, suscripciones, ingresos, estadísticas) se
+# regeneran al terminar con las mismas funciones de `flask jge`.
+import csv
+import gzip
+import io
+import json
+import time
+from dataclasses import dataclass, field
+from datetime import date, datetime
+
+from sqlalchemy import Boolean, Date, DateTime, Float, Integer, delete, func, insert, select, text
+
+from app.exportacion import TABLAS
+
+TAMANIO_LOTE = 10000
+
+# tabla -> [(columna, tabla referenciada)] (para remapear ids y validar)
+REFERENCIAS = {
+    "alumno": [("cliente_id", "user")],
+    "medicion_corporal": [("alumno_id", "alumno")],
+    "pagos_clientes": [("cliente_id", "user")],
+}
+DERIVADAS = ("resumen_alumno", "ingreso_mensual", "estadistica_diaria")
+
+
+class ErrorRestauracion(Exception):
+    """Archivo inválido, base no vacía o datos inconsistentes."""
+
+
+@dataclass
+class ReporteRestauracion:
+    filas: dict = field(default_factory=dict)
+    segundos: float = 0.0
+
+    @property
+    def total(self):
+        return sum(self.filas.values())
+
+
+# -------------------------------------------------------------------
+# LECTURA EN STREAMING
+# -------------------------------------------------------------------
+def abrir(ruta):
+    """Abre en modo texto, descomprimiendo si es gzip."""
+    with open(ruta, "rb") as f:
+        comprimido = f.read(2) == b"\x1f\x8b"
+    if comprimido:
+        return gzip.open(ruta, "rt", encoding="utf-8", newline="")
+    return open(ruta, "r", encoding="utf-8", newline="")
+
+
+def leer_ndjson(archivo, esperadas):
+    """Genera (tabla, fila) y deja en `esperadas` los conteos del cierre."""
+    encabezado = json.loads(next(archivo, "null") or "null")
+    if not isinstance(encabezado, dict) or encabezado.get("formato") != "jgefitrack":
+        raise ErrorRestauracion("El archivo no es un backup NDJSON de JgeFiTrack.")
+    for n, linea in enumerate(archivo, start=2):
+        if not linea.strip():
+            continue
+        registro = json.loads(linea)
+        if "fin" in registro:
+            esperadas.update(registro["fin"])
+            return
+        if registro.get("tabla") not in TABLAS:
+            raise ErrorRestauracion(f"Línea {n}: tabla desconocida {registro.get('tabla')!r}.")
+        yield registro["tabla"], registro["datos"]
+    raise ErrorRestauracion("El backup está incompleto: falta la línea de cierre.")
+
+
+def leer_csv(archivo, tabla):
+    # La exportación escribe NULL como campo vacío
+    for fila in csv.DictReader(archivo):
+        yield tabla, {k: (v if v != "" else None) for k, v in fila.items()}
+
+
+# -------------------------------------------------------------------
+# CONVERSIÓN DE VALORES
+# -------------------------------------------------------------------
+def _convertidor(columna):
+    tipo = columna.type
+    if isinstance(tipo, DateTime):
+        return datetime.fromisoformat
+    if isinstance(tipo, Date):
+        return date.fromisoformat
+    if isinstance(tipo, Boolean):
+        return lambda v: v if isinstance(v, bool) else str(v).lower() in ("true", "t", "1")
+    if isinstance(tipo, Integer):
+        return int
+    if isinstance(tipo, Float):
+        return float
+    return lambda v: v
+
+
+def _campo_copy(v):
+    """Valor en el formato de texto de COPY (tabuladores, \\N = NULL)."""
+    if v is None:
+        return "\\N"
+    if isinstance(v, bool):
+        return "t" if v else "f"
+    if isinstance(v, (datetime, date)):
+        return v.isoformat()
+    return (
+        str(v).replace("\\", "\\\\").replace("\t", "\\t")
+        .replace("\n", "\\n").replace("\r", "\\r")
+    )
+
+
+# -------------------------------------------------------------------
+# CARGA POR LOTES
+# -------------------------------------------------------------------
+def _cargar_lote(conexion, tabla, columnas, filas):
+    if not filas:
+        return
+    if conexion.dialect.name == "postgresql":
+        preparador = conexion.dialect.identifier_preparer
+        sql = "COPY %s (%s) FROM STDIN" % (
+            preparador.format_table(tabla), ", ".join(preparador.quote(c) for c in columnas))
+        buffer = io.StringIO()
+        for fila in filas:
+            buffer.write("\t".join(_campo_copy(fila[c]) for c in columnas))
+            buffer.write("\n")
+        buffer.seek(0)
+        cursor = conexion.connection.cursor()
+        try:
+            cursor.copy_expert(sql, buffer)
+        finally:
+            cursor.close()
+        return
+    conexion.execute(insert(tabla), filas)
+
+
+def _reiniciar_secuencias(conexion):
+    if conexion.dialect.name != "postgresql":
+        return  # SQLite toma MAX(rowid) + 1 solo
+    for nombre, tabla in TABLAS.items():
+        conexion.execute(text(
+            "SELECT setval(pg_get_serial_sequence(:tabla, 'id'), "
+            "COALESCE((SELECT MAX(id) FROM %s), 0) + 1, false)"
+            % conexion.dialect.identifier_preparer.format_table(tabla)
+        ), {"tabla": f'"{nombre}"'})
+
+
+def huerfanas(conexion):
+    """{(tabla, columna): n} de filas que apuntan a un padre inexistente."""
+    resultado = {}
+    for nombre, refs in REFERENCIAS.items():
+        hija = TABLAS[nombre]
+        for columna, padre_nombre in refs:
+            padre = TABLAS[padre_nombre]
+            n = conexion.execute(
+                select(func.count()).select_from(hija)
+                .where(~hija.c[columna].in_(select(padre.c.id)))
+            ).scalar()
+            if n:
+                resultado[(nombre, columna)] = n
+    return resultado
+
+
+def _regenerar_derivadas(conexion):
+    from app.contadores import recontar
+    from app.estadisticas import reconciliar_estadisticas
+    from app.ingresos import reconstruir_ingresos
+    from app.progreso import reconstruir_resumenes
+    from app.suscripciones import sincronizar_suscripciones
+
+    recontar(conexion)
+    reconstruir_resumenes(conexion)
+    sincronizar_suscripciones(conexion)
+    reconstruir_ingresos(conexion, date.min)
+    reconciliar_estadisticas(conexion)
+
+
+def restaurar(conexion, registros, remapear=False, vaciar=False, esperadas=None,
+              tamanio_lote=TAMANIO_LOTE, progreso=None):
+    """Carga los (tabla, fila) de `registros` y regenera lo derivado.
+
+    - Por defecto conserva los ids del backup: las tablas tienen que
+      estar vacías (con `vaciar` se borran antes).
+    - Con `remapear` agrega los datos a los existentes: cada id se
+      desplaza por el MAX(id) actual de su tabla (y las claves foráneas
+      con él). Los administradores del backup no se importan.
+
+    `esperadas` son los conteos del cierre del NDJSON, para verificar que
+    el archivo llegó completo. Quien llama hace commit / rollback.
+    """
+    inicio = time.perf_counter()
+    if vaciar:
+        for nombre in DERIVADAS:
+            conexion.execute(text(f"DELETE FROM {nombre}"))
+        for tabla in reversed(list(TABLAS.values())):
+            conexion.execute(delete(tabla))
+    elif not remapear:
+        ocupadas = [
+            nombre for nombre, tabla in TABLAS.items()
+            if conexion.execute(select(func.count()).select_from(tabla)).scalar()
+        ]
+        if ocupadas:
+            raise ErrorRestauracion(
+                f"La base ya tiene datos en {', '.join(ocupadas)}: usar --vaciar o --remapear.")
+
+    desplazamiento = {
+        nombre: (conexion.execute(select(func.max(tabla.c.id))).scalar() or 0) if remapear else 0
+        for nombre, tabla in TABLAS.items()
+    }
+    usuarios_existentes = set()
+    if remapear:
+        usuarios_existentes = set(conexion.execute(select(TABLAS["user"].c.username)).scalars())
+    convertidores = {
+        nombre: {c.name: _convertidor(c) for c in tabla.columns}
+        for nombre, tabla in TABLAS.items()
+    }
+
+    reporte = ReporteRestauracion()
+    omitidos = set()  # ids de administradores no importados (modo remapear)
+    actual, columnas, lote = None, None, []
+
+    def vaciar_lote():
+        _cargar_lote(conexion, TABLAS[actual], columnas, lote)
+        reporte.filas[actual] = reporte.filas.get(actual, 0) + len(lote)
+        lote.clear()
+        if progreso:
+            progreso(actual, reporte.filas[actual])
+
+    for nombre, datos in registros:
+        if nombre != actual:
+            if lote:
+                vaciar_lote()
+            actual = nombre
+            reporte.filas.setdefault(nombre, 0)
+            # Solo las columnas que existen en el esquema actual
+            columnas = [c for c in datos if c in convertidores[nombre]]
+
+        conv = convertidores[nombre]
+        fila = {c: None if datos[c] is None else conv[c](datos[c]) for c in columnas}
+
+        if remapear:
+            if nombre == "user":
+                if fila.get("is_admin"):
+                    omitidos.add(fila["id"])
+                    continue
+                if fila["username"] in usuarios_existentes:
+                    raise ErrorRestauracion(f"El usuario '{fila['username']}' ya existe en la base.")
+            fila["id"] += desplazamiento[nombre]
+            for columna, padre in REFERENCIAS.get(nombre, ()):
+                if fila.get(columna) is not None:
+                    fila[columna] += desplazamiento[padre]
+
+        lote.append(fila)
+        if len(lote) >= tamanio_lote:
+            vaciar_lote()
+    if lote:
+        vaciar_lote()
+
+    if esperadas:
+        for nombre, n in esperadas.items():
+            cargadas = reporte.filas.get(nombre, 0) + (len(omitidos) if nombre == "user" else 0)
+            if cargadas != n:
+                raise ErrorRestauracion(f"{nombre}: el backup declara {n} filas y se leyeron {cargadas}.")
+
+    rotas = huerfanas(conexion)
+    if rotas:
+        detalle = ", ".join(f"{t}.{c}: {n}" for (t, c), n in rotas.items())
+        raise ErrorRestauracion(f"Claves foráneas sin padre ({detalle}).")
+
+    _reiniciar_secuencias(conexion)
+    _regenerar_derivadas(conexion)
+    reporte.segundos = time.perf_counter() - inicio
+    return reporte
@@ -0,0 +1,89 @@
+# =========================================================
+# 📉 SERIES DE MEDICIONES EN JSON (con reducción LTTB)
+# =========================================================
+# Los gráficos de la página de un alumno se piden aparte, en columnas
+# (fechas + valores por serie). Si una serie tiene más puntos que
+# `max_puntos` se reduce con Largest-Triangle-Three-Buckets: conserva el
+# primero y el último y, en cada tramo, el punto que más cambia la forma.
+import numpy as np
+from sqlalchemy import select
+
+from app.graficos import SERIES
+from app.models import MedicionCorporal
+
+# Tope de puntos por serie aunque el navegador pida más
+MAX_PUNTOS = 1000
+# LTTB necesita el primero, el último y al menos un tramo entre ellos
+MIN_PUNTOS = 3
+
+
+def lttb(x, y, umbral):
+    """Índices de los puntos que conserva LTTB (x, y: arrays numpy).
+
+    Un umbral menor a MIN_PUNTOS se toma como MIN_PUNTOS.
+    """
+    n = len(x)
+    umbral = max(umbral, MIN_PUNTOS)
+    if umbral >= n:
+        return np.arange(n)
+
+    # Tramos internos: el primero y el último punto van siempre
+    bordes = np.linspace(1, n - 1, umbral - 1).astype(int)
+    indices = np.empty(umbral, dtype=int)
+    indices[0], indices[-1] = 0, n - 1
+    a = 0
+    for i in range(umbral - 2):
+        inicio, fin = bordes[i], bordes[i + 1]
+        # Tercer vértice: promedio del tramo siguiente (o el último punto)
+        sig_inicio, sig_fin = fin, bordes[i + 2] if i + 2 < len(bordes) else n
+        cx = x[sig_inicio:sig_fin].mean()
+        cy = y[sig_inicio:sig_fin].mean()
+        # Área (x2) del triángulo entre el punto elegido, cada candidato y c
+        areas = np.abs(
+            (x[a] - cx) * (y[inicio:fin] - y[a])
+            - (x[a] - x[inicio:fin]) * (cy - y[a])
+        )
+        a = inicio + int(areas.argmax())
+        indices[i + 1] = a
+    return indices
+
+
+def series_alumno(conexion, alumno_id, desde=None, hasta=None, max_puntos=None):
+    """{"total": n, "series": {nombre: {"fechas": [...], "valores": [...]}}}.
+
+    Cada serie se reduce por separado, descartando sus valores nulos.
+    """
+    m = MedicionCorporal
+    columnas = [getattr(m, columna) for _, columna, _ in SERIES.values()]
+    consulta = select(m.fecha, *columnas).where(m.alumno_id == alumno_id)
+    if desde:
+        consulta = consulta.where(m.fecha >= desde)
+    if hasta:
+        consulta = consulta.where(m.fecha <= hasta)
+    filas = conexion.execute(consulta.order_by(m.fecha.asc())).all()
+
+    max_puntos = min(max_puntos or MAX_PUNTOS, MAX_PUNTOS)
+    fechas = np.array([f[0].toordinal() for f in filas], dtype=float)
+    series = {}
+    for k, nombre in enumerate(SERIES, start=1):
+        valores = np.array([f[k] for f in filas], dtype=float)  # None -> nan
+        con_dato = ~np.isnan(valores)
+        x, y = fechas[con_dato], valores[con_dato]
+        elegidos = lttb(x, y, max_puntos)
+        series[nombre] = {
+            "fechas": [filas[i][0].isoformat() for i in np.flatnonzero(con_dato)[elegidos]],
+            "valores": [round(float(v), 2) for v in y[elegidos]],
+        }
+    return {"total": len(filas), "series": series}
+
+
+def fechas_ocupadas(conexion, alumno_id, desde=None, hasta=None):
+    """Fechas con medición del alumno, en orden (solo lee el índice
+    uq_alumno_fecha: alumno_id, fecha)."""
+    m = MedicionCorporal
+    consulta = select(m.fecha).where(m.alumno_id == alumno_id)
+    if desde:
+        consulta = consulta.where(m.fecha >= desde)
+    if hasta:
+        consulta = consulta.where(m.fecha <= hasta)
+    return [f.isoformat() for f in conexion.execute(consulta.order_by(m.fecha.asc())).scalars()]
@@ -0,0 +1,130 @@
+# =========================================================
+# 🧰 UTILIDADES SQL COMPARTIDAS
+# =========================================================
+from sqlalchemy import DateTime, Integer, delete, insert, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable, FunctionElement
+
+
+def upsert(conexion, tabla, filas, claves):
+    """INSERT ... ON CONFLICT (claves) DO UPDATE para una lista de filas.
+
+    Usa la sintaxis nativa de PostgreSQL/SQLite; en otros motores borra
+    y vuelve a insertar dentro de la misma transacción.
+    """
+    if not filas:
+        return
+    dialecto = conexion.dialect.name
+
+    if dialecto in ("postgresql", "sqlite"):
+        modulo = postgresql if dialecto == "postgresql" else sqlite
+        stmt = modulo.insert(tabla)
+        columnas = [c for c in filas[0] if c not in claves]
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(claves),
+            set_={c: stmt.excluded[c] for c in columnas},
+        )
+        conexion.execute(stmt, filas)
+        return
+
+    for fila in filas:
+        conexion.execute(
+            delete(tabla).where(*[tabla.c[k] == fila[k] for k in claves])
+        )
+    conexion.execute(insert(tabla), filas)
+
+
+def upsert_sumando(conexion, tabla, fila, claves):
+    """Como upsert() para una fila, pero si ya existe SUMA los valores a
+    los de la base (contadores) en lugar de reemplazarlos."""
+    upsert_sumando_filas(conexion, tabla, [fila], claves)
+
+
+def upsert_sumando_filas(conexion, tabla, filas, claves):
+    """upsert_sumando() para una lista de filas con las mismas columnas
+    (una sola sentencia en PostgreSQL/SQLite)."""
+    if not filas:
+        return
+    dialecto = conexion.dialect.name
+    columnas = [c for c in filas[0] if c not in claves]
+
+    if dialecto in ("postgresql", "sqlite"):
+        modulo = postgresql if dialecto == "postgresql" else sqlite
+        stmt = modulo.insert(tabla)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(claves),
+            set_={c: tabla.c[c] + stmt.excluded[c] for c in columnas},
+        )
+        conexion.execute(stmt, filas)
+        return
+
+    for fila in filas:
+        donde = [tabla.c[k] == fila[k] for k in claves]
+        resultado = conexion.execute(
+            update(tabla).where(*donde).values({c: tabla.c[c] + fila[c] for c in columnas})
+        )
+        if not resultado.rowcount:
+            conexion.execute(insert(tabla).values(**fila))
+
+
+class Explicar(Executable, ClauseElement):
+    """EXPLAIN de cualquier select(), con sus parámetros ya enlazados.
+
+    conexion.execute(Explicar(stmt)) devuelve el plan como filas:
+    EXPLAIN QUERY PLAN en SQLite y EXPLAIN en PostgreSQL.
+    """
+    inherit_cache = False
+
+    def __init__(self, consulta):
+        self.consulta = consulta
+
+
+@compiles(Explicar)
+def _compilar_explicar(elemento, compilador, **kw):
+    prefijo = "EXPLAIN QUERY PLAN " if compilador.dialect.name == "sqlite" else "EXPLAIN "
+    return prefijo + compilador.process(elemento.consulta, **kw)
+
+
+# -------------------------------------------------------------------
+# FECHAS CALCULADAS EN SQL (vencimientos de pagos)
+# -------------------------------------------------------------------
+class sumar_dias(FunctionElement):
+    """sumar_dias(columna_datetime, n) -> datetime n días después."""
+    type = DateTime()
+    inherit_cache = True
+    name = "sumar_dias"
+
+
+@compiles(sumar_dias)
+def _sumar_dias(elemento, compilador, **kw):
+    fecha, dias = list(elemento.clauses)
+    return "%s + (%s * INTERVAL '1 day')" % (
+        compilador.process(fecha, **kw), compilador.process(dias, **kw))
+
+
+@compiles(sumar_dias, "sqlite")
+def _sumar_dias_sqlite(elemento, compilador, **kw):
+    fecha, dias = list(elemento.clauses)
+    return "datetime(%s, '+' || %s || ' days')" % (
+        compilador.process(fecha, **kw), compilador.process(dias, **kw))
+
+
+class dias_hasta(FunctionElement):
+    """Días enteros (truncados) desde ahora (UTC) hasta la fecha dada."""
+    type = Integer()
+    inherit_cache = True
+    name = "dias_hasta"
+
+
+@compiles(dias_hasta)
+def _dias_hasta(elemento, compilador, **kw):
+    fecha, = list(elemento.clauses)
+    return "CAST(EXTRACT(DAY FROM (%s) - (now() AT TIME ZONE 'UTC')) AS INTEGER)" % (
+        compilador.process(fecha, **kw))
+
+
+@compiles(dias_hasta, "sqlite")
+def _dias_hasta_sqlite(elemento, compilador, **kw):
+    fecha, = list(elemento.clauses)
+    return "CAST(julianday(%s) - julianday('now') AS INTEGER)" % compilador.process(fecha, **kw)
@@ -1,10 +1,19 @@
 // ==============================
-// 📈 GYMAPP MULTI-GRÁFICOS — MODO OSCURO SUAVE + EXPORTABLE
+// 📈 GYMAPP MULTI-GRÁFICOS — MODO OSCURO SUAVE
+// (el PDF dibuja sus propios gráficos en el servidor)
+// Los datos se piden a series.json recién cuando los gráficos se
+// hacen visibles, ya reducidos al ancho del canvas.
 // ==============================
 
-function crearGrafico(id, label, data, color) {
+// "2024-03-15" -> "15-03"
+function etiquetaFecha(iso) {
+  const [, mes, dia] = iso.split("-");
+  return `${dia}-${mes}`;
+}
+
+function crearGrafico(id, label, serie, color) {
   const canvas = document.getElementById(id);
-  if (!canvas) return;
+  if (!canvas || !serie) return;
   const ctx = canvas.getContext("2d");
 
   const dark = document.body.classList.contains("dark-mode");
@@ -31,10 +40,10 @@ function crearGrafico(id, label, data, color) {
   return new Chart(ctx, {
     type: "line",
     data: {
-      labels: window.datosMediciones.fechas,
+      labels: serie.fechas.map(etiquetaFecha),
       datasets: [{
         label,
-        data,
+        data: serie.valores,
         fill: true,
         backgroundColor: color.replace("1)", "0.25)"),
         borderColor: color,
@@ -98,8 +107,11 @@ const colores = [
 
 
 let charts = {};
+let datosSeries = null;
 
 function inicializarGraficos() {
+  if (!datosSeries) return; // todavía no llegaron los datos
+
   // 🔄 Destruye y limpia los gráficos previos
   for (const key in charts) {
     if (charts[key]) {
@@ -115,22 +127,31 @@ function inicializarGraficos() {
   }
 
   // 🧱 Crea los nuevos gráficos
+  const s = datosSeries.series;
   charts = {
-    peso: crearGrafico("grafico_peso", "Peso (kg)", window.datosMediciones.pesos, colores[0]),
-    imc: crearGrafico("grafico_imc", "IMC", window.datosMediciones.imcs, colores[1]),
-    grasa: crearGrafico("grafico_grasa", "Grasa Corporal (%)", window.datosMediciones.grasas, colores[2]),
-    musculo: crearGrafico("grafico_musculo", "Músculo (%)", window.datosMediciones.musculos, colores[3]),
-    agua: crearGrafico("grafico_agua", "Agua Corporal (%)", window.datosMediciones.aguas, colores[4])
+    peso: crearGrafico("grafico_peso", "Peso (kg)", s.peso, colores[0]),
+    imc: crearGrafico("grafico_imc", "IMC", s.imc, colores[1]),
+    grasa: crearGrafico("grafico_grasa", "Grasa Corporal (%)", s.grasa, colores[2]),
+    musculo: crearGrafico("grafico_musculo", "Músculo (%)", s.musculo, colores[3]),
+    agua: crearGrafico("grafico_agua", "Agua Corporal (%)", s.agua, colores[4])
   };
 }
 
-// 💾 Guarda los gráficos como imágenes base64 (para PDF)
-function guardarGraficosComoBase64() {
-  const imagenes = {};
-  for (const [nombre, grafico] of Object.entries(charts)) {
-    if (grafico) imagenes[nombre] = grafico.toBase64Image("image/png");
+// 📡 Pide las series una sola vez (más puntos que píxeles no se ven)
+async function cargarSeries(contenedor) {
+  const canvas = contenedor.querySelector("canvas");
+  const maxPuntos = Math.max(50, Math.round((canvas ? canvas.clientWidth : 600) / 2));
+  const url = `${contenedor.dataset.url}?max_points=${maxPuntos}`;
+  try {
+    const resp = await fetch(url, { credentials: "same-origin" });
+    if (!resp.ok) throw new Error(resp.status);
+    datosSeries = await resp.json();
+  } catch (e) {
+    console.warn("No se pudieron cargar las series:", e);
+    return;
   }
-  localStorage.setItem("graficosPDF", JSON.stringify(imagenes));
+  inicializarGraficos();
+  contenedor.querySelectorAll("canvas").forEach(c => (c.style.opacity = "1"));
 }
 
 // 🌗 Transición suave entre modo claro/oscuro
@@ -144,7 +165,6 @@ function aplicarModoOscuroSuave() {
       canvas.style.opacity = "1";
     }, 300);
   });
-  setTimeout(guardarGraficosComoBase64, 1000);
 }
 
 // 🕵️‍♂️ Detecta cambios de modo (oscuro/claro)
@@ -153,17 +173,26 @@ const observer = new MutationObserver(() => {
 });
 observer.observe(document.body, { attributes: true, attributeFilter: ["class"] });
 
-// ▶️ Render inicial con fade-in elegante
+// ▶️ Carga diferida con fade-in elegante
 document.addEventListener("DOMContentLoaded", () => {
-  const canvasList = document.querySelectorAll("canvas");
-  canvasList.forEach(c => {
+  localStorage.removeItem("graficosPDF"); // capturas de versiones anteriores
+  const contenedor = document.getElementById("graficos");
+  if (!contenedor) return;
+
+  contenedor.querySelectorAll("canvas").forEach(c => {
     c.style.opacity = "0";
     c.style.transition = "opacity 0.8s ease";
   });
 
-  inicializarGraficos();
-  setTimeout(() => {
-    canvasList.forEach(c => (c.style.opacity = "1"));
-    guardarGraficosComoBase64();
-  }, 1000);
+  if (!("IntersectionObserver" in window)) {
+    cargarSeries(contenedor);
+    return;
+  }
+  const visor = new IntersectionObserver(entradas => {
+    if (entradas.some(e => e.isIntersecting)) {
+      visor.disconnect();
+      cargarSeries(contenedor);
+    }
+  }, { rootMargin: "200px" });
+  visor.observe(contenedor);
 });
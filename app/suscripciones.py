@@ -0,0 +1,74 @@
+# =========================================================
+# 💳 ESTADO DE SUSCRIPCIÓN MATERIALIZADO (User.activo_hasta)
+# =========================================================
+# activo_hasta = último día del mes más reciente cubierto por un pago
+# aprobado. Se recalcula cuando cambia un pago (eventos del mapper) y así
+# el before_request solo compara una fecha del usuario ya cargado.
+from datetime import date
+
+from sqlalchemy import bindparam, event, func, inspect, select, update
+
+from app.models import PagoCliente, User
+from app.periodos import fin_de_mes
+
+_usuarios = User.__table__
+_pagos = PagoCliente.__table__
+
+
+def esta_activo(usuario, hoy=None):
+    return usuario.activo_hasta is not None and (hoy or date.today()) <= usuario.activo_hasta
+
+
+def actualizar_suscripcion(conexion, cliente_id):
+    # MAX(periodo) sale del índice (cliente_id, periodo, estado)
+    ultimo = conexion.execute(
+        select(func.max(_pagos.c.periodo))
+        .where(_pagos.c.cliente_id == cliente_id, _pagos.c.estado == "Aprobado")
+    ).scalar()
+    conexion.execute(
+        update(_usuarios)
+        .where(_usuarios.c.id == cliente_id)
+        .values(activo_hasta=fin_de_mes(ultimo) if ultimo else None)
+    )
+
+
+def sincronizar_suscripciones(conexion):
+    """Recalcula activo_hasta de todos los clientes en una sola pasada.
+
+    Un GROUP BY sobre los pagos aprobados da el último periodo de cada
+    cliente y se escribe con un UPDATE masivo. Devuelve cuántos clientes
+    quedan activos.
+    """
+    hasta = {
+        cliente_id: fin_de_mes(ultimo)
+        for cliente_id, ultimo in conexion.execute(
+            select(_pagos.c.cliente_id, func.max(_pagos.c.periodo))
+            .where(_pagos.c.estado == "Aprobado")
+            .group_by(_pagos.c.cliente_id)
+        )
+    }
+
+    conexion.execute(update(_usuarios).values(activo_hasta=None))
+    if hasta:
+        conexion.execute(
+            update(_usuarios)
+            .where(_usuarios.c.id == bindparam("b_id"))
+            .values(activo_hasta=bindparam("b_hasta")),
+            [{"b_id": k, "b_hasta": v} for k, v in hasta.items()],
+        )
+    hoy = date.today()
+    return sum(1 for v in hasta.values() if v >= hoy)
+
+
+# -------------------------------------------------------------------
+# EVENTOS: cualquier alta, cambio de estado o baja de un pago
+# -------------------------------------------------------------------
+@event.listens_for(PagoCliente, "after_insert")
+@event.listens_for(PagoCliente, "after_update")
+@event.listens_for(PagoCliente, "after_delete")
+def _pago_modificado(mapper, conexion, pago):
+    clientes = {pago.cliente_id}
+    # Si el pago pasó a otro cliente, el anterior también cambia
+    clientes.update(inspect(pago).attrs.cliente_id.history.deleted)
+    for cliente_id in clientes:
+        actualizar_suscripcion(conexion, cliente_id)
@@ -0,0 +1,83 @@
+# =========================================================
+# 🏠 DATOS DEL DASHBOARD DEL CLIENTE (cliente.home)
+# =========================================================
+# Todo sale de agregados: los totales de los contadores de User, la
+# última medición y los alumnos recientes de resumen_alumno (una fila por
+# alumno) y el gráfico de peso promediado por mes. La cantidad de
+# consultas y de filas leídas no depende de cuántas mediciones haya.
+from datetime import date
+
+from sqlalchemy import extract, func, select
+
+from app.models import Alumno, MedicionCorporal, ResumenAlumno
+from app.periodos import inicio_de_mes, sumar_meses
+
+# Meses que muestra el gráfico de peso
+MESES_GRAFICO = 12
+ALUMNOS_RECIENTES = 3
+
+
+def _desde_grafico(hoy):
+    return sumar_meses(inicio_de_mes(hoy), -(MESES_GRAFICO - 1))
+
+
+def consulta_ultima_medicion(cliente_id):
+    return (
+        select(func.max(ResumenAlumno.ultima_fecha))
+        .join(Alumno, Alumno.id == ResumenAlumno.alumno_id)
+        .where(Alumno.cliente_id == cliente_id)
+    )
+
+
+def consulta_recientes(cliente_id):
+    return (
+        select(Alumno.id, Alumno.nombre, Alumno.edad, Alumno.genero, ResumenAlumno.ultima_fecha)
+        .outerjoin(ResumenAlumno, ResumenAlumno.alumno_id == Alumno.id)
+        .where(Alumno.cliente_id == cliente_id)
+        .order_by(Alumno.fecha_creacion.desc())
+        .limit(ALUMNOS_RECIENTES)
+    )
+
+
+def consulta_peso_mensual(cliente_id, desde):
+    """Peso promedio de todos los alumnos del cliente, por mes (a lo sumo
+    MESES_GRAFICO filas)."""
+    anio = extract("year", MedicionCorporal.fecha)
+    mes = extract("month", MedicionCorporal.fecha)
+    return (
+        select(anio.label("anio"), mes.label("mes"), func.avg(MedicionCorporal.peso).label("peso"))
+        .join(Alumno, Alumno.id == MedicionCorporal.alumno_id)
+        .where(
+            Alumno.cliente_id == cliente_id,
+            MedicionCorporal.fecha >= desde,
+            MedicionCorporal.fecha <= date.today(),
+            MedicionCorporal.peso > 0,
+        )
+        .group_by(anio, mes)
+        .order_by(anio, mes)
+    )
+
+
+def datos_inicio(conexion, cliente):
+    """Variables del template cliente/dashboard.html (3 consultas)."""
+    ultima = conexion.execute(consulta_ultima_medicion(cliente.id)).scalar()
+    recientes = [
+        {
+            "nombre": fila.nombre,
+            "edad": fila.edad,
+            "genero": fila.genero,
+            "ultima_medicion": fila.ultima_fecha.strftime('%d/%m/%Y') if fila.ultima_fecha else "Sin datos",
+        }
+        for fila in conexion.execute(consulta_recientes(cliente.id))
+    ]
+    meses = conexion.execute(consulta_peso_mensual(cliente.id, _desde_grafico(date.today()))).all()
+
+    return {
+        # Contadores desnormalizados (app/contadores.py): ya vienen con el usuario
+        "total_alumnos": cliente.total_alumnos,
+        "total_mediciones": cliente.total_mediciones,
+        "ultima_medicion": ultima.strftime('%d/%m/%Y') if ultima else "Sin registros",
+        "alumnos_recientes": recientes,
+        "fechas": [f"{int(f.mes):02d}/{int(f.anio)}" for f in meses],
+        "pesos": [round(float(f.peso), 1) for f in meses],
+    }
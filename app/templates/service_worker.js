@@ -0,0 +1,58 @@
+// Service worker generado por main.service_worker (no editar a mano).
+// Versión = hash de todos los archivos estáticos.
+const VERSION = {{ version|tojson }};
+const CACHE_ESTATICOS = `jge-estaticos-${VERSION}`;
+
+// ✅ Lo que carga el layout (base.html), con ?v=<hash>: su contenido no
+// cambia nunca. El resto de /static/ se guarda la primera vez que se pide.
+const PRECACHE = [
+{%- for ruta in precache %}
+  {{ url_for('static', filename=ruta)|tojson }}{{ "," if not loop.last }}
+{%- endfor %}
+];
+
+// ✅ INSTALACIÓN — precarga de estáticos versionados
+self.addEventListener("install", (event) => {
+  event.waitUntil(
+    caches.open(CACHE_ESTATICOS).then((cache) => cache.addAll(PRECACHE))
+  );
+  self.skipWaiting();
+});
+
+// ✅ ACTIVACIÓN — borra caches de versiones anteriores (y las páginas
+// que guardaban versiones viejas de este archivo)
+self.addEventListener("activate", (event) => {
+  event.waitUntil(
+    caches.keys().then((keys) =>
+      Promise.all(keys.filter((k) => k !== CACHE_ESTATICOS).map((k) => caches.delete(k)))
+    )
+  );
+  self.clients.claim();
+});
+
+// Cache-first: solo para estáticos con hash en la URL
+async function primeroCache(request) {
+  const cache = await caches.open(CACHE_ESTATICOS);
+  const guardada = await cache.match(request);
+  if (guardada) return guardada;
+  const respuesta = await fetch(request);
+  if (respuesta.ok) cache.put(request, respuesta.clone());
+  return respuesta;
+}
+
+// ✅ FETCH
+self.addEventListener("fetch", (event) => {
+  const request = event.request;
+  if (request.method !== "GET") return;
+
+  const url = new URL(request.url);
+  if (url.origin !== self.location.origin) return;
+
+  if (url.pathname.startsWith("/static/") && url.searchParams.has("v")) {
+    event.respondWith(primeroCache(request));
+  }
+  // El resto va directo a la red. Las páginas no se guardan: son del
+  // usuario logueado (un cierre de sesión forzado o vencido no pasa por
+  // /logout) y después de un POST→redirect tienen que mostrar los datos
+  // y el flash recién generados.
+});
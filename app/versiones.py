@@ -0,0 +1,60 @@
+# =========================================================
+# 🏷️ VERSIÓN DE LOS DATOS DE CADA CLIENTE
+# =========================================================
+# User.version_datos sube en cada flush que escribe alumnos, mediciones o
+# pagos del cliente (y cuando se edita el propio usuario). Las vistas
+# condicionales (app/condicional.py) arman su ETag con ese número: si no
+# cambió, responden 304 sin consultar ni renderizar nada.
+from sqlalchemy import event, or_, select, update
+from sqlalchemy.orm import Session, object_session
+
+from app.models import Alumno, MedicionCorporal, PagoCliente, User
+
+_usuarios = User.__table__
+_alumnos = Alumno.__table__
+
+
+def subir_version_datos(conexion, cliente_ids=None, alumno_ids=None):
+    """Sube la versión de esos clientes, de los dueños de esos alumnos, o
+    de todos si no se pasa ninguno de los dos.
+
+    Para escrituras en lote que no pasan por los eventos del ORM.
+    """
+    stmt = update(_usuarios).values(version_datos=_usuarios.c.version_datos + 1)
+    if cliente_ids is None and alumno_ids is None:
+        conexion.execute(stmt)
+        return
+    condiciones = []
+    if cliente_ids:
+        condiciones.append(_usuarios.c.id.in_(list(cliente_ids)))
+    if alumno_ids:
+        condiciones.append(_usuarios.c.id.in_(
+            select(_alumnos.c.cliente_id).where(_alumnos.c.id.in_(list(alumno_ids)))
+        ))
+    if condiciones:
+        conexion.execute(stmt.where(or_(*condiciones)))
+
+
+# -------------------------------------------------------------------
+# EVENTOS
+# -------------------------------------------------------------------
+@event.listens_for(Session, "after_flush")
+def _datos_modificados(session, flush_context):
+    clientes, alumnos = set(), set()
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, (Alumno, PagoCliente)):
+            clientes.add(obj.cliente_id)
+        elif isinstance(obj, MedicionCorporal):
+            alumnos.add(obj.alumno_id)
+    clientes.discard(None)
+    alumnos.discard(None)
+    if clientes or alumnos:
+        subir_version_datos(session.connection(), clientes, alumnos)
+
+
+@event.listens_for(User, "before_update")
+def _usuario_editado(mapper, conexion, usuario):
+    # Nombre, usuario, activo_hasta...: sube en el mismo UPDATE (no si solo
+    # cambió una colección, p. ej. un alumno agregado: eso ya lo cuenta el flush)
+    if object_session(usuario).is_modified(usuario, include_collections=False):
+        usuario.version_datos = User.version_datos + 1
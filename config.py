@@ -1,7 +1,59 @@
 import os
 BASE_DIR = os.path.abspath(os.path.dirname(__file__))
 
+
+def _entorno_int(nombre, defecto):
+    return int(os.environ.get(nombre, defecto))
+
+
+def _entorno_bool(nombre, defecto):
+    return os.environ.get(nombre, defecto).lower() not in ("0", "false", "no")
+
+
+def opciones_motor(uri):
+    """SQLALCHEMY_ENGINE_OPTIONS desde variables de entorno (DB_*).
+
+    Render corta las conexiones ociosas: pre-ping antes de usar cada una y
+    reciclarlas antes de que pase. SQLite en memoria queda como lo arma
+    Flask-SQLAlchemy (un pool estático sin tamaños).
+    """
+    if uri.startswith("sqlite") and (":memory:" in uri or uri.rstrip("/") == "sqlite:"):
+        return {}
+    opciones = {
+        "pool_size": _entorno_int("DB_POOL_SIZE", "5"),
+        "max_overflow": _entorno_int("DB_MAX_OVERFLOW", "10"),
+        "pool_timeout": _entorno_int("DB_POOL_TIMEOUT", "30"),
+        "pool_recycle": _entorno_int("DB_POOL_RECYCLE", "300"),
+        "pool_pre_ping": _entorno_bool("DB_POOL_PRE_PING", "1"),
+    }
+    # Tope por sentencia en milisegundos (0 = sin tope), solo PostgreSQL
+    timeout = _entorno_int("DB_STATEMENT_TIMEOUT_MS", "0")
+    if timeout and uri.startswith("postgres"):
+        opciones["connect_args"] = {"options": f"-c statement_timeout={timeout}"}
+    return opciones
+
+
 class Config:
     SECRET_KEY = os.environ.get("SECRET_KEY", "clave-temporal")
     SQLALCHEMY_DATABASE_URI = os.environ.get("DATABASE_URL") or 'sqlite:///' + os.path.join(BASE_DIR, 'jgefitrack.db')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # Pool de conexiones (app/pool.py mide esperas y ocupación)
+    SQLALCHEMY_ENGINE_OPTIONS = opciones_motor(SQLALCHEMY_DATABASE_URI)
+    # Crear tablas, migrar y sembrar el admin al arrancar (desarrollo).
+    # En producción: AUTO_BOOTSTRAP=0 y `flask jge bootstrap` en el deploy.
+    AUTO_BOOTSTRAP = os.environ.get("AUTO_BOOTSTRAP", "1").lower() not in ("0", "false", "no")
+    # Log de peticiones lentas o con muchas consultas (app/instrumentacion.py)
+    PETICION_LENTA_MS = _entorno_int("PETICION_LENTA_MS", "1000")
+    PETICION_MAX_CONSULTAS = _entorno_int("PETICION_MAX_CONSULTAS", "50")
+    # En tests / CI: una vista que pasa su @presupuesto_consultas falla
+    PRESUPUESTO_CONSULTAS_ESTRICTO = _entorno_bool("PRESUPUESTO_CONSULTAS_ESTRICTO", "0")
+    # /metrics pide "Authorization: Bearer <token>"; sin token responde 404
+    # (salvo con la app en debug o en tests)
+    METRICAS_TOKEN = os.environ.get("METRICAS_TOKEN", "")
+    # Tope del cache de PDFs en memoria, por worker (app/reportes.py)
+    PDF_CACHE_BYTES = int(os.environ.get("PDF_CACHE_MB", "64")) * 1024 * 1024
+    # Tope del cache de gráficos SVG, por worker (app/graficos.py)
+    GRAFICOS_CACHE_BYTES = int(os.environ.get("GRAFICOS_CACHE_MB", "32")) * 1024 * 1024
+    # Alumnos por ZIP de reportes desde la web (se renderizan en serie en
+    # el worker; para más, `flask jge exportar-reportes` con su pool)
+    REPORTES_MAX_ALUMNOS_WEB = int(os.environ.get("REPORTES_MAX_ALUMNOS_WEB", "200"))
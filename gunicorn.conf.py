@@ -0,0 +1,44 @@
+# =========================================================
+# ⚙️ CONFIGURACIÓN DE GUNICORN (la toma sola: `gunicorn run:app`)
+# =========================================================
+# Con GUNICORN_PRELOAD=1 la app se carga una vez en el master y los
+# workers se forkean de ahí: cada uno descarta las conexiones heredadas
+# del pool (un socket compartido entre procesos corrompe el protocolo) y
+# abre las suyas.
+import glob
+import os
+import tempfile
+
+workers = int(os.environ.get("WEB_CONCURRENCY", "2"))
+threads = int(os.environ.get("GUNICORN_THREADS", "1"))
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", "60"))
+preload_app = os.environ.get("GUNICORN_PRELOAD", "0").lower() not in ("0", "false", "no")
+
+# Métricas de Prometheus compartidas entre workers (app/metricas.py): cada
+# proceso escribe en este directorio y /metrics suma todo. Se vacía en
+# cada arranque para no arrastrar valores de procesos anteriores.
+os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", os.path.join(tempfile.gettempdir(), "jgefitrack_metricas"))
+os.makedirs(os.environ["PROMETHEUS_MULTIPROC_DIR"], exist_ok=True)
+for _archivo in glob.glob(os.path.join(os.environ["PROMETHEUS_MULTIPROC_DIR"], "*.db")):
+    os.remove(_archivo)
+
+
+def post_fork(server, worker):
+    aplicacion = server.app.callable  # solo está cargada con preload_app
+    if aplicacion is None:
+        return
+    from app.extensions import db
+    from app.pool import reiniciar_estadisticas
+
+    with aplicacion.app_context():
+        for engine in db.engines.values():
+            # close=False: no cerrar los sockets del master, solo olvidarlos
+            engine.dispose(close=False)
+    reiniciar_estadisticas()
+
+
+def child_exit(server, worker):
+    # Los gauges "livesum" dejan de contar al worker que terminó
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,96 @@
+"""resumen_alumno: resumen de progreso por alumno
+
+Revision ID: 3b8e51d0c2a4
+Revises: f1773af6ca68
+Create Date: 2026-10-18 10:12:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3b8e51d0c2a4'
+down_revision = 'f1773af6ca68'
+branch_labels = None
+depends_on = None
+
+
+# Misma regla que app.progreso.evaluar_progreso, sobre las dos últimas
+# mediciones de cada alumno (LEAD sobre la ventana ordenada por fecha).
+DIFERENCIAS = (
+    ('dif_peso', 'peso'),
+    ('dif_imc', 'imc'),
+    ('dif_musculo', 'musculo'),
+    ('dif_grasa', 'grasa_corporal'),
+    ('dif_agua', 'agua_corporal'),
+)
+VENTANA = 'OVER (PARTITION BY alumno_id ORDER BY fecha DESC)'
+
+
+def _backfill():
+    anteriores = ', '.join(f'LEAD({col}) {VENTANA} AS {col}_anterior' for _, col in DIFERENCIAS)
+    difs = ', '.join(
+        f'ROUND(CAST({col} - {col}_anterior AS NUMERIC), 2) AS {campo}' for campo, col in DIFERENCIAS
+    )
+    score = (
+        '(CASE WHEN dif_musculo > 0 THEN 1 ELSE 0 END)'
+        ' + (CASE WHEN dif_grasa < 0 THEN 1 ELSE 0 END)'
+        ' - (CASE WHEN dif_grasa > 0 THEN 1 ELSE 0 END)'
+        ' - (CASE WHEN dif_musculo < 0 THEN 1 ELSE 0 END)'
+        ' + (CASE WHEN dif_peso < 0 AND dif_grasa < 0 THEN 1 ELSE 0 END)'
+    )
+    campos = ', '.join(campo for campo, _ in DIFERENCIAS)
+    op.execute(
+        'INSERT INTO resumen_alumno (alumno_id, total_mediciones, ultima_fecha, peso, imc, '
+        f'grasa_corporal, musculo, agua_corporal, {campos}, estado_progreso, actualizado) '
+        'SELECT alumno_id, total, fecha, peso, imc, grasa_corporal, musculo, agua_corporal, '
+        f'{campos}, '
+        f"CASE WHEN {score} >= 1 THEN 'positivo' WHEN {score} <= -1 THEN 'negativo' "
+        "ELSE 'neutral' END, CURRENT_TIMESTAMP "
+        f'FROM (SELECT alumno_id, total, fecha, peso, imc, grasa_corporal, musculo, agua_corporal, {difs} '
+        '      FROM (SELECT alumno_id, fecha, peso, imc, grasa_corporal, musculo, agua_corporal, '
+        f'                  {anteriores}, '
+        f'                  ROW_NUMBER() {VENTANA} AS posicion, '
+        '                   COUNT(*) OVER (PARTITION BY alumno_id) AS total '
+        '            FROM medicion_corporal) ultimas '
+        '      WHERE posicion = 1) resumen '
+        'WHERE NOT EXISTS (SELECT 1 FROM resumen_alumno)'
+    )
+
+
+def _crear_tabla():
+    op.create_table(
+        'resumen_alumno',
+        sa.Column('alumno_id', sa.Integer(), nullable=False),
+        sa.Column('total_mediciones', sa.Integer(), nullable=False),
+        sa.Column('ultima_fecha', sa.Date(), nullable=True),
+        sa.Column('peso', sa.Float(), nullable=True),
+        sa.Column('imc', sa.Float(), nullable=True),
+        sa.Column('grasa_corporal', sa.Float(), nullable=True),
+        sa.Column('musculo', sa.Float(), nullable=True),
+        sa.Column('agua_corporal', sa.Float(), nullable=True),
+        sa.Column('dif_peso', sa.Float(), nullable=True),
+        sa.Column('dif_imc', sa.Float(), nullable=True),
+        sa.Column('dif_grasa', sa.Float(), nullable=True),
+        sa.Column('dif_musculo', sa.Float(), nullable=True),
+        sa.Column('dif_agua', sa.Float(), nullable=True),
+        sa.Column('estado_progreso', sa.String(length=10), nullable=False),
+        sa.Column('actualizado', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['alumno_id'], ['alumno.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('alumno_id')
+    )
+
+
+def upgrade():
+    # create_app() corre db.create_all() antes de las migraciones, así que
+    # la tabla puede existir ya (vacía) en bases con datos.
+    if not sa.inspect(op.get_bind()).has_table('resumen_alumno'):
+        _crear_tabla()
+
+    # Backfill con las mediciones existentes (solo si está vacía)
+    _backfill()
+
+
+def downgrade():
+    op.drop_table('resumen_alumno')
@@ -0,0 +1,53 @@
+"""contadores de alumnos y mediciones en user y alumno
+
+Revision ID: 7c1f0a9d4e62
+Revises: 3b8e51d0c2a4
+Create Date: 2026-10-18 11:05:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7c1f0a9d4e62'
+down_revision = '3b8e51d0c2a4'
+branch_labels = None
+depends_on = None
+
+
+def _columnas(tabla):
+    return {c['name'] for c in sa.inspect(op.get_bind()).get_columns(tabla)}
+
+
+def upgrade():
+    # create_app() corre db.create_all() antes: solo agregar lo que falte
+    if 'total_mediciones' not in _columnas('alumno'):
+        with op.batch_alter_table('alumno') as batch_op:
+            batch_op.add_column(sa.Column('total_mediciones', sa.Integer(), nullable=False, server_default='0'))
+
+    columnas_user = _columnas('user')
+    with op.batch_alter_table('user') as batch_op:
+        if 'total_alumnos' not in columnas_user:
+            batch_op.add_column(sa.Column('total_alumnos', sa.Integer(), nullable=False, server_default='0'))
+        if 'total_mediciones' not in columnas_user:
+            batch_op.add_column(sa.Column('total_mediciones', sa.Integer(), nullable=False, server_default='0'))
+
+    # Backfill de los contadores con los datos existentes
+    op.execute(
+        'UPDATE alumno SET total_mediciones = '
+        '(SELECT COUNT(*) FROM medicion_corporal m WHERE m.alumno_id = alumno.id)'
+    )
+    op.execute(
+        'UPDATE "user" SET '
+        'total_alumnos = (SELECT COUNT(*) FROM alumno a WHERE a.cliente_id = "user".id), '
+        'total_mediciones = (SELECT COALESCE(SUM(a.total_mediciones), 0) FROM alumno a WHERE a.cliente_id = "user".id)'
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('user') as batch_op:
+        batch_op.drop_column('total_mediciones')
+        batch_op.drop_column('total_alumnos')
+    with op.batch_alter_table('alumno') as batch_op:
+        batch_op.drop_column('total_mediciones')
@@ -0,0 +1,67 @@
+"""estado de suscripción materializado en user.activo_hasta
+
+Revision ID: 9d2e4b7a1c35
+Revises: 7c1f0a9d4e62
+Create Date: 2026-10-18 12:10:00.000000
+
+"""
+import calendar
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9d2e4b7a1c35'
+down_revision = '7c1f0a9d4e62'
+branch_labels = None
+depends_on = None
+
+
+def _columnas(tabla):
+    return {c['name'] for c in sa.inspect(op.get_bind()).get_columns(tabla)}
+
+
+def _periodo(mes_correspondiente, fecha_pago):
+    # Mes que cubre el pago: mes_correspondiente se guardaba con
+    # strftime("%B %Y"); si el locale no coincide, el mes de fecha_pago (la
+    # misma regla con la que c48a6f2e9b17 carga pagos_clientes.periodo)
+    try:
+        return datetime.strptime(mes_correspondiente or '', '%B %Y').date()
+    except ValueError:
+        if fecha_pago is None:
+            return None
+        if isinstance(fecha_pago, str):
+            fecha_pago = datetime.fromisoformat(fecha_pago)
+        return fecha_pago.date().replace(day=1)
+
+
+def upgrade():
+    if 'activo_hasta' not in _columnas('user'):
+        with op.batch_alter_table('user') as batch_op:
+            batch_op.add_column(sa.Column('activo_hasta', sa.Date(), nullable=True))
+
+    # Backfill: último mes cubierto por un pago aprobado de cada cliente
+    conexion = op.get_bind()
+    hasta = {}
+    pagos = conexion.execute(sa.text(
+        "SELECT cliente_id, mes_correspondiente, fecha_pago FROM pagos_clientes "
+        "WHERE estado = 'Aprobado'"
+    ))
+    for cliente_id, mes, fecha_pago in pagos:
+        periodo = _periodo(mes, fecha_pago)
+        if periodo and (cliente_id not in hasta or periodo > hasta[cliente_id]):
+            hasta[cliente_id] = periodo
+
+    for cliente_id, periodo in hasta.items():
+        ultimo = periodo.replace(day=calendar.monthrange(periodo.year, periodo.month)[1])
+        conexion.execute(
+            sa.text('UPDATE "user" SET activo_hasta = :hasta WHERE id = :id'),
+            {'hasta': ultimo, 'id': cliente_id},
+        )
+
+
+def downgrade():
+    with op.batch_alter_table('user') as batch_op:
+        batch_op.drop_column('activo_hasta')
@@ -0,0 +1,26 @@
+"""índice (fecha_pago, id) para el listado de pagos por cursor
+
+Revision ID: a93c0e4f7b21
+Revises: f2a7d5c81e46
+Create Date: 2026-10-18 16:40:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a93c0e4f7b21'
+down_revision = 'f2a7d5c81e46'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    indices = {i['name'] for i in sa.inspect(op.get_bind()).get_indexes('pagos_clientes')}
+    if 'ix_pagos_fecha_id' not in indices:
+        op.create_index('ix_pagos_fecha_id', 'pagos_clientes', ['fecha_pago', 'id'])
+
+
+def downgrade():
+    op.drop_index('ix_pagos_fecha_id', table_name='pagos_clientes')
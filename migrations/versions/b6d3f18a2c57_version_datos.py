@@ -0,0 +1,31 @@
+"""versión de los datos de cada cliente (ETags de dashboards)
+
+Revision ID: b6d3f18a2c57
+Revises: a93c0e4f7b21
+Create Date: 2026-10-18 17:10:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b6d3f18a2c57'
+down_revision = 'a93c0e4f7b21'
+branch_labels = None
+depends_on = None
+
+
+def _columnas(tabla):
+    return {c['name'] for c in sa.inspect(op.get_bind()).get_columns(tabla)}
+
+
+def upgrade():
+    if 'version_datos' not in _columnas('user'):
+        with op.batch_alter_table('user') as batch_op:
+            batch_op.add_column(sa.Column('version_datos', sa.Integer(), nullable=False, server_default='1'))
+
+
+def downgrade():
+    with op.batch_alter_table('user') as batch_op:
+        batch_op.drop_column('version_datos')
@@ -0,0 +1,73 @@
+"""periodo tipado e indexado en pagos_clientes
+
+Revision ID: c48a6f2e9b17
+Revises: 9d2e4b7a1c35
+Create Date: 2026-10-18 13:20:00.000000
+
+"""
+from datetime import date, datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c48a6f2e9b17'
+down_revision = '9d2e4b7a1c35'
+branch_labels = None
+depends_on = None
+
+
+def _columnas(tabla):
+    return {c['name'] for c in sa.inspect(op.get_bind()).get_columns(tabla)}
+
+
+def _indices(tabla):
+    return {i['name'] for i in sa.inspect(op.get_bind()).get_indexes(tabla)}
+
+
+def _periodo(mes_correspondiente, fecha_pago):
+    # mes_correspondiente se guardaba con strftime("%B %Y"); si el locale
+    # no coincide se usa el mes de fecha_pago
+    try:
+        return datetime.strptime(mes_correspondiente or '', '%B %Y').date()
+    except ValueError:
+        if fecha_pago is None:
+            return date.today().replace(day=1)
+        if isinstance(fecha_pago, str):
+            fecha_pago = datetime.fromisoformat(fecha_pago)
+        return fecha_pago.date().replace(day=1)
+
+
+def upgrade():
+    if 'periodo' not in _columnas('pagos_clientes'):
+        with op.batch_alter_table('pagos_clientes') as batch_op:
+            batch_op.add_column(sa.Column('periodo', sa.Date(), nullable=True))
+
+    # Backfill de los pagos existentes
+    conexion = op.get_bind()
+    pagos = conexion.execute(sa.text(
+        'SELECT id, mes_correspondiente, fecha_pago FROM pagos_clientes WHERE periodo IS NULL'
+    )).all()
+    if pagos:
+        conexion.execute(
+            sa.text('UPDATE pagos_clientes SET periodo = :periodo WHERE id = :id'),
+            [{'periodo': _periodo(mes, fecha), 'id': id_} for id_, mes, fecha in pagos],
+        )
+
+    with op.batch_alter_table('pagos_clientes') as batch_op:
+        batch_op.alter_column('periodo', existing_type=sa.Date(), nullable=False)
+
+    indices = _indices('pagos_clientes')
+    if 'ix_pagos_cliente_periodo_estado' not in indices:
+        op.create_index('ix_pagos_cliente_periodo_estado', 'pagos_clientes',
+                        ['cliente_id', 'periodo', 'estado'])
+    if 'ix_pagos_periodo_estado' not in indices:
+        op.create_index('ix_pagos_periodo_estado', 'pagos_clientes', ['periodo', 'estado'])
+
+
+def downgrade():
+    op.drop_index('ix_pagos_periodo_estado', table_name='pagos_clientes')
+    op.drop_index('ix_pagos_cliente_periodo_estado', table_name='pagos_clientes')
+    with op.batch_alter_table('pagos_clientes') as batch_op:
+        batch_op.drop_column('periodo')
@@ -0,0 +1,74 @@
+"""estadísticas de la plataforma: totales y altas diarias
+
+Revision ID: d81c4e6b9f03
+Revises: b6d3f18a2c57
+Create Date: 2026-10-18 17:50:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd81c4e6b9f03'
+down_revision = 'b6d3f18a2c57'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # create_app() corre db.create_all() antes: las tablas pueden existir
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table('estadistica_total'):
+        op.create_table(
+            'estadistica_total',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('clientes', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('alumnos', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('mediciones', sa.Integer(), nullable=False, server_default='0'),
+            sa.PrimaryKeyConstraint('id')
+        )
+    if not inspector.has_table('estadistica_diaria'):
+        op.create_table(
+            'estadistica_diaria',
+            sa.Column('fecha', sa.Date(), nullable=False),
+            sa.Column('clientes_nuevos', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('alumnos_nuevos', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('mediciones_nuevas', sa.Integer(), nullable=False, server_default='0'),
+            sa.Column('suscripciones_activas', sa.Integer(), nullable=True),
+            sa.PrimaryKeyConstraint('fecha')
+        )
+
+    # Fila de totales con los datos existentes
+    op.execute(
+        'INSERT INTO estadistica_total (id, clientes, alumnos, mediciones) '
+        'SELECT 1, '
+        '(SELECT COUNT(*) FROM "user" WHERE is_admin = false), '
+        '(SELECT COUNT(*) FROM alumno), '
+        '(SELECT COUNT(*) FROM medicion_corporal) '
+        'WHERE NOT EXISTS (SELECT 1 FROM estadistica_total WHERE id = 1)'
+    )
+
+    # Altas por día con el historial (solo si está vacía), como
+    # reconciliar_estadisticas: clientes y alumnos por su fecha de alta,
+    # mediciones por su fecha
+    if op.get_bind().dialect.name == 'sqlite':
+        dia = 'date({})'.format
+    else:
+        dia = 'CAST({} AS DATE)'.format
+    op.execute(
+        'INSERT INTO estadistica_diaria (fecha, clientes_nuevos, alumnos_nuevos, mediciones_nuevas) '
+        'SELECT fecha, SUM(clientes), SUM(alumnos), SUM(mediciones) FROM ('
+        f'  SELECT {dia("fecha_registro")} AS fecha, 1 AS clientes, 0 AS alumnos, 0 AS mediciones '
+        '   FROM "user" WHERE is_admin = false AND fecha_registro IS NOT NULL '
+        f'  UNION ALL SELECT {dia("fecha_creacion")}, 0, 1, 0 FROM alumno WHERE fecha_creacion IS NOT NULL '
+        '   UNION ALL SELECT fecha, 0, 0, 1 FROM medicion_corporal'
+        ') altas '
+        'WHERE NOT EXISTS (SELECT 1 FROM estadistica_diaria) '
+        'GROUP BY fecha'
+    )
+
+
+def downgrade():
+    op.drop_table('estadistica_diaria')
+    op.drop_table('estadistica_total')
@@ -0,0 +1,43 @@
+"""ingreso_mensual: pagos aprobados consolidados por mes y cliente
+
+Revision ID: e3a9c27d5b48
+Revises: d81c4e6b9f03
+Create Date: 2026-10-18 18:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e3a9c27d5b48'
+down_revision = 'd81c4e6b9f03'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # create_app() corre db.create_all() antes: la tabla puede existir
+    if not sa.inspect(op.get_bind()).has_table('ingreso_mensual'):
+        op.create_table(
+            'ingreso_mensual',
+            sa.Column('periodo', sa.Date(), nullable=False),
+            sa.Column('cliente_id', sa.Integer(), nullable=False),
+            sa.Column('total', sa.Float(), nullable=False),
+            sa.Column('pagos', sa.Integer(), nullable=False),
+            sa.ForeignKeyConstraint(['cliente_id'], ['user.id'], ondelete='CASCADE'),
+            sa.PrimaryKeyConstraint('periodo', 'cliente_id')
+        )
+
+    # Backfill con todo el historial (solo si está vacía)
+    op.execute(
+        'INSERT INTO ingreso_mensual (periodo, cliente_id, total, pagos) '
+        'SELECT periodo, cliente_id, SUM(monto), COUNT(*) FROM pagos_clientes '
+        "WHERE estado = 'Aprobado' "
+        'AND NOT EXISTS (SELECT 1 FROM ingreso_mensual) '
+        'GROUP BY periodo, cliente_id'
+    )
+
+
+def downgrade():
+    op.drop_table('ingreso_mensual')
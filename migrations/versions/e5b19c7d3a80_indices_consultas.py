@@ -0,0 +1,38 @@
+"""índices para las consultas de dashboards y pagos
+
+Revision ID: e5b19c7d3a80
+Revises: c48a6f2e9b17
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5b19c7d3a80'
+down_revision = 'c48a6f2e9b17'
+branch_labels = None
+depends_on = None
+
+INDICES = [
+    ('ix_alumno_cliente_fecha_creacion', 'alumno', ['cliente_id', 'fecha_creacion']),
+    ('ix_pagos_cliente_estado_fecha', 'pagos_clientes', ['cliente_id', 'estado', 'fecha_pago']),
+    ('ix_user_is_admin', 'user', ['is_admin']),
+]
+
+
+def _indices(tabla):
+    return {i['name'] for i in sa.inspect(op.get_bind()).get_indexes(tabla)}
+
+
+def upgrade():
+    # create_app() corre db.create_all() antes: solo crear los que falten
+    for nombre, tabla, columnas in INDICES:
+        if nombre not in _indices(tabla):
+            op.create_index(nombre, tabla, columnas)
+
+
+def downgrade():
+    for nombre, tabla, _ in reversed(INDICES):
+        op.drop_index(nombre, table_name=tabla)
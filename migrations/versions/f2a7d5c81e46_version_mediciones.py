@@ -0,0 +1,31 @@
+"""versión de las mediciones de cada alumno (ETags de gráficos)
+
+Revision ID: f2a7d5c81e46
+Revises: e5b19c7d3a80
+Create Date: 2026-10-18 15:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f2a7d5c81e46'
+down_revision = 'e5b19c7d3a80'
+branch_labels = None
+depends_on = None
+
+
+def _columnas(tabla):
+    return {c['name'] for c in sa.inspect(op.get_bind()).get_columns(tabla)}
+
+
+def upgrade():
+    if 'version_mediciones' not in _columnas('alumno'):
+        with op.batch_alter_table('alumno') as batch_op:
+            batch_op.add_column(sa.Column('version_mediciones', sa.Integer(), nullable=False, server_default='1'))
+
+
+def downgrade():
+    with op.batch_alter_table('alumno') as batch_op:
+        batch_op.drop_column('version_mediciones')
@@ -0,0 +1,131 @@
+# =========================================================
+# 🧪 FIXTURES COMUNES
+# =========================================================
+# Una base SQLite temporal preparada con `bootstrap()` (tablas,
+# migraciones y admin inicial) para toda la sesión, y un cliente nuevo con
+# pago al día, alumnos y mediciones para cada test que lo pida.
+#
+# PRESUPUESTO_CONSULTAS_ESTRICTO=1: una vista que pasa su
+# @presupuesto_consultas falla en lugar de solo avisar en el log.
+import itertools
+import os
+import tempfile
+from datetime import date, timedelta
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import event
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CLAVE = "clave-de-prueba"
+
+os.environ.update({
+    "DATABASE_URL": "sqlite:///" + os.path.join(tempfile.mkdtemp(prefix="jgefitrack-"), "tests.db"),
+    "AUTO_BOOTSTRAP": "0",
+    "PRESUPUESTO_CONSULTAS_ESTRICTO": "1",
+    "ADMIN_USERNAME": "admin",
+    "ADMIN_PASSWORD": CLAVE,
+})
+
+from werkzeug.security import generate_password_hash  # noqa: E402
+
+from app import create_app  # noqa: E402
+from app.extensions import db, migrate  # noqa: E402
+from app.models import Alumno, MedicionCorporal, PagoCliente, User  # noqa: E402
+from app.periodos import nombre_periodo, periodo_actual  # noqa: E402
+
+_numeros = itertools.count(1)
+
+
+@pytest.fixture(scope="session")
+def app():
+    from app.bootstrap import bootstrap
+
+    app = create_app()
+    app.config.update(TESTING=True, WTF_CSRF_ENABLED=False)
+    migrate.directory = os.path.join(RAIZ, "migrations")
+    with app.app_context():
+        bootstrap()
+        # Como en PostgreSQL: ON DELETE CASCADE (SQLite lo ignora sin el PRAGMA)
+        event.listen(db.engine, "connect", lambda conexion, _: conexion.execute("PRAGMA foreign_keys=ON"))
+        db.engine.dispose()
+    return app
+
+
+@pytest.fixture(scope="session")
+def clave_hash():
+    return generate_password_hash(CLAVE)
+
+
+@pytest.fixture
+def entrar(app):
+    """entrar("usuario") -> test client con la sesión iniciada."""
+    def entrar(username):
+        client = app.test_client()
+        respuesta = client.post("/login", data={"username": username, "password": CLAVE})
+        assert respuesta.status_code == 302, respuesta.status_code
+        return client
+    return entrar
+
+
+def crear_cliente(clave_hash, alumnos=2, mediciones=3, pago="Aprobado"):
+    """Cliente con un pago del mes actual y `alumnos` x `mediciones`."""
+    n = next(_numeros)
+    usuario = User(username=f"cliente{n}", password=clave_hash, nombre=f"Cliente {n}")
+    db.session.add(usuario)
+    db.session.flush()
+    datos = SimpleNamespace(id=usuario.id, username=usuario.username, pago=None, alumnos=[], mediciones={})
+    if pago:
+        periodo = periodo_actual()
+        fila = PagoCliente(
+            cliente_id=usuario.id, monto=15000, periodo=periodo,
+            mes_correspondiente=nombre_periodo(periodo), estado=pago,
+        )
+        db.session.add(fila)
+        db.session.flush()
+        datos.pago = fila.id
+
+    for a in range(alumnos):
+        alumno = Alumno(nombre=f"Alumno {n}-{a}", edad=30, genero="Femenino", cliente_id=usuario.id)
+        db.session.add(alumno)
+        db.session.flush()
+        filas = []
+        for k in range(mediciones):
+            medicion = MedicionCorporal(
+                fecha=date(2024, 1, 1) + timedelta(days=7 * k), peso=70 - k, altura=170,
+                cintura=80, cadera=100, pecho=90, brazo=30, muslo=50, alumno_id=alumno.id,
+            )
+            medicion.calcular_todo()
+            filas.append(medicion)
+        db.session.add_all(filas)
+        db.session.flush()
+        datos.alumnos.append(alumno.id)
+        datos.mediciones[alumno.id] = [m.id for m in filas]
+    db.session.commit()
+    return datos
+
+
+@pytest.fixture
+def cliente(app, clave_hash):
+    with app.app_context():
+        return crear_cliente(clave_hash)
+
+
+@pytest.fixture
+def otro_cliente(app, clave_hash):
+    with app.app_context():
+        return crear_cliente(clave_hash, alumnos=1, mediciones=1)
+
+
+@pytest.fixture
+def pendiente(app, clave_hash):
+    """Cliente con el pago del mes todavía pendiente."""
+    with app.app_context():
+        return crear_cliente(clave_hash, alumnos=1, mediciones=1, pago="Pendiente")
+
+
+@pytest.fixture
+def sin_pago(app, clave_hash):
+    """Cliente sin pago del mes (registrar_pago crea uno nuevo)."""
+    with app.app_context():
+        return crear_cliente(clave_hash, alumnos=1, mediciones=1, pago=None)
@@ -0,0 +1,52 @@
+# =========================================================
+# 🧪 ALTAS POR DÍA: EVENTOS == RECONCILIACIÓN
+# =========================================================
+# mediciones_nuevas cuenta cada medición en su fecha: lo que dejan los
+# eventos después de altas, cambios de fecha, bajas e importaciones tiene
+# que ser lo mismo que recalcula reconciliar_estadisticas.
+import io
+from datetime import date
+
+from sqlalchemy import select
+
+from app.estadisticas import reconciliar_estadisticas
+from app.extensions import db
+from app.models import EstadisticaDiaria
+
+
+def _medicion(alumno_id, fecha):
+    return {
+        "alumno": alumno_id, "fecha": fecha.isoformat(), "modo": "manual",
+        "peso": 71, "altura": 170, "cintura": 80, "cadera": 100,
+        "pecho": 90, "brazo": 30, "muslo": 50,
+    }
+
+
+def _por_dia(conexion):
+    d = EstadisticaDiaria.__table__
+    return dict(conexion.execute(
+        select(d.c.fecha, d.c.mediciones_nuevas).where(d.c.mediciones_nuevas != 0)
+    ).all())
+
+
+def test_mediciones_nuevas_por_fecha(app, entrar, cliente, otro_cliente):
+    client = entrar(cliente.username)
+    alumno, otro = cliente.alumnos
+    primera, segunda, _ = cliente.mediciones[alumno]
+
+    client.post("/cliente/medicion", data=_medicion(alumno, date(2025, 5, 1)))
+    client.post(f"/cliente/alumno/{alumno}/medicion/{primera}/editar", data=_medicion(alumno, date(2025, 5, 2)))
+    client.get(f"/cliente/alumno/{alumno}/medicion/{segunda}/eliminar")
+    planilla = f"alumno,fecha,peso,altura\nAlumno {cliente.username[7:]}-1,2025-05-01,70,170\n"
+    client.post("/cliente/mediciones/importar", content_type="multipart/form-data",
+                data={"archivo": (io.BytesIO(planilla.encode()), "planilla.csv")})
+    client.get(f"/cliente/alumno/{otro}/eliminar")
+    entrar("admin").post(f"/admin/admin/cliente/{otro_cliente.id}/eliminar")
+
+    with app.app_context():
+        conexion = db.session.connection()
+        por_eventos = _por_dia(conexion)
+        assert por_eventos[date(2025, 5, 1)] >= 1 and por_eventos[date(2025, 5, 2)] >= 1
+        reconciliar_estadisticas(conexion)
+        assert _por_dia(conexion) == por_eventos
+        db.session.rollback()
@@ -0,0 +1,23 @@
+# =========================================================
+# 🧪 SERVICE WORKER
+# =========================================================
+import os
+
+from app.estaticos import MAX_BYTES_PRECACHE
+
+
+def test_precache_solo_estaticos_chicos_del_layout(app):
+    precache = app.extensions["estaticos_precache"]
+    assert "css/style.css" in precache
+    assert "js/graficos.js" not in precache  # solo la usa datos_de_alumno.html
+    for ruta in precache:
+        assert os.path.getsize(os.path.join(app.static_folder, ruta)) <= MAX_BYTES_PRECACHE
+
+
+def test_service_worker_no_guarda_paginas(app):
+    respuesta = app.test_client().get("/service-worker.js")
+    assert respuesta.status_code == 200
+    assert respuesta.headers["Cache-Control"] == "no-cache"
+    codigo = respuesta.get_data(as_text=True)
+    assert "img/jgefitrack_logo.png" not in codigo
+    assert "navigate" not in codigo and "jge-paginas" not in codigo
@@ -0,0 +1,50 @@
+# =========================================================
+# 🧪 LAS CONSULTAS FRECUENTES USAN ÍNDICES (EXPLAIN)
+# =========================================================
+# Lo mismo que `flask jge explicar`, sobre una base con suficientes
+# clientes, alumnos y pagos para que el planner prefiera los índices (con
+# ANALYZE al día): ninguna consulta de las rutas de cliente/admin, de
+# verificar_pago_activo ni de los eventos de pagos puede recorrer entera
+# alumno, pagos_clientes o user.
+import pytest
+from sqlalchemy import text
+
+from app.explicar import revisar_planes
+from app.extensions import db
+
+from conftest import crear_cliente
+
+CLIENTES = 60
+TABLAS_VIGILADAS = ("alumno", "pagos_clientes", "user")
+
+
+@pytest.fixture(scope="module")
+def base_poblada(app, clave_hash):
+    with app.app_context():
+        for _ in range(CLIENTES):
+            crear_cliente(clave_hash, alumnos=4, mediciones=2)
+        db.session.execute(text("ANALYZE"))
+        db.session.commit()
+    return app
+
+
+def _recorridos(plan):
+    # Líneas "SCAN <tabla>" sin índice (SQLite) o "Seq Scan on <tabla>"
+    for linea in plan.splitlines():
+        linea = linea.strip()
+        if "INDEX" in linea:
+            continue
+        for tabla in TABLAS_VIGILADAS:
+            if linea in (f"SCAN {tabla}", f'SCAN "{tabla}"') or f"Seq Scan on {tabla} " in f"{linea} " \
+                    or f'Seq Scan on "{tabla}" ' in f"{linea} ":
+                yield tabla
+
+
+def test_consultas_frecuentes_usan_indices(base_poblada):
+    with base_poblada.app_context():
+        resultados = revisar_planes(db.session.connection())
+        db.session.rollback()
+
+    assert any(nombre.startswith("verificar_pago_activo") for nombre, _, _ in resultados)
+    fallidas = {nombre: plan for nombre, _, plan in resultados if list(_recorridos(plan))}
+    assert not fallidas, fallidas
@@ -0,0 +1,69 @@
+# =========================================================
+# 🧪 PRESUPUESTO ESTRICTO Y COMMITS
+# =========================================================
+# En modo estricto una vista que pasa su presupuesto falla antes de
+# confirmar lo que escribió; si ya confirmó, solo queda el warning.
+import logging
+
+import pytest
+
+from app.extensions import db
+from app.instrumentacion import PresupuestoExcedido, maximo_consultas, presupuesto_consultas
+from app.models import Alumno
+
+
+def _leer(cliente_id, veces):
+    for _ in range(veces):
+        Alumno.query.filter_by(cliente_id=cliente_id).all()
+
+
+def _alumnos_llamados(app, nombre):
+    with app.app_context():
+        return Alumno.query.filter_by(nombre=nombre).count()
+
+
+def test_excedido_antes_del_commit_no_guarda(app, cliente):
+    @presupuesto_consultas(1)
+    def vista():
+        _leer(cliente.id, 2)
+        db.session.add(Alumno(nombre="No Guardado", cliente_id=cliente.id))
+        db.session.commit()
+
+    with app.test_request_context():
+        with pytest.raises(PresupuestoExcedido):
+            vista()
+    assert _alumnos_llamados(app, "No Guardado") == 0
+
+
+def test_excedido_despues_del_commit_solo_avisa(app, cliente, caplog):
+    @presupuesto_consultas(10)
+    def vista():
+        db.session.add(Alumno(nombre="Guardado", cliente_id=cliente.id))
+        db.session.commit()
+        _leer(cliente.id, 10)
+        return "ok"
+
+    with app.test_request_context(), caplog.at_level(logging.WARNING):
+        assert vista() == "ok"
+    assert _alumnos_llamados(app, "Guardado") == 1
+    assert "presupuesto de 10 consultas superado" in caplog.text
+
+
+def test_excedido_sin_escrituras_falla(app, cliente):
+    @presupuesto_consultas(2)
+    def vista():
+        _leer(cliente.id, 3)
+
+    with app.test_request_context():
+        with pytest.raises(PresupuestoExcedido):
+            vista()
+
+
+def test_maximo_consultas(app, cliente):
+    with app.app_context():
+        with maximo_consultas(2) as medicion:
+            _leer(cliente.id, 2)
+        assert medicion.consultas == 2
+        with pytest.raises(PresupuestoExcedido):
+            with maximo_consultas(1):
+                _leer(cliente.id, 2)
@@ -0,0 +1,33 @@
+# =========================================================
+# 🧪 /metrics CERRADO POR DEFECTO
+# =========================================================
+# Fuera de debug / tests, sin METRICAS_TOKEN el endpoint no existe; con
+# token solo responde a "Authorization: Bearer <token>".
+import pytest
+
+
+@pytest.fixture
+def config_metricas(app):
+    anterior = {clave: app.config[clave] for clave in ("TESTING", "METRICAS_TOKEN")}
+    yield app.config
+    app.config.update(anterior)
+
+
+def test_sin_token_en_produccion_404(app, config_metricas):
+    config_metricas.update(TESTING=False, METRICAS_TOKEN="")
+    assert app.test_client().get("/metrics").status_code == 404
+
+
+def test_sin_token_en_tests(app, config_metricas):
+    config_metricas.update(METRICAS_TOKEN="")
+    assert app.test_client().get("/metrics").status_code == 200
+
+
+def test_con_token(app, config_metricas):
+    config_metricas.update(TESTING=False, METRICAS_TOKEN="secreto")
+    client = app.test_client()
+    assert client.get("/metrics").status_code == 401
+    assert client.get("/metrics", headers={"Authorization": "Bearer otro"}).status_code == 401
+    respuesta = client.get("/metrics", headers={"Authorization": "Bearer secreto"})
+    assert respuesta.status_code == 200
+    assert b"jgefitrack_peticiones" in respuesta.data
@@ -0,0 +1,272 @@
+# =========================================================
+# 🧪 CONSULTAS POR RUTA
+# =========================================================
+# Cada caso corre la petición entera (carga del usuario y control de pago
+# incluidos) dentro de `maximo_consultas(n)`, por cada rama de la vista.
+# Con PRESUPUESTO_CONSULTAS_ESTRICTO (conftest.py) además falla la vista
+# que pase su propio @presupuesto_consultas.
+import io
+from datetime import date
+
+import pytest
+
+from app.extensions import db
+from app.instrumentacion import maximo_consultas
+from app.models import MedicionCorporal, PagoCliente, ResumenAlumno, User
+from app.periodos import periodo_actual
+
+
+def pedir(client, metodo, url, maximo, estado=200, **kwargs):
+    with maximo_consultas(maximo):
+        respuesta = client.open(url, method=metodo, **kwargs)
+        respuesta.get_data()  # las respuestas en streaming consultan al leerse
+    assert respuesta.status_code == estado, respuesta.status_code
+    return respuesta
+
+
+def datos_medicion(alumno_id, fecha):
+    return {
+        "alumno": alumno_id, "fecha": fecha.isoformat(), "modo": "manual",
+        "peso": 71, "altura": 170, "cintura": 80, "cadera": 100,
+        "pecho": 90, "brazo": 30, "muslo": 50,
+    }
+
+
+# -------------------------------------------------------------------
+# CLIENTE
+# -------------------------------------------------------------------
+def test_dashboard_cliente(entrar, cliente):
+    client = entrar(cliente.username)
+    pedir(client, "GET", "/cliente/dashboard", 4)  # con el flash del login: sin ETag
+    etag = pedir(client, "GET", "/cliente/dashboard", 4).headers["ETag"]
+    pedir(client, "GET", "/cliente/dashboard", 1, 304, headers={"If-None-Match": etag})
+
+
+def test_medicion_formulario(entrar, cliente, otro_cliente):
+    client = entrar(cliente.username)
+    alumno = cliente.alumnos[0]
+    pedir(client, "GET", "/cliente/medicion", 2)
+    pedir(client, "GET", f"/cliente/medicion?alumno_id={alumno}", 3)
+    pedir(client, "GET", f"/cliente/medicion?alumno_id={otro_cliente.alumnos[0]}", 3, 403)
+
+
+def test_medicion_nueva(app, entrar, cliente):
+    client = entrar(cliente.username)
+    alumno = cliente.alumnos[0]
+    pedir(client, "POST", f"/cliente/medicion?alumno_id={alumno}", 15, 302,
+          data=datos_medicion(alumno, date(2025, 3, 1)))
+    with app.app_context():
+        assert MedicionCorporal.query.filter_by(alumno_id=alumno, fecha=date(2025, 3, 1)).count() == 1
+
+
+def test_medicion_duplicada(app, entrar, cliente):
+    client = entrar(cliente.username)
+    alumno = cliente.alumnos[0]
+    pedir(client, "POST", "/cliente/medicion", 4, 302, data=datos_medicion(alumno, date(2024, 1, 1)))
+    with app.app_context():
+        assert MedicionCorporal.query.filter_by(alumno_id=alumno).count() == 3
+
+
+def test_check_y_fechas(entrar, cliente):
+    client = entrar(cliente.username)
+    alumno = cliente.alumnos[0]
+    assert pedir(client, "GET", f"/cliente/check-medicion?alumno_id={alumno}&fecha=2024-01-01", 2).json["exists"]
+    etag = pedir(client, "GET", f"/cliente/alumno/{alumno}/fechas.json", 3).headers["ETag"]
+    pedir(client, "GET", f"/cliente/alumno/{alumno}/fechas.json", 2, 304, headers={"If-None-Match": etag})
+
+
+def test_importar(app, entrar, cliente):
+    client = entrar(cliente.username)
+    pedir(client, "GET", "/cliente/mediciones/importar", 1)
+    planilla = "alumno,fecha,peso,altura\n" + "".join(
+        f"Alumno {cliente.username[7:]}-{a},2025-0{m}-01,70,170\n" for a in range(2) for m in range(1, 4)
+    )
+    pedir(client, "POST", "/cliente/mediciones/importar", 14,
+          data={"archivo": (io.BytesIO(planilla.encode()), "planilla.csv")},
+          content_type="multipart/form-data")
+    with app.app_context():
+        assert db.session.get(User, cliente.id).total_mediciones == 12
+
+
+def test_alumnos(entrar, cliente):
+    client = entrar(cliente.username)
+    pedir(client, "GET", "/cliente/alumnos", 2)
+    pedir(client, "GET", "/cliente/alumno/nuevo", 1)
+    pedir(client, "POST", "/cliente/alumno/nuevo", 6, 302,
+          data={"nombre": "nueva alumna", "edad": 28, "genero": "Femenino"})
+
+
+def test_mediciones_alumno(app, entrar, cliente, otro_cliente):
+    client = entrar(cliente.username)
+    alumno = cliente.alumnos[0]
+    pedir(client, "GET", f"/cliente/alumno/{alumno}/mediciones", 4)
+    pedir(client, "GET", f"/cliente/alumno/{otro_cliente.alumnos[0]}/mediciones", 2, 403)
+
+    # Sin fila de resumen la vista lo calcula en memoria, sin escribir
+    with app.app_context():
+        ResumenAlumno.query.filter_by(alumno_id=alumno).delete()
+        db.session.commit()
+    respuesta = pedir(client, "GET", f"/cliente/alumno/{alumno}/mediciones", 4)
+    assert "Bajó 1.0 kg de peso" in respuesta.get_data(as_text=True)
+    with app.app_context():
+        assert db.session.get(ResumenAlumno, alumno) is None
+
+
+def test_graficos_y_series(entrar, cliente):
+    client = entrar(cliente.username)
+    alumno = cliente.alumnos[0]
+    etag = pedir(client, "GET", f"/cliente/alumno/{alumno}/grafico/peso.svg", 3).headers["ETag"]
+    pedir(client, "GET", f"/cliente/alumno/{alumno}/grafico/peso.svg", 2, 304,
+          headers={"If-None-Match": etag})
+    pedir(client, "GET", f"/cliente/alumno/{alumno}/grafico/peso.png", 1, 404)
+    etag = pedir(client, "GET", f"/cliente/alumno/{alumno}/series.json", 3).headers["ETag"]
+    pedir(client, "GET", f"/cliente/alumno/{alumno}/series.json", 2, 304, headers={"If-None-Match": etag})
+
+
+def test_reportes(entrar, cliente):
+    client = entrar(cliente.username)
+    alumno = cliente.alumnos[0]
+    pedir(client, "GET", f"/cliente/alumno/{alumno}/exportar_pdf", 3)
+    pedir(client, "GET", f"/cliente/alumno/{alumno}/exportar_pdf", 3)  # desde el cache
+    pedir(client, "GET", "/cliente/alumnos/reportes.zip", 3)
+
+
+def test_reportes_zip_con_tope(app, entrar, cliente):
+    client = entrar(cliente.username)
+    app.config["REPORTES_MAX_ALUMNOS_WEB"] = 1
+    try:
+        pedir(client, "GET", "/cliente/alumnos/reportes.zip", 2, 302)
+        respuesta = pedir(client, "GET", f"/cliente/alumnos/reportes.zip?ids={cliente.alumnos[0]}", 3)
+        assert respuesta.mimetype == "application/zip"
+        pedir(entrar("admin"), "GET", f"/admin/cliente/{cliente.id}/reportes.zip", 2, 302)
+    finally:
+        app.config["REPORTES_MAX_ALUMNOS_WEB"] = 200
+
+
+def test_editar_alumno(entrar, cliente, otro_cliente):
+    client = entrar(cliente.username)
+    alumno = cliente.alumnos[0]
+    pedir(client, "GET", f"/cliente/alumno/{alumno}/editar", 2)
+    pedir(client, "POST", f"/cliente/alumno/{alumno}/editar", 4, 302,
+          data={"nombre": "otro nombre", "edad": 31, "genero": "Femenino"})
+    pedir(client, "GET", f"/cliente/alumno/{otro_cliente.alumnos[0]}/editar", 2, 302)
+
+
+def test_eliminar_alumno(entrar, cliente, otro_cliente):
+    client = entrar(cliente.username)
+    pedir(client, "GET", f"/cliente/alumno/{otro_cliente.alumnos[0]}/eliminar", 2, 302)
+    pedir(client, "GET", f"/cliente/alumno/{cliente.alumnos[0]}/eliminar", 9, 302)
+
+
+def test_editar_medicion(entrar, cliente):
+    client = entrar(cliente.username)
+    alumno = cliente.alumnos[0]
+    medicion = cliente.mediciones[alumno][-1]
+    url = f"/cliente/alumno/{alumno}/medicion/{medicion}/editar"
+    pedir(client, "GET", url, 3)
+    pedir(client, "POST", url, 10, 302, data=datos_medicion(alumno, date(2024, 2, 1)))  # cambia de día
+
+
+def test_eliminar_medicion(entrar, cliente):
+    client = entrar(cliente.username)
+    alumno, otro = cliente.alumnos
+    medicion = cliente.mediciones[alumno][-1]
+    pedir(client, "GET", f"/cliente/alumno/{otro}/medicion/{medicion}/eliminar", 2, 302)
+    pedir(client, "GET", f"/cliente/alumno/{alumno}/medicion/{medicion}/eliminar", 12, 302)
+
+
+# -------------------------------------------------------------------
+# ADMIN
+# -------------------------------------------------------------------
+def test_dashboard_admin(entrar, cliente):
+    client = entrar("admin")
+    pedir(client, "GET", "/admin/dashboard", 9)
+    pedir(client, "GET", "/admin/dashboard", 6)
+    pedir(entrar(cliente.username), "GET", "/admin/dashboard", 1, 302)
+
+
+def test_clientes(entrar, cliente):
+    client = entrar("admin")
+    pedir(client, "GET", "/admin/clientes", 2)
+    etag = pedir(client, "GET", f"/admin/cliente/{cliente.id}", 4).headers["ETag"]
+    pedir(client, "GET", f"/admin/cliente/{cliente.id}", 2, 304, headers={"If-None-Match": etag})
+    pedir(client, "GET", f"/admin/cliente/{cliente.id}/reportes.zip", 4)
+
+
+def test_nuevo_cliente(entrar, cliente):
+    client = entrar("admin")
+    pedir(client, "GET", "/admin/cliente/nuevo", 1)
+    datos = {"nombre": "Cliente Nuevo", "username": cliente.username, "password": "x"}
+    pedir(client, "POST", "/admin/cliente/nuevo", 2, data=datos)  # usuario repetido
+    datos["username"] = f"{cliente.username}b"
+    pedir(client, "POST", "/admin/cliente/nuevo", 5, 302, data=datos)
+
+
+def test_editar_y_eliminar_cliente(app, entrar, cliente):
+    client = entrar("admin")
+    url = f"/admin/cliente/{cliente.id}/editar"
+    pedir(client, "GET", url, 2)
+    datos = {"nombre": "Otro Nombre", "username": cliente.username}
+    pedir(client, "POST", url, 3, 302, data=datos)
+    pedir(client, "POST", url, 3, 302, data={**datos, "password": "nueva"})
+    pedir(client, "POST", f"/admin/admin/cliente/{cliente.id}/eliminar", 7, 302)
+    with app.app_context():
+        assert db.session.get(User, cliente.id) is None
+
+
+def test_registrar_pago_existente(app, entrar, cliente):
+    pedir(entrar("admin"), "POST", f"/admin/cliente/{cliente.id}/pago", 3, 302)
+    with app.app_context():
+        assert PagoCliente.query.filter_by(cliente_id=cliente.id).count() == 1
+
+
+def test_registrar_pago_nuevo(app, entrar, sin_pago):
+    pedir(entrar("admin"), "POST", f"/admin/cliente/{sin_pago.id}/pago", 11, 302)
+    with app.app_context():
+        pago = PagoCliente.query.filter_by(cliente_id=sin_pago.id).one()
+        assert (pago.periodo, pago.estado) == (periodo_actual(), "Pendiente")
+
+
+def test_aprobar_pago_pendiente(app, entrar, pendiente):
+    pedir(entrar("admin"), "POST", f"/admin/pagos/aprobar/{pendiente.pago}", 11, 302)
+    with app.app_context():
+        assert db.session.get(User, pendiente.id).activo_hasta is not None
+
+
+def test_aprobar_pago_ya_aprobado(entrar, cliente):
+    pedir(entrar("admin"), "POST", f"/admin/pagos/aprobar/{cliente.pago}", 10, 302)
+
+
+def test_registrar_pago_manual(app, entrar, cliente, sin_pago):
+    client = entrar("admin")
+    pedir(client, "GET", "/admin/pagos/nuevo", 2)
+    pedir(client, "POST", "/admin/pagos/nuevo", 2, 302, data={"cliente_id": "", "monto": ""})
+    pedir(client, "POST", "/admin/pagos/nuevo", 4, 302,
+          data={"cliente_id": cliente.id, "monto": 15000, "estado": "Aprobado"})  # ya aprobado
+    pedir(client, "POST", "/admin/pagos/nuevo", 12, 302,
+          data={"cliente_id": sin_pago.id, "monto": 15000, "estado": "Aprobado"})
+    pedir(client, "POST", "/admin/pagos/nuevo", 11, 302,
+          data={"cliente_id": cliente.id, "monto": 5000, "estado": "Pendiente"})
+    with app.app_context():
+        assert db.session.get(User, sin_pago.id).activo_hasta is not None
+
+
+def test_pagos(entrar, cliente):
+    client = entrar("admin")
+    pedir(client, "GET", "/admin/pagos", 3)
+    pedir(client, "GET", f"/admin/pagos?estado=Aprobado&cliente_id={cliente.id}"
+                         f"&periodo={periodo_actual():%Y-%m}", 3)
+    pedir(client, "POST", f"/admin/pagos/eliminar/{cliente.pago}", 10, 302)
+
+
+def test_ingresos(entrar):
+    client = entrar("admin")
+    pedir(client, "GET", "/admin/ingresos", 4)
+    pedir(client, "GET", "/admin/ingresos?desde=2020-01&hasta=2030-12", 4)
+
+
+def test_exportar_y_estadisticas(entrar, cliente):
+    client = entrar("admin")
+    pedir(client, "GET", "/admin/exportar", 7)
+    pedir(client, "GET", "/admin/exportar?formato=csv&tabla=medicion_corporal&gzip=0", 2)
+    pedir(client, "GET", "/admin/estadisticas/cache", 1)
@@ -0,0 +1,84 @@
+# =========================================================
+# 🧪 PARIDAD DEL RECÁLCULO VECTORIAL
+# =========================================================
+# calcular_derivados / derivados_de_filas tienen que dar, columna por
+# columna, lo mismo que MedicionCorporal.calcular_todo(), incluidos los
+# casos raros: medidas faltantes, logaritmos de cero o negativos, los
+# recortes de grasa y la masa grasa que se conserva sin datos.
+from datetime import date, timedelta
+
+import pytest
+
+from app.extensions import db
+from app.models import Alumno, MedicionCorporal
+from app.recalculo import COLUMNAS_DERIVADAS, derivados_de_filas, derivados_por_fila, verificar_paridad
+
+# (genero, edad, medidas) de cada caso
+CASOS = {
+    "completa": ("Masculino", 30, dict(peso=80, altura=178, cintura=85, cadera=98)),
+    "femenino": ("Femenino", 41, dict(peso=62.5, altura=165, cintura=70, cadera=96)),
+    "sin_genero_ni_edad": (None, None, dict(peso=70, altura=170, cintura=80, cadera=100)),
+    "altura_en_metros": ("femenino", 25, dict(peso=60, altura=1.62, cintura=68, cadera=92)),
+    "sin_cintura": ("Masculino", 30, dict(peso=80, altura=178, cintura=None, cadera=98, masa_grasa=12.3)),
+    "sin_cadera": ("Femenino", 30, dict(peso=60, altura=160, cintura=70, cadera=None, masa_grasa=9.87)),
+    "sin_peso": ("Femenino", 30, dict(peso=None, altura=160, cintura=70, cadera=95)),
+    "sin_altura": ("Masculino", 30, dict(peso=80, altura=None, cintura=85, cadera=98)),
+    "log_de_cero": ("Femenino", 30, dict(peso=60, altura=160, cintura=50, cadera=-40, masa_grasa=5.0)),
+    "log_negativo": ("Masculino", 30, dict(peso=80, altura=178, cintura=-85, cadera=98, masa_grasa=5.0)),
+    "altura_negativa": ("Masculino", 30, dict(peso=80, altura=-178, cintura=85, cadera=98)),
+    "grasa_recortada_abajo": ("Masculino", 30, dict(peso=80, altura=200, cintura=10, cadera=50)),
+    "grasa_recortada_arriba": ("Masculino", 30, dict(peso=150, altura=100, cintura=300, cadera=200)),
+    "ceros": ("Femenino", 30, dict(peso=0, altura=0, cintura=0, cadera=0)),
+}
+
+
+def _medicion(genero, edad, medidas):
+    medicion = MedicionCorporal(**medidas)
+    medicion.alumno = Alumno(nombre="Paridad", genero=genero, edad=edad)
+    return medicion
+
+
+def _iguales(escalar, vectorial):
+    if escalar is None or vectorial is None:
+        return escalar is None and vectorial is None
+    return abs(escalar - vectorial) < 1e-9
+
+
+@pytest.mark.parametrize("caso", list(CASOS))
+def test_derivados_iguales_a_calcular_todo(app, caso):
+    genero, edad, medidas = CASOS[caso]
+    with app.app_context():
+        medicion = _medicion(genero, edad, medidas)
+        fila = (medicion.peso, medicion.altura, medicion.cintura, medicion.cadera,
+                medicion.masa_grasa, genero, edad)
+        vectorial = derivados_por_fila(derivados_de_filas([fila]))[0]
+        medicion.calcular_todo()
+        for columna in COLUMNAS_DERIVADAS:
+            escalar = getattr(medicion, columna)
+            assert _iguales(escalar, vectorial[columna]), (columna, escalar, vectorial[columna])
+
+
+def test_recortes_y_masa_grasa_conservada(app):
+    with app.app_context():
+        filas = [
+            (m["peso"], m["altura"], m["cintura"], m["cadera"], m.get("masa_grasa"), g, e)
+            for g, e, m in (CASOS[c] for c in ("grasa_recortada_abajo", "grasa_recortada_arriba", "sin_cintura"))
+        ]
+        abajo, arriba, sin_cintura = derivados_por_fila(derivados_de_filas(filas))
+    assert abajo["grasa_corporal"] == 2
+    assert arriba["grasa_corporal"] == 60
+    assert sin_cintura["grasa_corporal"] is None
+    assert sin_cintura["masa_grasa"] == 12.3
+
+
+def test_verificar_paridad_sobre_la_base(app, cliente):
+    # peso y altura son NOT NULL en la tabla
+    guardables = [c for c in CASOS.values() if c[2]["peso"] is not None and c[2]["altura"] is not None]
+    with app.app_context():
+        for n, (genero, edad, medidas) in enumerate(guardables):
+            alumno = Alumno(nombre=f"Paridad {n}", genero=genero, edad=edad, cliente_id=cliente.id)
+            db.session.add(alumno)
+            db.session.flush()
+            db.session.add(MedicionCorporal(alumno_id=alumno.id, fecha=date(2024, 1, 1) + timedelta(days=n), **medidas))
+        db.session.commit()
+        assert verificar_paridad(muestra=100000) == []
@@ -0,0 +1,32 @@
+# =========================================================
+# 🧪 SERIES JSON Y REDUCCIÓN LTTB
+# =========================================================
+# Un umbral chico nunca devuelve la serie entera: LTTB conserva al menos
+# el primero, el último y un punto intermedio, y la ruta rechaza
+# max_points por debajo de eso.
+import numpy as np
+
+from app.series import MIN_PUNTOS, lttb
+
+
+def test_lttb_umbral_chico_no_devuelve_todo():
+    x = np.arange(100, dtype=float)
+    y = np.sin(x)
+    for umbral in (0, 1, 2, MIN_PUNTOS):
+        indices = lttb(x, y, umbral)
+        assert len(indices) == MIN_PUNTOS
+        assert indices[0] == 0 and indices[-1] == 99
+
+
+def test_lttb_serie_corta_sin_reducir():
+    x = np.arange(5, dtype=float)
+    assert list(lttb(x, x, 10)) == [0, 1, 2, 3, 4]
+
+
+def test_series_max_points(entrar, cliente):
+    client = entrar(cliente.username)
+    url = f"/cliente/alumno/{cliente.alumnos[0]}/series.json"
+    for valor in (0, 2, -5):
+        assert client.get(f"{url}?max_points={valor}").status_code == 400
+    datos = client.get(f"{url}?max_points=3").get_json()
+    assert all(len(serie["fechas"]) == 3 for serie in datos["series"].values())
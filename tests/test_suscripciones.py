@@ -0,0 +1,25 @@
+# =========================================================
+# 🧪 activo_hasta AL CAMBIAR PAGOS
+# =========================================================
+# Un pago que pasa de un cliente a otro recalcula a los dos: el de origen
+# pierde la suscripción que le daba ese pago.
+from app.extensions import db
+from app.models import PagoCliente, User
+from app.periodos import fin_de_mes, periodo_actual
+
+
+def _activo_hasta(cliente_id):
+    return db.session.get(User, cliente_id).activo_hasta
+
+
+def test_pago_movido_a_otro_cliente(app, cliente, sin_pago):
+    with app.app_context():
+        assert _activo_hasta(cliente.id) == fin_de_mes(periodo_actual())
+        assert _activo_hasta(sin_pago.id) is None
+
+        db.session.get(PagoCliente, cliente.pago).cliente_id = sin_pago.id
+        db.session.commit()
+        db.session.expire_all()
+
+        assert _activo_hasta(cliente.id) is None
+        assert _activo_hasta(sin_pago.id) == fin_de_mes(periodo_actual())